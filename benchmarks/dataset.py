@@ -0,0 +1,186 @@
+"""
+Seeder dataset sintetis multi-sekolah untuk benchmark.
+
+Semua data dibuat lewat model di models.py sehingga skema yang diuji sama
+persis dengan aplikasi. Hasilnya deterministik untuk seed yang sama.
+"""
+import random
+from datetime import timedelta
+from werkzeug.security import generate_password_hash
+from extensions import db
+from models import (
+    Attendance, AttendanceStatus, Classroom, School, SchoolSubscription,
+    Student, SubscriptionPlan, Teacher, User, UserRole, jakarta_now
+)
+
+BENCH_PASSWORD = 'benchmark123'
+
+# Distribusi status historis (kurang lebih pola sekolah sungguhan)
+STATUS_WEIGHTS = [
+    (AttendanceStatus.HADIR, 90),
+    (AttendanceStatus.IZIN, 4),
+    (AttendanceStatus.SAKIT, 4),
+    (AttendanceStatus.ALPHA, 2),
+]
+
+
+def school_days(days, today=None):
+    """Hari sekolah (Senin-Jumat) sebelum hari ini, terbaru lebih dulu"""
+    today = today or jakarta_now().date()
+    result = []
+    current = today - timedelta(days=1)
+    while len(result) < days:
+        if current.weekday() < 5:
+            result.append(current)
+        current -= timedelta(days=1)
+    return result
+
+
+def seed_dataset(schools=2, classrooms=4, students=30, days=20, seed=42):
+    """
+    Buat dataset benchmark. Parameter `classrooms` dan `students` berlaku per
+    sekolah dan per kelas. Mengembalikan daftar info per sekolah yang dipakai
+    skenario benchmark (id admin, id guru, NIS siswa per kelas).
+    """
+    rng = random.Random(seed)
+    statuses = [s for s, _ in STATUS_WEIGHTS]
+    weights = [w for _, w in STATUS_WEIGHTS]
+    # Hash password sekali saja; hashing per user hanya memperlambat seeding
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    history = school_days(days)
+    today = jakarta_now().date()
+
+    fixtures = []
+    for s in range(1, schools + 1):
+        school = School(name=f'Sekolah Benchmark {s}', code=f'BENCH{s:04d}', is_active=True)
+        db.session.add(school)
+        db.session.flush()
+
+        db.session.add(SchoolSubscription(
+            school_id=school.id,
+            plan=SubscriptionPlan.PREMIUM,
+            is_active=True,
+            start_date=today - timedelta(days=365),
+            end_date=today + timedelta(days=365),
+            max_teachers=classrooms + 10,
+            max_students=classrooms * students + 100
+        ))
+
+        admin = User(school_id=school.id, username=f'bench_admin_{s}',
+                     email=f'admin{s}@bench.local', role=UserRole.ADMIN,
+                     password_hash=password_hash)
+        db.session.add(admin)
+
+        # Guru piket (bukan wali kelas) yang melakukan scan di gerbang
+        scanner_user = User(school_id=school.id, username=f'bench_scanner_{s}',
+                            email=f'scanner{s}@bench.local', role=UserRole.TEACHER,
+                            password_hash=password_hash)
+        db.session.add(scanner_user)
+        db.session.flush()
+        scanner = Teacher(school_id=school.id, user_id=scanner_user.id,
+                          nip=f'S{s:03d}000', full_name=f'Guru Piket {s}')
+        db.session.add(scanner)
+
+        class_info = []
+        for c in range(1, classrooms + 1):
+            homeroom_user = User(school_id=school.id, username=f'bench_t{s}_{c}',
+                                 email=f't{s}_{c}@bench.local', role=UserRole.TEACHER,
+                                 password_hash=password_hash)
+            db.session.add(homeroom_user)
+            db.session.flush()
+            homeroom = Teacher(school_id=school.id, user_id=homeroom_user.id,
+                               nip=f'S{s:03d}{c:03d}', full_name=f'Wali Kelas {s}-{c}',
+                               is_homeroom=True)
+            db.session.add(homeroom)
+            db.session.flush()
+
+            classroom = Classroom(school_id=school.id, name=f'Kelas {c}',
+                                  grade_level=str((c - 1) % 6 + 1),
+                                  homeroom_teacher_id=homeroom.id)
+            db.session.add(classroom)
+            db.session.flush()
+
+            users = [
+                User(school_id=school.id, username=f'student_{s}_{c}_{n}',
+                     email=f'student{s}_{c}_{n}@bench.local', role=UserRole.STUDENT,
+                     password_hash=password_hash)
+                for n in range(1, students + 1)
+            ]
+            db.session.add_all(users)
+            db.session.flush()
+
+            student_rows = [
+                Student(school_id=school.id, user_id=user.id,
+                        nis=f'{s:03d}{c:03d}{n:04d}', nisn=f'99{s:03d}{c:03d}{n:04d}',
+                        full_name=f'Siswa {s}-{c}-{n}', classroom_id=classroom.id)
+                for n, user in enumerate(users, start=1)
+            ]
+            db.session.add_all(student_rows)
+            db.session.flush()
+
+            # Riwayat absensi dimasukkan lewat executemany (jauh lebih cepat dari ORM)
+            attendance_rows = [
+                {
+                    'school_id': school.id,
+                    'student_id': student.id,
+                    'classroom_id': classroom.id,
+                    'date': day,
+                    'status': rng.choices(statuses, weights)[0],
+                    'recorded_by': scanner.id,
+                }
+                for day in history
+                for student in student_rows
+            ]
+            if attendance_rows:
+                db.session.execute(db.insert(Attendance), attendance_rows)
+
+            class_info.append({
+                'classroom_id': classroom.id,
+                'homeroom_user_id': homeroom_user.id,
+                'student_ids': [st.id for st in student_rows],
+                'nis': [st.nis for st in student_rows],
+            })
+
+        db.session.commit()
+        fixtures.append({
+            'school_id': school.id,
+            'admin_user_id': admin.id,
+            'scanner_user_id': scanner_user.id,
+            'classrooms': class_info,
+        })
+
+    return fixtures
+
+
+def fixtures_from_db(limit_schools=None):
+    """
+    Bangun info fixture dari data yang sudah ada (mis. hasil `flask generate-data`)
+    supaya benchmark bisa berjalan di atas dataset besar.
+    """
+    fixtures = []
+    query = School.query.order_by(School.id)
+    if limit_schools:
+        query = query.limit(limit_schools)
+    for school in query:
+        admin = User.query.filter_by(school_id=school.id, role=UserRole.ADMIN).first()
+        scanner = Teacher.query.filter_by(school_id=school.id).order_by(Teacher.is_homeroom, Teacher.id).first()
+        if not admin or not scanner:
+            continue
+        class_info = []
+        for classroom in Classroom.query.filter_by(school_id=school.id).order_by(Classroom.id):
+            rows = db.session.query(Student.id, Student.nis).filter_by(classroom_id=classroom.id).all()
+            if rows:
+                class_info.append({
+                    'classroom_id': classroom.id,
+                    'homeroom_user_id': None,
+                    'student_ids': [r.id for r in rows],
+                    'nis': [r.nis for r in rows],
+                })
+        if class_info:
+            fixtures.append({
+                'school_id': school.id,
+                'admin_user_id': admin.id,
+                'scanner_user_id': scanner.user_id,
+                'classrooms': class_info,
+            })
+    return fixtures
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Profil waktu import saat start web dan worker.
+
+Contoh:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --max-ms 1500
+
+Setiap mode dijalankan di proses Python baru dengan `-X importtime`, lalu
+dilaporkan total waktu import, modul terberat, dan apakah library berat
+(pandas, PIL, qrcode, boto3, postmarker) ikut dimuat saat start. Library
+tersebut seharusnya hanya di-import di route/task yang membutuhkannya.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['pandas', 'PIL', 'qrcode', 'boto3', 'postmarker', 'sklearn', 'openpyxl']
+
+STARTUP_CODE = {
+    'web': (
+        "from factory import create_app\n"
+        "from benchmarks.run import build_config\n"
+        "create_app(build_config('sqlite://'))\n"
+    ),
+    'worker': (
+        "from factory import create_app\n"
+        "from benchmarks.run import build_config\n"
+        "create_app(build_config('sqlite://'), worker=True)\n"
+        "import tasks\n"
+    ),
+}
+
+
+def profile(mode):
+    """Jalankan satu mode startup dan parse output -X importtime"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE[mode]],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f'{mode}: startup gagal\n{proc.stderr[-2000:]}')
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        cumulative = int(parts[1].strip())
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = {'cumulative_us': cumulative, 'depth': depth}
+
+    total_us = sum(m['cumulative_us'] for m in modules.values() if m['depth'] == 0)
+    top_level = sorted(
+        ((name, m['cumulative_us']) for name, m in modules.items() if m['depth'] == 0),
+        key=lambda item: item[1], reverse=True
+    )
+    heavy_loaded = sorted({name.split('.')[0] for name in modules if name.split('.')[0] in HEAVY_MODULES})
+    return {
+        'total_ms': round(total_us / 1000, 1),
+        'module_count': len(modules),
+        'heavy_loaded': heavy_loaded,
+        'top': [(name, round(us / 1000, 1)) for name, us in top_level[:10]],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Profil waktu import start web dan worker')
+    parser.add_argument('--mode', choices=sorted(STARTUP_CODE), action='append')
+    parser.add_argument('--max-ms', type=float, help='gagal jika total import melebihi nilai ini')
+    parser.add_argument('--json', action='store_true', help='cetak hasil sebagai JSON')
+    args = parser.parse_args(argv)
+
+    results = {mode: profile(mode) for mode in (args.mode or sorted(STARTUP_CODE))}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for mode, r in results.items():
+            print(f"\n[{mode}] total import {r['total_ms']} ms, {r['module_count']} modul")
+            print(f"  library berat dimuat: {', '.join(r['heavy_loaded']) or '-'}")
+            for name, ms in r['top']:
+                print(f'  {name:<40}{ms:>10} ms')
+
+    exit_code = 0
+    for mode, r in results.items():
+        if r['heavy_loaded']:
+            print(f"\n{mode}: library berat dimuat saat start: {', '.join(r['heavy_loaded'])}")
+            exit_code = 1
+        if args.max_ms and r['total_ms'] > args.max_ms:
+            print(f"\n{mode}: total import {r['total_ms']} ms melebihi batas {args.max_ms} ms")
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
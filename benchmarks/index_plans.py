@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Bandingkan plan dan latency query panas dengan index lama (satu kolom) dan
+index komposit baru (migration b7d41f9c3e68).
+
+Contoh:
+    python -m benchmarks.index_plans                      # SQLite sementara
+    python -m benchmarks.index_plans --students 200 --days 120 --verbose
+    BENCH_DATABASE_URL=postgresql://localhost/hubsensi_bench python -m benchmarks.index_plans
+
+Index pada tabel yang diuji di-drop dan dibuat ulang untuk setiap set, jadi
+jangan jalankan ke database produksi. PostgreSQL memakai EXPLAIN (ANALYZE,
+BUFFERS), SQLite memakai EXPLAIN QUERY PLAN.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run import build_config, percentile
+
+TABLES = ['attendances', 'students', 'teachers', 'school_events']
+
+# Index sebelum migration b7d41f9c3e68: (tabel, nama, kolom)
+BEFORE = [
+    ('attendances', 'ix_attendances_school_id', ['school_id'], []),
+    ('attendances', 'ix_attendances_student_id', ['student_id'], []),
+    ('attendances', 'ix_attendances_classroom_id', ['classroom_id'], []),
+    ('attendances', 'ix_attendances_date', ['date'], []),
+    ('students', 'ix_students_school_id', ['school_id'], []),
+    ('students', 'ix_students_nis', ['nis'], []),
+    ('teachers', 'ix_teachers_school_id', ['school_id'], []),
+    ('school_events', 'ix_school_events_school_id', ['school_id'], []),
+]
+
+# Bentuk query dari route: (nama, SQL, fungsi parameter dari fixture)
+QUERIES = [
+    ('dashboard_today_stats',
+     'SELECT status FROM attendances WHERE school_id = :school_id AND date = :today',
+     lambda f: {'school_id': f['school_id'], 'today': f['today']}),
+    ('student_history',
+     'SELECT date, status FROM attendances WHERE student_id = :student_id '
+     'AND date >= :start AND date <= :today ORDER BY date DESC',
+     lambda f: {'student_id': f['student_id'], 'start': f['start'], 'today': f['today']}),
+    ('classroom_day',
+     'SELECT student_id, status FROM attendances WHERE classroom_id = :classroom_id AND date = :today',
+     lambda f: {'classroom_id': f['classroom_id'], 'today': f['today']}),
+    ('monthly_export',
+     'SELECT student_id, date, status FROM attendances WHERE school_id = :school_id '
+     'AND date >= :start AND date < :today',
+     lambda f: {'school_id': f['school_id'], 'start': f['start'], 'today': f['today']}),
+    ('scan_student_lookup',
+     'SELECT id FROM students WHERE nis = :nis AND school_id = :school_id LIMIT 1',
+     lambda f: {'nis': f['nis'], 'school_id': f['school_id']}),
+    ('recent_attendance',
+     'SELECT id FROM attendances WHERE school_id = :school_id ORDER BY created_at DESC LIMIT 5',
+     lambda f: {'school_id': f['school_id']}),
+    ('recent_students',
+     'SELECT id FROM students WHERE school_id = :school_id ORDER BY created_at DESC LIMIT 5',
+     lambda f: {'school_id': f['school_id']}),
+]
+
+
+def after_indexes(db):
+    """Index target diambil dari model (sumber kebenaran)"""
+    result = []
+    for table in TABLES:
+        for index in db.metadata.tables[table].indexes:
+            include = index.dialect_options['postgresql'].get('include') or []
+            result.append((table, index.name, [c.name for c in index.columns], list(include)))
+    return result
+
+
+def apply_index_set(connection, index_set, all_names):
+    is_postgres = connection.dialect.name == 'postgresql'
+    for name in all_names:
+        connection.exec_driver_sql(f'DROP INDEX IF EXISTS {name}')
+    for table, name, columns, include in index_set:
+        include_sql = f" INCLUDE ({', '.join(include)})" if include and is_postgres else ''
+        connection.exec_driver_sql(f"CREATE INDEX {name} ON {table} ({', '.join(columns)}){include_sql}")
+    connection.exec_driver_sql('ANALYZE')
+
+
+def explain(connection, sql, params):
+    from sqlalchemy import text
+    if connection.dialect.name == 'postgresql':
+        rows = connection.execute(text(f'EXPLAIN (ANALYZE, BUFFERS) {sql}'), params)
+        return [row[0] for row in rows]
+    rows = connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params)
+    return [row[-1] for row in rows]
+
+
+def measure(connection, sql, params, iterations):
+    from sqlalchemy import text
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        connection.execute(text(sql), params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(percentile(timings, 50), 3)
+
+
+def run_set(engine, index_set, all_names, fixture, iterations):
+    results = {}
+    with engine.begin() as connection:
+        apply_index_set(connection, index_set, all_names)
+    with engine.connect() as connection:
+        for name, sql, params_fn in QUERIES:
+            params = params_fn(fixture)
+            results[name] = {
+                'p50_ms': measure(connection, sql, params, iterations),
+                'plan': explain(connection, sql, params),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Plan query sebelum/sesudah index komposit')
+    parser.add_argument('--schools', type=int, default=3)
+    parser.add_argument('--classrooms', type=int, default=6, help='jumlah kelas per sekolah')
+    parser.add_argument('--students', type=int, default=40, help='jumlah siswa per kelas')
+    parser.add_argument('--days', type=int, default=60, help='hari sekolah riwayat absensi')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--reuse', action='store_true',
+                        help='pakai data yang sudah ada di BENCH_DATABASE_URL tanpa seeding ulang')
+    parser.add_argument('--verbose', action='store_true', help='tampilkan plan lengkap')
+    parser.add_argument('--json', action='store_true', help='cetak hasil sebagai JSON')
+    args = parser.parse_args(argv)
+
+    database_url = os.environ.get('BENCH_DATABASE_URL')
+    tmpdir = None
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix='hubsensi-index-')
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    from factory import create_app
+    from extensions import db
+    from benchmarks.dataset import fixtures_from_db, seed_dataset
+    from models import jakarta_now
+
+    app = create_app(build_config(database_url))
+    with app.app_context():
+        if args.reuse:
+            fixtures = fixtures_from_db(limit_schools=1)
+        else:
+            db.drop_all()
+            db.create_all()
+            fixtures = seed_dataset(args.schools, args.classrooms, args.students, args.days)
+        if not fixtures:
+            print('Tidak ada data sekolah untuk dibenchmark.')
+            return 1
+
+        school = fixtures[0]
+        today = jakarta_now().date()
+        fixture = {
+            'school_id': school['school_id'],
+            'classroom_id': school['classrooms'][0]['classroom_id'],
+            'student_id': school['classrooms'][0]['student_ids'][0],
+            'nis': school['classrooms'][-1]['nis'][-1],
+            'today': today - timedelta(days=1),
+            'start': today - timedelta(days=30),
+        }
+
+        after = after_indexes(db)
+        all_names = sorted({name for _, name, _, _ in BEFORE + after})
+        report = {
+            'before': run_set(db.engine, BEFORE, all_names, fixture, args.iterations),
+            'after': run_set(db.engine, after, all_names, fixture, args.iterations),
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print(f"{'query':<24}{'sebelum ms':>12}{'sesudah ms':>12}{'speedup':>10}")
+        for name, _, _ in QUERIES:
+            before, after_r = report['before'][name], report['after'][name]
+            speedup = before['p50_ms'] / after_r['p50_ms'] if after_r['p50_ms'] else 0
+            print(f"{name:<24}{before['p50_ms']:>12}{after_r['p50_ms']:>12}{speedup:>9.1f}x")
+            if args.verbose:
+                print('  sebelum:')
+                for line in before['plan']:
+                    print(f'    {line}')
+                print('  sesudah:')
+                for line in after_r['plan']:
+                    print(f'    {line}')
+            else:
+                print(f"  sebelum: {before['plan'][0] if before['plan'] else '-'}")
+                print(f"  sesudah: {after_r['plan'][0] if after_r['plan'] else '-'}")
+
+    if tmpdir:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Benchmark jalur panas absensi HubSensi.
+
+Contoh:
+    python -m benchmarks.run                              # SQLite sementara
+    python -m benchmarks.run --schools 5 --students 40 --save-baseline
+    python -m benchmarks.run --compare                    # bandingkan dengan baseline
+    BENCH_DATABASE_URL=postgresql://localhost/hubsensi_bench python -m benchmarks.run
+
+Setiap skenario dijalankan lewat Flask test client dan melaporkan latency
+p50/p95, throughput dan jumlah query per request.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TestingConfig
+from models import jakarta_now
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def build_config(database_url):
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        # Opsi timezone di Config hanya valid untuk PostgreSQL
+        SQLALCHEMY_ENGINE_OPTIONS = (
+            TestingConfig.SQLALCHEMY_ENGINE_OPTIONS if database_url.startswith('postgresql') else {}
+        )
+        SQLALCHEMY_ECHO = False
+        # Cache dimatikan supaya yang diukur adalah query, bukan hasil cache
+        CACHE_TYPE = 'NullCache'
+        METRICS_ENABLED = False
+        WTF_CSRF_ENABLED = False
+        SERVER_NAME = 'localhost'
+    return BenchmarkConfig
+
+
+class QueryCounter:
+    """Hitung statement SQL yang dieksekusi selama satu request"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def login_client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def build_scenarios(app, fixtures):
+    """Skenario benchmark: (nama, fungsi yang menjalankan satu request)"""
+    today = jakarta_now().strftime('%Y-%m-%d')
+    school = fixtures[0]
+    classroom = school['classrooms'][0]
+
+    teacher_client = login_client(app, school['scanner_user_id'])
+    admin_client = login_client(app, school['admin_user_id'])
+
+    all_nis = [nis for c in school['classrooms'] for nis in c['nis']]
+    scan_state = {'i': 0}
+
+    def process_scan():
+        nis = all_nis[scan_state['i'] % len(all_nis)]
+        scan_state['i'] += 1
+        return teacher_client.post('/teacher/scan/process', data={
+            'qr_data': f"STUDENT:{nis}:{school['school_id']}",
+            'status': 'hadir'
+        })
+
+    grid_form = {'date': today}
+    for student_id in classroom['student_ids']:
+        grid_form[f'status_{student_id}'] = 'hadir'
+        grid_form[f'notes_{student_id}'] = ''
+
+    def attendance_grid_save():
+        return teacher_client.post(
+            f"/teacher/attendance?classroom_id={classroom['classroom_id']}&date={today}",
+            data=grid_form
+        )
+
+    bulk_payload = {'students': [
+        {'student_id': student_id, 'status': 'hadir', 'notes': ''}
+        for student_id in classroom['student_ids']
+    ]}
+
+    def bulk_attendance():
+        return teacher_client.post('/teacher/attendance/bulk', json=bulk_payload)
+
+    def admin_dashboard():
+        return admin_client.get('/admin/dashboard')
+
+    month = jakarta_now().date()
+
+    def attendance_export():
+        return admin_client.get(
+            f'/admin/attendance/export/data?export_type=student&month={month.month}&year={month.year}'
+        )
+
+    return [
+        ('process_scan', process_scan),
+        ('attendance_grid_save', attendance_grid_save),
+        ('bulk_attendance', bulk_attendance),
+        ('admin_dashboard', admin_dashboard),
+        ('attendance_export', attendance_export),
+    ]
+
+
+def run_scenario(name, fn, counter, iterations, warmup):
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    queries = []
+    total_start = time.perf_counter()
+    for _ in range(iterations):
+        counter.count = 0
+        start = time.perf_counter()
+        response = fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+        # Redirect ke halaman login berarti sesi/langganan gagal, bukan hasil yang valid
+        if response.status_code >= 400 or '/auth/login' in response.headers.get('Location', ''):
+            raise RuntimeError(f'{name}: status {response.status_code} tidak diharapkan')
+    total = time.perf_counter() - total_start
+
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'throughput_rps': round(iterations / total, 2) if total else 0.0,
+        'queries_per_request': round(sum(queries) / len(queries), 1),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Bandingkan dengan baseline, kembalikan daftar regresi"""
+    regressions = []
+    print(f"\n{'skenario':<24}{'p95 lama':>10}{'p95 baru':>10}{'delta':>9}{'q lama':>8}{'q baru':>8}")
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            print(f'{name:<24}{"-":>10}{current["p95_ms"]:>10}{"baru":>9}')
+            continue
+        delta = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] if previous['p95_ms'] else 0
+        print(f"{name:<24}{previous['p95_ms']:>10}{current['p95_ms']:>10}{delta:>+9.0%}"
+              f"{previous['queries_per_request']:>8}{current['queries_per_request']:>8}")
+        if delta > tolerance:
+            regressions.append(f'{name}: p95 naik {delta:.0%}')
+        if current['queries_per_request'] > previous['queries_per_request']:
+            regressions.append(f"{name}: query/request naik "
+                               f"{previous['queries_per_request']} -> {current['queries_per_request']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark jalur panas absensi HubSensi')
+    parser.add_argument('--schools', type=int, default=2)
+    parser.add_argument('--classrooms', type=int, default=4, help='jumlah kelas per sekolah')
+    parser.add_argument('--students', type=int, default=30, help='jumlah siswa per kelas')
+    parser.add_argument('--days', type=int, default=20, help='hari sekolah riwayat absensi')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', action='append', help='jalankan skenario tertentu saja')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='kenaikan p95 relatif yang dianggap regresi (default 0.2)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='seed lewat generator massal (utils/data_generator.py)')
+    parser.add_argument('--reuse', action='store_true',
+                        help='pakai data yang sudah ada di BENCH_DATABASE_URL tanpa seeding ulang')
+    parser.add_argument('--json', action='store_true', help='cetak hasil sebagai JSON')
+    args = parser.parse_args(argv)
+
+    database_url = os.environ.get('BENCH_DATABASE_URL')
+    tmpdir = None
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix='hubsensi-bench-')
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+
+    from factory import create_app
+    from extensions import db
+    from benchmarks.dataset import fixtures_from_db, seed_dataset
+    from utils.data_generator import generate_tenants
+
+    app = create_app(build_config(database_url))
+    with app.app_context():
+        seed_start = time.perf_counter()
+        if args.reuse:
+            fixtures = fixtures_from_db(limit_schools=1)
+        else:
+            db.drop_all()
+            db.create_all()
+            if args.bulk:
+                generate_tenants(schools=args.schools, classrooms=args.classrooms, students=args.students,
+                                 days=args.days * 7 // 5, seed=args.seed)
+                fixtures = fixtures_from_db(limit_schools=1)
+            else:
+                fixtures = seed_dataset(args.schools, args.classrooms, args.students, args.days, args.seed)
+        seed_seconds = time.perf_counter() - seed_start
+        if not fixtures:
+            print('Tidak ada data sekolah untuk dibenchmark.')
+            return 1
+
+        counter = QueryCounter(db.engine)
+
+    # Request dijalankan di luar app context agar tiap request punya `g` sendiri
+    results = {}
+    for name, fn in build_scenarios(app, fixtures):
+        if args.only and name not in args.only:
+            continue
+        results[name] = run_scenario(name, fn, counter, args.iterations, args.warmup)
+
+    report = {
+        'dataset': {
+            'database': database_url.split(':', 1)[0],
+            'schools': args.schools,
+            'classrooms': args.classrooms,
+            'students': args.students,
+            'days': args.days,
+            'seed': args.seed,
+            'seed_seconds': round(seed_seconds, 2),
+        },
+        'results': results,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Dataset: {report['dataset']}")
+        print(f"\n{'skenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}{'query/req':>11}")
+        for name, r in results.items():
+            print(f"{name:<24}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['throughput_rps']:>10}"
+                  f"{r['queries_per_request']:>11}")
+
+    exit_code = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f'Baseline {args.baseline} belum ada. Jalankan dengan --save-baseline dulu.')
+            exit_code = 1
+        else:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            if baseline.get('dataset', {}).get('students') != args.students or \
+                    baseline.get('dataset', {}).get('schools') != args.schools:
+                print('Peringatan: ukuran dataset berbeda dengan baseline.')
+            regressions = compare(results, baseline, args.tolerance)
+            if regressions:
+                print('\nRegresi terdeteksi:')
+                for r in regressions:
+                    print(f'  - {r}')
+                exit_code = 1
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nBaseline disimpan ke {args.baseline}')
+
+    if tmpdir:
+        import shutil
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
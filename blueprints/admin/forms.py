@@ -1,5 +1,5 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, SelectField, SubmitField, DateField, TextAreaField, BooleanField
+from wtforms import StringField, SelectField, SubmitField, DateField, TextAreaField, BooleanField, TimeField
 from wtforms.validators import DataRequired, Email, Optional
 from wtforms.widgets import TextArea
 
@@ -51,4 +51,5 @@ class SchoolSettingsForm(FlaskForm):
     primary_color = StringField('Warna Primer', default='#0d6efd', validators=[Optional()])
     secondary_color = StringField('Warna Sekunder', default='#6c757d', validators=[Optional()])
     logo_url = StringField('URL Logo', validators=[Optional()])
+    auto_alpha_cutoff = TimeField('Batas Jam Absensi', validators=[Optional()])
     submit = SubmitField('Simpan')
\ No newline at end of file
@@ -4,7 +4,6 @@ from functools import wraps
 import secrets
 from flask import Response, current_app, render_template, redirect, url_for, flash, request, jsonify,send_file
 from flask_login import login_required, current_user
-import qrcode
 import os
 from io import BytesIO
 import base64
@@ -12,12 +11,12 @@ from datetime import date, timedelta
 from models import EventType, TeacherAttendance, User, UserRole, School, Teacher, Student, Classroom, SchoolEvent, SchoolQRCode, Attendance, jakarta_now
 import io
 from extensions import db, cache
+from utils.db_routing import read_replica
 from . import admin_bp
 from .forms import TeacherForm, StudentForm, ClassroomForm, EventForm, SchoolSettingsForm
-import pandas as pd
 from utils.s3_helper import *
-from utils.card_generator import generate_student_card
-from tasks import send_email_task
+from utils.qr_helper import generate_qr_png
+from utils import attendance_analytics, attendance_trends, directory, live_feed, outbox, roster, school_events
 from flask import send_file
 import io
 
@@ -32,8 +31,9 @@ def require_admin(f):
     return decorated_function
 
 @admin_bp.route('/dashboard')
-@cache.cached(timeout=600)
 @require_admin
+@cache.cached(timeout=600, key_prefix=lambda: f'admin_dashboard:{current_user.school_id}')
+@read_replica
 def dashboard():
     teacher_count = Teacher.query.filter_by(school_id=current_user.school_id).count()
     student_count = Student.query.filter_by(school_id=current_user.school_id).count()
@@ -101,6 +101,12 @@ def dashboard():
     # Get recent teachers and students
     recent_teachers = Teacher.query.filter_by(school_id=current_user.school_id).order_by(Teacher.created_at.desc()).limit(5).all()
     recent_students = Student.query.filter_by(school_id=current_user.school_id).order_by(Student.created_at.desc()).limit(5).all()
+
+    # Siswa berisiko dari analitik malam (utils/attendance_analytics.py)
+    at_risk_students = attendance_analytics.at_risk(
+        current_user.school_id, current_app.config['ANALYTICS_AT_RISK_LIMIT']
+    )
+    classroom_rates = attendance_analytics.classroom_summary(current_user.school_id)
     
     return render_template('admin/dashboard.html',
                            teacher_count=teacher_count,
@@ -111,7 +117,9 @@ def dashboard():
                            attendance_stats=attendance_stats,
                            recent_activities=recent_activities,
                            recent_teachers=recent_teachers,
-                           recent_students=recent_students)
+                           recent_students=recent_students,
+                           at_risk_students=at_risk_students,
+                           classroom_rates=classroom_rates)
 
 @admin_bp.route('/students/<int:student_id>/generate-card')
 @require_admin
@@ -122,6 +130,7 @@ def generate_card(student_id):
         flash('Siswa ini belum memiliki QR code. Silakan buat terlebih dahulu.', 'warning')
         return redirect(url_for('admin.students'))
 
+    from utils.card_generator import generate_student_card
     card_image = generate_student_card(student.full_name, student.nis, student.qr_code)
 
     if card_image is None:
@@ -135,13 +144,38 @@ def generate_card(student_id):
         download_name=f'kartu_{student.full_name}.png'
     )
 
+def _homeroom_filter():
+    """?status=homeroom|regular -> True/False/None"""
+    return {'homeroom': True, 'regular': False}.get(request.args.get('status'))
+
+def _directory_response(lookup, **filters):
+    """Halaman direktori JSON {items, next_cursor}; cursor rusak -> 400"""
+    try:
+        page = lookup(
+            current_user.school_id,
+            search=request.args.get('q'),
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', type=int),
+            **filters
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    response = jsonify(page)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
 @admin_bp.route('/teachers')
 @require_admin
 def teachers():
-    page = request.args.get('page', 1, type=int)
-    teachers = Teacher.query.filter_by(school_id=current_user.school_id).paginate(
-        page=page, per_page=10, error_out=False)
-    return render_template('admin/teachers.html', teachers=teachers.items, pagination=teachers)
+    # Halaman pertama dirender server, berikutnya lewat /api/teachers (infinite scroll)
+    page = directory.teachers(current_user.school_id, request.args.get('q'), _homeroom_filter())
+    return render_template('admin/teachers.html', teachers=page['items'], next_cursor=page['next_cursor'])
+
+@admin_bp.route('/api/teachers')
+@require_admin
+def api_teachers():
+    """Direktori guru ?q=&status=homeroom|regular&cursor=&limit="""
+    return _directory_response(directory.teachers, is_homeroom=_homeroom_filter())
 
 @admin_bp.route('/teachers/add', methods=['GET', 'POST'])
 @require_admin
@@ -184,18 +218,18 @@ def add_teacher():
             is_homeroom=False
         )
         db.session.add(teacher)
-        db.session.commit()
 
-        try:
-            send_email_task.delay(
-                to_email=user.email,
-                name=teacher.full_name,
-                username=user.username,
-                password=password
-            )
-            flash('Akun guru berhasil dibuat dan email terkirim!', 'success')
-        except Exception as e:
-            flash(f'Akun guru dibuat, tapi gagal memasukkan tugas pengiriman email: {str(e)}', 'warning')
+        # Email masuk outbox dalam transaksi yang sama dengan akun
+        outbox.add_login_email(
+            to_email=user.email,
+            name=teacher.full_name,
+            username=user.username,
+            password=password,
+            school_id=current_user.school_id
+        )
+        db.session.commit()
+        outbox.relay_safely(school_id=current_user.school_id)
+        flash('Akun guru berhasil dibuat dan email akan segera dikirim!', 'success')
         
         return redirect(url_for('admin.teachers'))
     
@@ -263,11 +297,22 @@ def delete_teacher(teacher_id):
 @admin_bp.route('/students')
 @require_admin
 def students():
-    page = request.args.get('page', 1, type=int)
-    students = Student.query.filter_by(school_id=current_user.school_id).paginate(
-        page=page, per_page=10, error_out=False)
-    classrooms = Classroom.query.filter_by(school_id=current_user.school_id).all()
-    return render_template('admin/students.html', students=students.items, pagination=students, classrooms=classrooms)
+    # Halaman pertama dirender server, berikutnya lewat /api/students (infinite scroll)
+    page = directory.students(
+        current_user.school_id, request.args.get('q'), request.args.get('classroom_id', type=int)
+    )
+    return render_template(
+        'admin/students.html',
+        students=page['items'],
+        next_cursor=page['next_cursor'],
+        classrooms=directory.classroom_options(current_user.school_id)
+    )
+
+@admin_bp.route('/api/students')
+@require_admin
+def api_students():
+    """Direktori siswa ?q=&classroom_id=&cursor=&limit= (cari nama, NIS, NISN, email)"""
+    return _directory_response(directory.students, classroom_id=request.args.get('classroom_id', type=int))
 
 @admin_bp.route('/students/add', methods=['GET', 'POST'])
 @require_admin
@@ -316,17 +361,7 @@ def add_student():
         db.session.flush()  # supaya dapat user.id
 
         # Generate QR code
-        qr_data = f"STUDENT:{form.nis.data}:{current_user.school_id}"
-        qr = qrcode.QRCode(
-            version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4
-        )
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
+        img_bytes = generate_qr_png(f"STUDENT:{form.nis.data}:{current_user.school_id}")
 
         # Upload QR ke S3
         qr_filename = f"student_{form.nis.data}.png"
@@ -343,19 +378,18 @@ def add_student():
             qr_code=qr_url
         )
         db.session.add(student)
-        db.session.commit()
 
-        # Kirim email via helper
-        try:
-            send_email_task.delay(
-                to_email=user.email,
-                name=student.full_name,
-                username=user.username,
-                password=password
-            )
-            flash('Akun siswa berhasil dibuat dan email terkirim!', 'success')
-        except Exception as e:
-            flash(f'Akun siswa dibuat, tapi gagal kirim email: {str(e)}', 'warning')
+        # Email masuk outbox dalam transaksi yang sama dengan akun
+        outbox.add_login_email(
+            to_email=user.email,
+            name=student.full_name,
+            username=user.username,
+            password=password,
+            school_id=current_user.school_id
+        )
+        db.session.commit()
+        outbox.relay_safely(school_id=current_user.school_id)
+        flash('Akun siswa berhasil dibuat dan email akan segera dikirim!', 'success')
 
         return redirect(url_for('admin.students'))
 
@@ -402,15 +436,7 @@ def edit_student(student_id):
         student.classroom_id = form.classroom_id.data if form.classroom_id.data != 0 else None
 
         # Generate QR baru
-        qr_data = f"STUDENT:{student.nis}:{current_user.school_id}"
-        qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
+        img_bytes = generate_qr_png(f"STUDENT:{student.nis}:{current_user.school_id}")
 
         # Hapus QR lama di S3 kalau ada
         if student.qr_code:
@@ -454,8 +480,7 @@ def delete_student(student_id):
 @admin_bp.route('/students/import', methods=['POST'])
 @require_admin
 def import_students():
-    from utils.s3_helper import upload_file_to_s3
-    import secrets
+    import pandas as pd
 
     if 'file' not in request.files:
         flash('Tidak ada file yang diupload', 'danger')
@@ -516,20 +541,7 @@ def import_students():
                 db.session.flush()
 
                 # Generate QR code
-                qr = qrcode.QRCode(
-                    version=1, 
-                    error_correction=qrcode.constants.ERROR_CORRECT_L, 
-                    box_size=10, 
-                    border=4
-                )
-                qr_data = f"STUDENT:{nis}:{current_user.school_id}"
-                qr.add_data(qr_data)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-
-                qr_bytes = BytesIO()
-                img.save(qr_bytes, format='PNG')
-                qr_bytes.seek(0)
+                qr_bytes = generate_qr_png(f"STUDENT:{nis}:{current_user.school_id}")
 
                 # Upload ke S3
                 qr_filename = f"student_{nis}.png"
@@ -547,26 +559,25 @@ def import_students():
                 )
                 db.session.add(student)
 
-                # Kirim email menggunakan Celery task
-                try:
-                    send_email_task.delay(
-                        to_email=user.email,
-                        name=student.full_name,
-                        username=user.username,
-                        password=password
-                    )
-                except Exception as e:
-                    flash(f'Akun {student.full_name} dibuat, tapi gagal menambahkan tugas pengiriman email: {str(e)}', 'warning')
+                # Email masuk outbox bersama akun, dikirim per batch oleh relay
+                outbox.add_login_email(
+                    to_email=user.email,
+                    name=student.full_name,
+                    username=user.username,
+                    password=password,
+                    school_id=current_user.school_id
+                )
 
                 success_count += 1
 
             except Exception as e:
-                db.session.rollback() # Batalkan transaksi untuk siswa yang gagal
+                db.session.rollback() # Batalkan transaksi untuk siswa yang gagal (termasuk outbox)
                 error_count += 1
                 print(f"Gagal mengimpor siswa dengan NIS {row.get('nis', 'N/A')}: {str(e)}") # Logging error ke konsol server
                 continue
         
         db.session.commit()
+        outbox.relay_safely(school_id=current_user.school_id)
         flash(f'Import selesai: {success_count} siswa berhasil, {error_count} gagal.', 'success')
 
     except Exception as e:
@@ -588,17 +599,18 @@ def reset_password(student_id):
 
     # Update password (hash)
     student.set_password(new_password)
+    # Email reset bersifat interaktif: diprioritaskan di antrian email
+    outbox.add_login_email(
+        to_email=student.email,
+        name=student.username,
+        username=student.username,
+        password=new_password,
+        school_id=student.school_id,
+        interactive=True
+    )
     db.session.commit()
-    try:
-        send_email_task.delay(
-            to_email=student.email,
-            name=student.username,
-            username=student.username,
-            password=new_password
-        )
-        flash("Password berhasil direset dan dikirim ke email siswa.", "success")
-    except Exception as e:
-        flash(f"Gagal mengirim email: {str(e)}", "danger")
+    outbox.relay_safely(school_id=student.school_id)
+    flash("Password berhasil direset dan dikirim ke email siswa.", "success")
 
     return redirect(url_for('admin.students', school_id=student.school_id))
 
@@ -616,17 +628,18 @@ def reset_password_guru(teacher_id):
 
     # Update password (hash)
     teacher.set_password(new_password)
+    # Email reset bersifat interaktif: diprioritaskan di antrian email
+    outbox.add_login_email(
+        to_email=teacher.email,
+        name=teacher.teacher_profile.full_name if teacher.teacher_profile else teacher.username,
+        username=teacher.username,
+        password=new_password,
+        school_id=teacher.school_id,
+        interactive=True
+    )
     db.session.commit()
-    try:
-        send_email_task.delay(
-            to_email=teacher.email,
-            name=teacher.full_name,
-            username=teacher.username,
-            password=new_password
-        )
-        flash("Password berhasil direset dan dikirim ke email guru.", "success")
-    except Exception as e:
-        flash(f"Gagal mengirim email: {str(e)}", "danger")
+    outbox.relay_safely(school_id=teacher.school_id)
+    flash("Password berhasil direset dan dikirim ke email guru.", "success")
 
     return redirect(url_for('admin.teachers'))
 
@@ -688,9 +701,14 @@ def download_template():
 @admin_bp.route('/classrooms')
 @require_admin
 def classrooms():
-    classrooms = Classroom.query.filter_by(school_id=current_user.school_id).all()
-    teachers = Teacher.query.filter_by(school_id=current_user.school_id).all()
-    return render_template('admin/classrooms.html', classrooms=classrooms, teachers=teachers)
+    page = directory.classrooms(current_user.school_id, request.args.get('q'))
+    return render_template('admin/classrooms.html', classrooms=page['items'], next_cursor=page['next_cursor'])
+
+@admin_bp.route('/api/classrooms')
+@require_admin
+def api_classrooms():
+    """Direktori kelas ?q=&cursor=&limit= dengan wali kelas dan jumlah siswa"""
+    return _directory_response(directory.classrooms)
 
 @admin_bp.route('/classrooms/<int:classroom_id>/data')
 @require_admin
@@ -819,6 +837,12 @@ def attendance():
                          selected_date=date.strftime('%Y-%m-%d'),
                          selected_classroom=classroom_id)
 
+@admin_bp.route('/attendance/stream')
+@require_admin
+def attendance_stream():
+    """Server-Sent Events: absensi sekolah ini yang baru dicatat/diubah"""
+    return live_feed.stream_response(current_user.school_id)
+
 @admin_bp.route('/attendance/export')
 @require_admin
 def attendance_export_form():
@@ -834,7 +858,10 @@ def attendance_export_form():
 
 @admin_bp.route('/attendance/export/data')
 @require_admin
+@read_replica
 def attendance_export():
+    import pandas as pd
+
     # Get parameters
     export_type = request.args.get('export_type', 'student')
     month = request.args.get('month', type=int, default=jakarta_now().month)
@@ -959,38 +986,9 @@ def attendance_export():
 @admin_bp.route('/events')
 @require_admin
 def events():
-    events = SchoolEvent.query.filter_by(school_id=current_user.school_id).all()
-    events_json = [
-    {
-        "id": event.id,
-        "title": event.title,
-        "start": event.start_date.isoformat(),
-        "end": event.end_date.isoformat(),
-        "allDay": True,
-        "event_type": event.event_type.value,   # pakai .value karena enum
-        "is_holiday": event.is_holiday
-    }
-    for event in events
-]
+    # Event dimuat kalender lewat admin.api_events sesuai bulan yang tampil
     form = EventForm()
-    return render_template('admin/events.html', events_json=events_json, form=form)
-
-@admin_bp.route('/events/json')
-@require_admin
-def events_json():
-    events = SchoolEvent.query.filter_by(school_id=current_user.school_id).all()
-    return jsonify([
-        {
-            "id": event.id,
-            "title": event.title,
-            "start": event.start_date.isoformat(),
-            "end": event.end_date.isoformat(),
-            "allDay": True,
-            "event_type": event.event_type.value,
-            "is_holiday": event.is_holiday
-        } 
-        for event in events
-    ])
+    return render_template('admin/events.html', form=form)
 
 @admin_bp.route('/events/add', methods=['POST'])
 @require_admin
@@ -1037,7 +1035,7 @@ def edit_event(event_id):
         event.title = title
         event.start_date = datetime.fromisoformat(start_date)
         event.end_date = datetime.fromisoformat(end_date)+timedelta(days=1)  # Tambah 1 hari supaya FullCalendar tampil benar
-        event_type=EventType(event_type_str.upper())
+        event.event_type = EventType(event_type_str.upper())
         event.is_holiday = is_holiday
         db.session.commit()
         return jsonify({"success": True})
@@ -1079,19 +1077,7 @@ def generate_qr():
     
     if not school_qr:
         # Generate QR code baru karena belum ada
-        qr = qrcode.QRCode(
-            version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4
-        )
-        qr_data = f"SCHOOL:{current_user.school_id}"
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Simpan ke memory
-        img_io = BytesIO()
-        img.save(img_io, 'PNG')
-        img_io.seek(0)
+        img_io = generate_qr_png(f"SCHOOL:{current_user.school_id}")
         
         # Upload ke S3
         file_url = upload_file_to_s3(img_io, folder="qr_codes", filename=f"school_{current_user.school_id}.png")
@@ -1104,23 +1090,43 @@ def generate_qr():
     # Render langsung ke template
     return render_template('admin/school_qr.html', school_qr=school_qr)
 
+@admin_bp.route('/api/roster')
+@require_admin
+def api_roster():
+    """Roster JSON sekolah (atau ?classroom_id=), dengan ETag dan delta ?since=<versi>"""
+    classroom_id = request.args.get('classroom_id', type=int)
+    if classroom_id:
+        Classroom.query.filter_by(id=classroom_id, school_id=current_user.school_id).first_or_404()
+    return roster.roster_response(current_user.school_id, classroom_id, request.args.get('since', type=int))
+
+@admin_bp.route('/api/attendance-trend')
+@require_admin
+@read_replica
+def api_attendance_trend():
+    """Tren kehadiran ?days=30|90|365 (atau ?start=&end=), opsional ?classroom_id= dan ?granularity="""
+    today = jakarta_now().date()
+    max_days = current_app.config['ATTENDANCE_TREND_MAX_DAYS']
+    try:
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else today
+        start = (date.fromisoformat(request.args['start']) if request.args.get('start')
+                 else end - timedelta(days=request.args.get('days', 30, type=int) - 1))
+    except ValueError:
+        return jsonify({'error': 'Format tanggal harus YYYY-MM-DD'}), 400
+    if start > end or (end - start).days >= max_days:
+        return jsonify({'error': f'Rentang harus antara 1 dan {max_days} hari'}), 400
+
+    classroom_id = request.args.get('classroom_id', type=int)
+    if classroom_id:
+        Classroom.query.filter_by(id=classroom_id, school_id=current_user.school_id).first_or_404()
+    return attendance_trends.trend_response(
+        current_user.school_id, start, end, classroom_id, request.args.get('granularity')
+    )
+
+@admin_bp.route('/events/json')  # URL lama, tetap dilayani
 @admin_bp.route('/api/events')
 @require_admin
 def api_events():
-    events = SchoolEvent.query.filter_by(school_id=current_user.school_id).all()
-    
-    events_data = []
-    for event in events:
-        events_data.append({
-            'title': event.title,
-            'start': event.start_date.isoformat(),
-            'end': event.end_date.isoformat(),
-            'description': event.description,
-            'type': event.event_type.value,
-            'extendedProps': {
-                'description': event.description,
-                'type': event.event_type.value
-            }
-        })
-    
-    return jsonify(events_data)
\ No newline at end of file
+    """Event kalender dalam rentang ?start=&end= (FullCalendar), dengan ETag per versi event"""
+    return school_events.events_response(
+        current_user.school_id, request.args.get('start'), request.args.get('end')
+    )
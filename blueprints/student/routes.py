@@ -3,6 +3,7 @@ from flask_login import login_required, current_user
 from utils.timezone import datetime
 from datetime import timedelta
 from extensions import db
+from utils.db_routing import read_replica
 from models import User, UserRole, Student, Attendance
 from . import student_bp
 import os
@@ -49,6 +50,7 @@ def dashboard():
                          status_count=status_count)
 
 @student_bp.route('/attendance')
+@read_replica
 def attendance():
     student = Student.query.filter_by(user_id=current_user.id).first()
     if not student:
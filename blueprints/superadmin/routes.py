@@ -1,12 +1,12 @@
 from random import random
 import string
-from flask import jsonify, render_template, redirect, url_for, flash, request
+from flask import current_app, jsonify, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from functools import wraps
 from werkzeug.security import generate_password_hash
-from blueprints import admin
 from extensions import db
-from models import User, UserRole, School, Teacher, Student
+from utils import onboarding, school_deletion, tenant_export, tenant_overview
+from models import User, UserRole, School, SchoolDeletion, Teacher, Student
 from utils.sendgrid_helper import send_login_email
 from . import superadmin_bp
 from .forms import AdminRegistrationForm, SchoolForm
@@ -21,36 +21,36 @@ def require_superadmin(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Tanpa read_replica: hasilnya di-cache tenant_overview, dan isi cache
+# pertama setelah invalidate() harus dari primary (replica bisa tertinggal)
 @superadmin_bp.route('/dashboard')
 @require_superadmin
 def dashboard():
-    schools = School.query.order_by(School.created_at.desc()).all()
-    admin_count = User.query.filter(User.role == UserRole.ADMIN).count()
-    
-    # Hitung sekolah per bulan
-    month_labels = ['Jan','Feb','Mar','Apr','Mei','Jun','Jul','Agu','Sep','Okt','Nov','Des']
-    month_counts = [0]*12
-    for school in schools:
-        month_index = school.created_at.month - 1
-        month_counts[month_index] += 1
-    
+    summary = tenant_overview.summary()
     return render_template(
         'superadmin/dashboard.html',
-        schools=schools,
-        admin_count=admin_count,
-        month_labels=month_labels,
-        month_counts=month_counts
+        summary=summary,
+        schools=summary['recent'],
+        admin_count=summary['admin_count'],
+        month_labels=['Jan','Feb','Mar','Apr','Mei','Jun','Jul','Agu','Sep','Okt','Nov','Des'],
+        month_counts=summary['month_counts']
     )
 
 @superadmin_bp.route('/schools')
 @require_superadmin
 def schools():
-    schools = School.query.all()
+    overview = tenant_overview.page(
+        number=request.args.get('page', 1, type=int),
+        per_page=current_app.config['TENANT_OVERVIEW_PER_PAGE'],
+        search=request.args.get('q', '')[:100],
+        status=request.args.get('status')
+    )
     return render_template(
-    'superadmin/schools.html',
-    schools=schools,
-    UserRole=UserRole
-)
+        'superadmin/schools.html',
+        schools=overview['items'],
+        overview=overview,
+        import_id=request.args.get('import_id', type=int)
+    )
 
 @superadmin_bp.route('/schools/add', methods=['GET', 'POST'])
 @require_superadmin
@@ -100,8 +100,6 @@ def add_school():
             )
             db.session.add(school)
             db.session.flush()
-            print(admin_form.email.data)
-            print(form.email.data)
             # Buat admin user untuk sekolah
             admin_user = User(
                 school_id=school.id,
@@ -113,6 +111,7 @@ def add_school():
             db.session.add(admin_user)
 
             db.session.commit()
+            tenant_overview.invalidate()
 
             flash('Sekolah dan admin berhasil ditambahkan!', 'success')
             return redirect(url_for('superadmin.schools'))
@@ -120,6 +119,44 @@ def add_school():
     # Untuk request GET atau jika validasi gagal
     return render_template('superadmin/add_school.html', form=form, admin_form=admin_form)
 
+@superadmin_bp.route('/schools/import', methods=['POST'])
+@require_superadmin
+def import_schools():
+    file = request.files.get('file')
+    if not file or file.filename == '':
+        flash('Tidak ada file yang dipilih', 'danger')
+        return redirect(url_for('superadmin.schools'))
+
+    try:
+        rows = onboarding.read_sheet(file)
+    except Exception as e:
+        flash(f'Terjadi error saat membaca file: {str(e)}', 'danger')
+        return redirect(url_for('superadmin.schools'))
+    if not rows:
+        flash('File tidak berisi baris data', 'warning')
+        return redirect(url_for('superadmin.schools'))
+
+    # Validasi dan pembuatan sekolah berjalan di worker import
+    from tasks import import_schools_task
+    school_import = onboarding.request_import(
+        rows,
+        filename=file.filename[:255],
+        dry_run=bool(request.form.get('dry_run')),
+        skip_invalid=bool(request.form.get('skip_invalid')),
+        requested_by=current_user.id
+    )
+    import_schools_task.delay(school_import.id)
+    flash(f'{len(rows)} baris sedang diproses di latar belakang.', 'info')
+    return redirect(url_for('superadmin.schools', import_id=school_import.id))
+
+@superadmin_bp.route('/schools/import/<int:import_id>')
+@require_superadmin
+def import_status(import_id):
+    status = onboarding.get_status(import_id)
+    if status is None:
+        return {"success": False, "message": "Import tidak ditemukan"}, 404
+    return jsonify(status)
+
 @superadmin_bp.route('/schools/<int:school_id>/edit', methods=['GET', 'POST'])
 @require_superadmin
 def edit_school(school_id):
@@ -131,6 +168,7 @@ def edit_school(school_id):
     if form.validate_on_submit():
         form.populate_obj(school)
         db.session.commit()
+        tenant_overview.invalidate()
         
         flash('Data sekolah berhasil diperbarui!', 'success')
         return redirect(url_for('superadmin.schools'))
@@ -148,16 +186,60 @@ def edit_school(school_id):
 @require_superadmin
 def delete_school(school_id):
     school = School.query.get_or_404(school_id)
-    
-    # Delete all related data (users, teachers, students, etc.)
-    User.query.filter_by(school_id=school_id).delete()
-    
-    db.session.delete(school)
-    db.session.commit()
-    
-    flash('Sekolah berhasil dihapus!', 'success')
+
+    # Sekolah langsung dinonaktifkan; data dihapus bertahap oleh worker
+    school_deletion.request_deletion(school, requested_by=current_user.id)
+    tenant_overview.invalidate()
+
+    flash('Sekolah dinonaktifkan dan sedang dihapus di latar belakang.', 'success')
     return redirect(url_for('superadmin.schools'))
 
+@superadmin_bp.route('/deletions/<int:deletion_id>')
+@require_superadmin
+def deletion_status(deletion_id):
+    deletion = SchoolDeletion.query.get_or_404(deletion_id)
+    return jsonify(school_deletion.progress(deletion))
+
+@superadmin_bp.route('/deletions/<int:deletion_id>/retry', methods=['POST'])
+@require_superadmin
+def retry_deletion(deletion_id):
+    deletion = SchoolDeletion.query.get_or_404(deletion_id)
+    if deletion.status != school_deletion.FAILED:
+        return {"success": False, "message": "Penghapusan tidak dalam status gagal"}, 400
+    school_deletion.retry(deletion)
+    tenant_overview.invalidate()
+    return {"success": True, "message": "Penghapusan sekolah dilanjutkan"}
+
+@superadmin_bp.route('/schools/<int:school_id>/export', methods=['POST'])
+@require_superadmin
+def export_school(school_id):
+    school = School.query.get_or_404(school_id)
+    fmt = request.form.get('format') or current_app.config['TENANT_EXPORT_FORMAT']
+    if fmt not in tenant_export.FORMATS:
+        return {"success": False, "message": f"Format {fmt} tidak dikenal"}, 400
+
+    from tasks import export_tenant_task
+    export = tenant_export.request_export(school.id, fmt, requested_by=current_user.id)
+    export_tenant_task.delay(school.id, fmt, export.id)
+    return {"success": True, "message": "Export sedang diproses di latar belakang"}, 202
+
+@superadmin_bp.route('/schools/<int:school_id>/export')
+@require_superadmin
+def export_school_status(school_id):
+    school = School.query.get_or_404(school_id)
+    status = tenant_export.get_status(school.id) or {'school_id': school.id, 'status': None}
+    manifest = status.get('manifest')
+    if status['status'] == tenant_export.DONE and manifest:
+        from utils.s3_helper import generate_presigned_url
+        locations = {name: info['location'] for name, info in manifest['datasets'].items()}
+        locations['manifest'] = manifest['location']
+        # Link unduhan sementara; objek di bucket privat tidak bisa dibuka langsung
+        status['downloads'] = {
+            name: generate_presigned_url(location) if location.startswith('s3://') else location
+            for name, location in locations.items()
+        }
+    return jsonify(status)
+
 @superadmin_bp.route('/schools/<int:school_id>/add-admin', methods=['POST'])
 @require_superadmin
 def add_admin(school_id):
@@ -191,6 +273,7 @@ def add_admin(school_id):
 
     db.session.add(new_admin)
     db.session.commit()
+    tenant_overview.invalidate()
 
     return {"success": True, "message": "Admin berhasil ditambahkan"}
 
@@ -202,9 +285,12 @@ def toggle_school_status(school_id):
     
     if 'is_active' not in data:
         return {"success": False, "message": "Data status tidak ada"}, 400
+    if data['is_active'] and school_deletion.active_deletion(school.id):
+        return {"success": False, "message": "Sekolah sedang dihapus dan tidak bisa diaktifkan"}, 400
 
     school.is_active = bool(data['is_active'])
     db.session.commit()
+    tenant_overview.invalidate()
 
     status_text = "aktif" if school.is_active else "nonaktif"
     return {"success": True, "message": f"Sekolah berhasil {status_text}kan"}
@@ -1,9 +1,11 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import current_app, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
-from models import AttendanceStatus, SchoolEvent, TeacherAttendance, User, UserRole, Teacher, Student, Classroom, Attendance, SchoolQRCode, jakarta_now
+from models import AttendanceStatus, SchoolEvent, TeacherAttendance, User, UserRole, Teacher, Student, Classroom, Attendance, SchoolQRCode, jakarta_now, jakarta_now_naive
 from extensions import db,cache
+from utils.db_routing import read_replica
 from . import teacher_bp
 from .forms import AttendanceForm
+from utils import metrics, roster, scan_sync
 import re
     
 @teacher_bp.before_request
@@ -303,12 +305,15 @@ def process_scan():
         return jsonify({'success': False, 'message': 'Data guru tidak ditemukan'})
     
     if qr_info['type'] == 'STUDENT':
-        return process_student_qr(qr_info, teacher, manual_status, manual_notes)
+        response = process_student_qr(qr_info, teacher, manual_status, manual_notes)
     elif qr_info['type'] == 'SCHOOL':
-        return process_school_qr(qr_info, teacher)
+        response = process_school_qr(qr_info, teacher)
     else:
         return jsonify({'success': False, 'message': 'Jenis QR code tidak dikenali'})
 
+    metrics.record_scan(current_user.school_id, qr_info['type'], response.get_json().get('success'))
+    return response
+
 def process_student_qr(qr_info, teacher, status='hadir', notes=''):
     """Process student QR code for attendance"""
     try:
@@ -456,6 +461,66 @@ def process_school_qr(qr_info, teacher):
             'message': f'Error memproses absensi guru: {str(e)}'
         })
 
+@teacher_bp.route('/scan/sync', methods=['POST'])
+def sync_scans():
+    """
+    Terima batch scan dari antrian offline scanner. Aman dikirim ulang:
+    hasil per client_id selalu sama (lihat utils/scan_sync.py).
+    """
+    data = request.get_json(silent=True) or {}
+    scans = data.get('scans')
+    if not isinstance(scans, list):
+        return jsonify({'success': False, 'message': 'Data tidak valid'}), 400
+    max_batch = current_app.config['SCAN_SYNC_MAX_BATCH']
+    if len(scans) > max_batch:
+        return jsonify({'success': False, 'message': f'Maksimal {max_batch} scan per sync'}), 413
+
+    teacher = Teacher.query.filter_by(user_id=current_user.id).first()
+    if not teacher:
+        return jsonify({'success': False, 'message': 'Data guru tidak ditemukan'}), 403
+
+    entries = []
+    for item in scans:
+        if not isinstance(item, dict):
+            continue
+        client_id = str(item.get('client_id') or '').strip()[:64]
+        if not client_id:
+            continue
+        entry = {
+            'client_id': client_id,
+            'scanned_at': scan_sync.parse_scanned_at(item.get('scanned_at')),
+            'status': item.get('status') or 'hadir',
+            'notes': (item.get('notes') or '').strip(),
+        }
+        qr_info, error = validate_qr_format(item.get('qr_data'))
+        if entry['scanned_at'] is None:
+            entry['scanned_at'] = jakarta_now_naive()
+            error = error or 'Waktu scan tidak valid'
+        if not error and qr_info['type'] != 'STUDENT':
+            error = 'Hanya QR siswa yang bisa dikirim lewat antrian offline'
+        if not error and qr_info['school_id'] != current_user.school_id:
+            error = f'QR code tidak valid untuk sekolah ini (School ID: {qr_info["school_id"]})'
+        if error:
+            entry['error'] = error
+        else:
+            entry['nis'] = qr_info['nis']
+        entries.append(entry)
+
+    if not entries:
+        return jsonify({'success': True, 'results': []})
+
+    device_id = str(data.get('device_id') or '')[:64] or None
+    results = scan_sync.apply_scans(current_user.school_id, teacher.id, device_id, entries)
+    return jsonify({'success': True, 'results': results})
+
+@teacher_bp.route('/api/roster')
+def api_roster():
+    """Roster JSON sekolah (atau ?classroom_id=), dengan ETag dan delta ?since=<versi>"""
+    classroom_id = request.args.get('classroom_id', type=int)
+    if classroom_id:
+        Classroom.query.filter_by(id=classroom_id, school_id=current_user.school_id).first_or_404()
+    return roster.roster_response(current_user.school_id, classroom_id, request.args.get('since', type=int))
+
 @teacher_bp.route('/scan/validate', methods=['POST'])
 def validate_qr():
     """Validate QR code without processing attendance"""
@@ -500,6 +565,7 @@ def validate_qr():
     return jsonify({'valid': False, 'message': 'Jenis QR tidak dikenali'})
 
 @teacher_bp.route('/my_attendance')
+@read_replica
 def my_attendance():
     teacher = Teacher.query.filter_by(user_id=current_user.id).first()
     
@@ -1,16 +1,9 @@
 # celery_worker.py
 import os
 from factory import create_app
-from celery import Celery
+from extensions import celery
 
-# Buat instance aplikasi Flask
-flask_app = create_app(os.getenv('FLASK_CONFIG') or 'default')
-# Inisialisasi Celery
-celery = Celery(flask_app.import_name, broker=flask_app.config['CELERY_BROKER_URL'])
-celery.conf.update(flask_app.config)
-class ContextTask(celery.Task):
-    def __call__(self, *args, **kwargs):
-        with flask_app.app_context():
-            return self.run(*args, **kwargs)
+# Aplikasi Flask ringan khusus worker (tanpa blueprint dan route web)
+flask_app = create_app(os.getenv('FLASK_CONFIG') or 'default', worker=True)
 
-celery.Task = ContextTask
\ No newline at end of file
+import tasks  # noqa: E402,F401  registrasi task ke instance Celery
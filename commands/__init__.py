@@ -0,0 +1,19 @@
+from .generate import generate_data_command
+from .outbox import relay_outbox_command
+from .partitions import attendance_partitions_command
+from .tenant_export import export_tenant_command
+from .onboarding import onboard_schools_command
+from .auto_alpha import auto_alpha_command
+from .attendance_analytics import attendance_analytics_command
+from .attendance_rollup import attendance_rollup_command
+
+# Register all CLI commands
+def init_app(app):
+    app.cli.add_command(generate_data_command)
+    app.cli.add_command(relay_outbox_command)
+    app.cli.add_command(attendance_partitions_command)
+    app.cli.add_command(export_tenant_command)
+    app.cli.add_command(onboard_schools_command)
+    app.cli.add_command(auto_alpha_command)
+    app.cli.add_command(attendance_analytics_command)
+    app.cli.add_command(attendance_rollup_command)
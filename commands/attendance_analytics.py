@@ -0,0 +1,20 @@
+import click
+from flask.cli import with_appcontext
+from models import School
+from utils import attendance_analytics
+
+
+@click.command('attendance-analytics')
+@click.option('--school-id', type=int, default=None, help='Hanya satu sekolah')
+@with_appcontext
+def attendance_analytics_command(school_id):
+    """Hitung ulang analitik kehadiran dan daftar siswa berisiko."""
+    query = School.query.filter(School.is_active.is_(True))
+    if school_id:
+        query = query.filter(School.id == school_id)
+    school_ids = [school.id for school in query.order_by(School.id)]
+    if not school_ids:
+        raise click.ClickException('Tidak ada sekolah aktif yang cocok.')
+    for school_id in school_ids:
+        result = attendance_analytics.refresh_school(school_id)
+        click.echo(f"Sekolah {school_id}: {result['students']} siswa, {result['at_risk']} berisiko")
@@ -0,0 +1,12 @@
+import click
+from flask.cli import with_appcontext
+from utils import attendance_trends
+
+
+@click.command('attendance-rollup')
+@click.option('--days', type=int, default=0, help='Jumlah hari sebelum hari ini yang ikut direkap ulang')
+@with_appcontext
+def attendance_rollup_command(days):
+    """Bangun ulang rekap absensi harian untuk grafik tren (mis. --days 365 untuk riwayat)."""
+    rows = attendance_trends.rollup_recent(days)
+    click.echo(f"{rows:,} baris rekap dibuat untuk {days + 1} hari terakhir")
@@ -0,0 +1,38 @@
+import click
+from datetime import timedelta
+from flask.cli import with_appcontext
+from models import School, jakarta_now
+from utils import auto_alpha
+
+
+@click.command('auto-alpha')
+@click.option('--date', 'day', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Tanggal yang diproses (default kemarin)')
+@click.option('--school-id', type=int, default=None, help='Hanya satu sekolah')
+@with_appcontext
+def auto_alpha_command(day, school_id):
+    """Catat ALPHA untuk siswa yang belum absen (mis. mengisi hari yang terlewat)."""
+    now = jakarta_now()
+    today = now.date()
+    day = day.date() if day else today - timedelta(days=1)
+    if day > today:
+        raise click.BadParameter('Tanggal tidak boleh di masa depan.', param_hint='--date')
+    query = School.query.filter(School.is_active.is_(True))
+    if school_id:
+        query = query.filter(School.id == school_id)
+    schools = [(school.id, school.auto_alpha_cutoff) for school in query.order_by(School.id)]
+    if not schools:
+        raise click.ClickException('Tidak ada sekolah aktif yang cocok.')
+    total = 0
+    for school_id, cutoff in schools:
+        # Hari ini hanya untuk sekolah yang sudah lewat batas jam, sama seperti beat
+        if day == today and now.time() < (cutoff or auto_alpha.default_cutoff()):
+            click.echo(f"Sekolah {school_id}: dilewati (belum lewat batas jam)")
+            continue
+        created = auto_alpha.mark_absent(school_id, day, force=day < today)
+        if created is None:
+            click.echo(f"Sekolah {school_id}: dilewati (sudah diproses atau bukan hari sekolah)")
+        else:
+            total += created
+            click.echo(f"Sekolah {school_id}: {created} siswa dicatat ALPHA")
+    click.echo(f"Selesai: {total} baris ALPHA untuk {day.isoformat()}")
@@ -0,0 +1,30 @@
+import click
+from flask.cli import with_appcontext
+from utils import onboarding
+
+
+@click.command('onboard-schools')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='Cek bentrokan dan format saja, tanpa membuat data')
+@click.option('--skip-invalid', is_flag=True, help='Tetap buat baris yang valid meski ada baris error')
+@click.option('--no-email', is_flag=True, help='Jangan kirim email login ke admin')
+@click.option('--batch-size', type=int, default=None, help='Sekolah per transaksi (default ONBOARDING_BATCH_SIZE)')
+@with_appcontext
+def onboard_schools_command(file, dry_run, skip_invalid, no_email, batch_size):
+    """Buat banyak sekolah, langganan, admin dan QR sekolah dari FILE (CSV/Excel)."""
+    try:
+        rows = onboarding.read_sheet(file)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    result = onboarding.onboard(rows, dry_run=dry_run, skip_invalid=skip_invalid,
+                                send_email=not no_email, batch_size=batch_size)
+    for error in result['errors']:
+        click.echo(f"Baris {error['row'] or '-'}: {error['message']}", err=True)
+    if dry_run:
+        click.echo(f"{result['valid']} dari {result['total']} baris valid (dry-run, tidak ada data dibuat)")
+    elif result['errors'] and not result['created'] and not skip_invalid:
+        raise click.ClickException('Tidak ada sekolah yang dibuat; perbaiki error atau pakai --skip-invalid')
+    else:
+        for school in result['created']:
+            click.echo(f"{school['code']:<20}{school['name']}")
+        click.echo(f"{len(result['created'])} sekolah dibuat")
@@ -0,0 +1,13 @@
+import click
+from flask.cli import with_appcontext
+from utils import outbox
+
+
+@click.command('relay-outbox')
+@click.option('--school-id', type=int, default=None, help='Hanya relay email milik sekolah ini')
+@click.option('--limit', type=int, default=None, help='Jumlah baris maksimal (default OUTBOX_RELAY_LIMIT)')
+@with_appcontext
+def relay_outbox_command(school_id, limit):
+    """Kirim email outbox yang belum masuk antrian Celery (tanpa menunggu beat)."""
+    dispatched = outbox.relay(school_id=school_id, limit=limit)
+    click.echo(f'{dispatched} email dimasukkan ke antrian')
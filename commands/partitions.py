@@ -0,0 +1,65 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from extensions import db
+from utils import partitions
+
+
+@click.group('attendance-partitions')
+def attendance_partitions_command():
+    """Kelola partisi bulanan tabel attendances (PostgreSQL)."""
+
+
+def _require_partitioned():
+    with db.engine.connect() as connection:
+        if not partitions.is_partitioned(connection):
+            raise click.ClickException('Tabel attendances belum dipartisi (hanya PostgreSQL setelah migration).')
+
+
+@attendance_partitions_command.command('list')
+@with_appcontext
+def list_command():
+    """Tampilkan partisi beserta ukurannya."""
+    _require_partitioned()
+    with db.engine.connect() as connection:
+        for p in partitions.list_partitions(connection):
+            click.echo(f"{p['name']:<28}{p['size_bytes'] / 1024 / 1024:>10.1f} MB  {p['bound']}")
+
+
+@attendance_partitions_command.command('create')
+@click.option('--months-ahead', type=int, default=None,
+              help='Jumlah bulan ke depan (default ATTENDANCE_PARTITION_MONTHS_AHEAD)')
+@with_appcontext
+def create_command(months_ahead):
+    """Buat partisi bulan berjalan dan bulan-bulan berikutnya."""
+    _require_partitioned()
+    months_ahead = months_ahead if months_ahead is not None else current_app.config['ATTENDANCE_PARTITION_MONTHS_AHEAD']
+    created = partitions.ensure_partitions(months_ahead=months_ahead)
+    click.echo(f"{len(created)} partisi dibuat{': ' + ', '.join(created) if created else ''}")
+
+
+@attendance_partitions_command.command('archive')
+@click.option('--older-than', 'older_than', type=int, default=None,
+              help='Arsipkan partisi lebih tua dari N bulan (default ATTENDANCE_ARCHIVE_AFTER_MONTHS)')
+@click.option('--output-dir', type=click.Path(file_okay=False), default=None,
+              help='Simpan arsip ke direktori lokal, bukan S3')
+@click.option('--keep-table', is_flag=True, help='Jangan DROP tabel setelah diarsipkan (hanya detach)')
+@click.option('--dry-run', is_flag=True, help='Tampilkan partisi yang akan diarsipkan saja')
+@with_appcontext
+def archive_command(older_than, output_dir, keep_table, dry_run):
+    """Simpan partisi lama sebagai CSV gzip, lalu detach dan hapus dari database."""
+    _require_partitioned()
+    older_than = older_than if older_than is not None else current_app.config['ATTENDANCE_ARCHIVE_AFTER_MONTHS']
+    candidates = partitions.archivable_partitions(older_than)
+    if not candidates:
+        click.echo('Tidak ada partisi untuk diarsipkan.')
+        return
+    for p in candidates:
+        if dry_run:
+            click.echo(f"[dry-run] {p['name']} ({p['size_bytes'] / 1024 / 1024:.1f} MB)")
+            continue
+        result = partitions.archive_partition(
+            p['name'], prefix=current_app.config['ATTENDANCE_ARCHIVE_PREFIX'],
+            output_dir=output_dir, keep_table=keep_table
+        )
+        click.echo(f"{result['name']}: {result['rows']:,} baris -> {result['location']}")
@@ -0,0 +1,28 @@
+import click
+from flask.cli import with_appcontext
+from models import School
+from utils import tenant_export
+
+
+@click.command('export-tenant')
+@click.argument('school')
+@click.option('--format', 'fmt', type=click.Choice(tenant_export.FORMATS), default=None,
+              help='Format file (default TENANT_EXPORT_FORMAT)')
+@click.option('--output-dir', type=click.Path(file_okay=False), default=None,
+              help='Simpan ke direktori lokal, bukan S3')
+@click.option('--chunk-size', type=int, default=None,
+              help='Baris per chunk cursor (default TENANT_EXPORT_CHUNK_SIZE)')
+@with_appcontext
+def export_tenant_command(school, fmt, output_dir, chunk_size):
+    """Export siswa, kelas, guru, event dan riwayat absensi SCHOOL (id atau kode)."""
+    query = School.query.filter(School.code == school)
+    found = query.first() or (School.query.get(int(school)) if school.isdigit() else None)
+    if found is None:
+        raise click.ClickException(f'Sekolah {school} tidak ditemukan')
+    try:
+        manifest = tenant_export.export_school(found.id, fmt=fmt, output_dir=output_dir, chunk_size=chunk_size)
+    except ImportError:
+        raise click.ClickException('Format parquet membutuhkan pyarrow; pasang pyarrow atau pakai --format csv')
+    for name, info in manifest['datasets'].items():
+        click.echo(f"{name:<22}{info['rows']:>12,} baris  {info['seconds']:>7.2f}s  {info['location']}")
+    click.echo(f"Selesai dalam {manifest['seconds']:.2f}s, manifest: {manifest['location']}")
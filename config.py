@@ -14,15 +14,209 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'postgresql://localhost/hubsensi'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_recycle': 300,
-        'pool_pre_ping': True,
         # Add timezone configuration for PostgreSQL
         'connect_args': {
             'options': '-c timezone=Asia/Jakarta'
         }
     }
+
+    # Profil connection pool (lihat utils/db_pool.py). Profil dipilih otomatis
+    # per jenis proses, atau dipaksa lewat DB_POOL_PROFILE=web|worker|cli.
+    # Total koneksi web = WEB_CONCURRENCY x (GUNICORN_THREADS + overflow).
+    DB_POOL_PROFILE = os.environ.get('DB_POOL_PROFILE')
+    DB_POOL_PROFILES = {
+        'web': {
+            'pool_size': int(os.environ.get('GUNICORN_THREADS', '1')),
+            'max_overflow': int(os.environ.get('WEB_DB_MAX_OVERFLOW', '2')),
+            'pool_timeout': 10
+        },
+        'worker': {'pool_size': 1, 'max_overflow': 1, 'pool_timeout': 30},
+        'cli': {'pool_size': 1, 'max_overflow': 2, 'pool_timeout': 30},
+    }
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', '300'))
+    # Pre-ping menambah satu round trip per checkout; koneksi mati sudah
+    # terdeteksi lewat TCP keepalive dan pool_recycle
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'False').lower() == 'true'
+    # Mode PgBouncer (transaction pooling): NullPool, tanpa prepared statement
+    DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'False').lower() == 'true'
+    # Read replica opsional untuk endpoint baca (export, dashboard, riwayat).
+    # Tanpa DATABASE_REPLICA_URL semua query tetap ke primary.
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {
+        'replica': {
+            'url': DATABASE_REPLICA_URL,
+            'connect_args': {
+                'options': '-c timezone=Asia/Jakarta',
+                'connect_timeout': 2
+            }
+        }
+    } if DATABASE_REPLICA_URL else {}
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', '10'))
+    REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL', '5'))
     CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'SimpleCache'
     CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    # Socket timeout Redis cache: request (dan health check) tidak menggantung
+    # saat Redis hang. SimpleCache tidak menerima opsi ini.
+    CACHE_SOCKET_TIMEOUT = float(os.environ.get('CACHE_SOCKET_TIMEOUT', '1'))
+    CACHE_OPTIONS = {
+        'socket_connect_timeout': CACHE_SOCKET_TIMEOUT,
+        'socket_timeout': CACHE_SOCKET_TIMEOUT
+    } if 'redis' in CACHE_TYPE.lower() else None
+
+    # Celery config
+    CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL') or os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
+    CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND')
+
+    # Antrian Celery. Task diarahkan per nama (task baru cukup memakai
+    # prefix yang sesuai), lalu tiap antrian dilayani worker sendiri di Procfile.
+    # Job terjadwal yang berat (hapus sekolah, analitik, rekap, ALPHA otomatis)
+    # masuk antrian maintenance agar tidak menahan worker email.
+    CELERY_QUEUES = ('default', 'email', 'import', 'export', 'render', 'maintenance')
+    CELERY_TASK_ROUTES = {
+        'tasks.send_email_*': {'queue': 'email'},
+        'tasks.relay_outbox_task': {'queue': 'email'},
+        'tasks.import_*': {'queue': 'import'},
+        'tasks.export_*': {'queue': 'export'},
+        'tasks.render_*': {'queue': 'render'},
+        'tasks.delete_school_task': {'queue': 'maintenance'},
+        'tasks.resume_school_deletions_task': {'queue': 'maintenance'},
+        'tasks.auto_alpha_*': {'queue': 'maintenance'},
+        'tasks.*attendance_analytics*': {'queue': 'maintenance'},
+        'tasks.rollup_attendance_task': {'queue': 'maintenance'},
+        'tasks.ensure_attendance_partitions_task': {'queue': 'maintenance'},
+        'tasks.prune_*': {'queue': 'maintenance'},
+    }
+    # Rate limit berlaku per worker node. Satu batch berisi hingga 500 email
+    # (batas endpoint batch Postmark), jadi batch dibatasi jauh lebih ketat.
+    EMAIL_RATE_LIMIT = os.environ.get('EMAIL_RATE_LIMIT') or '10/s'
+    EMAIL_BATCH_RATE_LIMIT = os.environ.get('EMAIL_BATCH_RATE_LIMIT') or '20/m'
+
+    # Outbox email: interval relay periodik (celery beat), jumlah baris per
+    # relay, dan umur baris queued/sending yang dianggap macet
+    OUTBOX_RELAY_INTERVAL = float(os.environ.get('OUTBOX_RELAY_INTERVAL', '10'))
+    OUTBOX_RELAY_LIMIT = int(os.environ.get('OUTBOX_RELAY_LIMIT', '5000'))
+    OUTBOX_STALE_SECONDS = int(os.environ.get('OUTBOX_STALE_SECONDS', '900'))
+
+    # Live feed absensi (SSE + Redis pub/sub). Satu stream menahan satu
+    # thread gunicorn, jadi batas stream per proses diambil dari sebagian
+    # GUNICORN_THREADS (0 = live feed mati, halaman tetap bisa di-refresh).
+    # Default nonaktif bila tidak ada slot stream (GUNICORN_THREADS < 2), agar
+    # halaman tidak membuka EventSource yang selalu 503 dan commit tidak
+    # publish ke Redis tanpa pendengar.
+    LIVE_FEED_REDIS_URL = os.environ.get('LIVE_FEED_REDIS_URL') or os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
+    LIVE_FEED_MAX_STREAMS = int(os.environ.get('LIVE_FEED_MAX_STREAMS', int(os.environ.get('GUNICORN_THREADS', '1')) // 2))
+    LIVE_FEED_ENABLED = os.environ.get(
+        'LIVE_FEED_ENABLED', 'true' if LIVE_FEED_MAX_STREAMS > 0 else 'false'
+    ).lower() == 'true'
+    LIVE_FEED_HEARTBEAT_SECONDS = float(os.environ.get('LIVE_FEED_HEARTBEAT_SECONDS', '15'))
+    LIVE_FEED_MAX_SECONDS = float(os.environ.get('LIVE_FEED_MAX_SECONDS', '300'))
+    # Jeda sebelum klien menyambung ulang / mencoba lagi setelah 503
+    LIVE_FEED_RETRY_AFTER = int(os.environ.get('LIVE_FEED_RETRY_AFTER', '30'))
+    # Jeda publish setelah Redis gagal, agar request tidak tertahan timeout
+    LIVE_FEED_RETRY_SECONDS = float(os.environ.get('LIVE_FEED_RETRY_SECONDS', '10'))
+    # Lebih dari ini per commit dikirim sebagai satu event 'refresh'
+    LIVE_FEED_MAX_BATCH = int(os.environ.get('LIVE_FEED_MAX_BATCH', '200'))
+
+    # Sync scan offline dari scanner guru: ukuran batch, umur scan terlambat
+    # yang masih diterima, toleransi jam perangkat, dan retensi tanda terima
+    # (harus lebih lama dari umur scan agar kiriman ulang tetap idempotent)
+    SCAN_SYNC_MAX_BATCH = int(os.environ.get('SCAN_SYNC_MAX_BATCH', '200'))
+    SCAN_SYNC_MAX_AGE_DAYS = int(os.environ.get('SCAN_SYNC_MAX_AGE_DAYS', '7'))
+    SCAN_SYNC_CLOCK_SKEW_SECONDS = int(os.environ.get('SCAN_SYNC_CLOCK_SKEW_SECONDS', '300'))
+    SCAN_RECEIPT_RETENTION_DAYS = int(os.environ.get('SCAN_RECEIPT_RETENTION_DAYS', '30'))
+
+    # API roster: lama cache body per versi, dan umur log perubahan untuk
+    # mode delta (klien yang lebih tertinggal mendapat snapshot penuh)
+    ROSTER_CACHE_SECONDS = int(os.environ.get('ROSTER_CACHE_SECONDS', '300'))
+    ROSTER_CHANGES_RETENTION_DAYS = int(os.environ.get('ROSTER_CHANGES_RETENTION_DAYS', '30'))
+
+    # API event kalender: lama cache body per versi event dan rentang
+    EVENTS_CACHE_SECONDS = int(os.environ.get('EVENTS_CACHE_SECONDS', '300'))
+
+    # Kalender hari sekolah: hari akhir pekan (0=Senin ... 6=Minggu) dan
+    # lama cache bitmap per versi event
+    SCHOOL_WEEKEND_DAYS = [int(d) for d in os.environ.get('SCHOOL_WEEKEND_DAYS', '5,6').split(',') if d.strip()]
+    SCHOOL_CALENDAR_CACHE_SECONDS = int(os.environ.get('SCHOOL_CALENDAR_CACHE_SECONDS', '86400'))
+
+    # ALPHA otomatis: siswa tanpa absensi setelah jam pulang sekolah (default
+    # bila sekolah tidak mengatur sendiri) dicatat ALPHA; beat mengecek
+    # sekolah yang sudah lewat batas setiap AUTO_ALPHA_INTERVAL detik.
+    # Nonaktif kecuali dinyalakan eksplisit
+    AUTO_ALPHA_ENABLED = os.environ.get('AUTO_ALPHA_ENABLED', 'false').lower() == 'true'
+    AUTO_ALPHA_CUTOFF = os.environ.get('AUTO_ALPHA_CUTOFF', '16:00')
+    AUTO_ALPHA_INTERVAL = float(os.environ.get('AUTO_ALPHA_INTERVAL', '900'))
+
+    # Analitik kehadiran (dihitung ulang setiap malam): jendela hari kalender,
+    # minimal hari teramati sebelum dinilai, dan ambang siswa berisiko
+    ANALYTICS_WINDOW_DAYS = int(os.environ.get('ANALYTICS_WINDOW_DAYS', '120'))
+    ANALYTICS_MIN_DAYS = int(os.environ.get('ANALYTICS_MIN_DAYS', '5'))
+    ANALYTICS_RISK_RATE = float(os.environ.get('ANALYTICS_RISK_RATE', '0.9'))
+    ANALYTICS_RISK_STREAK = int(os.environ.get('ANALYTICS_RISK_STREAK', '3'))
+    ANALYTICS_DROP_THRESHOLD = float(os.environ.get('ANALYTICS_DROP_THRESHOLD', '0.15'))
+    ANALYTICS_DROP_ZSCORE = float(os.environ.get('ANALYTICS_DROP_ZSCORE', '1.5'))
+    ANALYTICS_AT_RISK_LIMIT = int(os.environ.get('ANALYTICS_AT_RISK_LIMIT', '10'))
+
+    # Tren kehadiran dari rekap harian: interval rekap hari ini, jumlah hari
+    # lampau yang direkap ulang setiap malam (koreksi absensi terlambat),
+    # rentang maksimal, batas titik sebelum diringkas per minggu/bulan,
+    # dan lama cache response
+    ATTENDANCE_ROLLUP_INTERVAL = float(os.environ.get('ATTENDANCE_ROLLUP_INTERVAL', '900'))
+    ATTENDANCE_ROLLUP_LOOKBACK_DAYS = int(os.environ.get('ATTENDANCE_ROLLUP_LOOKBACK_DAYS', '7'))
+    ATTENDANCE_TREND_MAX_DAYS = int(os.environ.get('ATTENDANCE_TREND_MAX_DAYS', '730'))
+    ATTENDANCE_TREND_MAX_POINTS = int(os.environ.get('ATTENDANCE_TREND_MAX_POINTS', '120'))
+    ATTENDANCE_TREND_CACHE_SECONDS = int(os.environ.get('ATTENDANCE_TREND_CACHE_SECONDS', '600'))
+
+    # Direktori siswa/guru/kelas (keyset pagination): ukuran halaman default
+    # dan maksimal yang boleh diminta klien
+    DIRECTORY_PAGE_SIZE = int(os.environ.get('DIRECTORY_PAGE_SIZE', '50'))
+    DIRECTORY_MAX_PAGE_SIZE = int(os.environ.get('DIRECTORY_MAX_PAGE_SIZE', '200'))
+
+    # Ringkasan lintas sekolah di halaman superadmin: TTL cache dan jumlah
+    # sekolah per halaman
+    TENANT_OVERVIEW_CACHE_SECONDS = int(os.environ.get('TENANT_OVERVIEW_CACHE_SECONDS', '60'))
+    TENANT_OVERVIEW_PER_PAGE = int(os.environ.get('TENANT_OVERVIEW_PER_PAGE', '25'))
+
+    # Penghapusan sekolah di latar belakang: baris per batch (satu transaksi),
+    # jeda antar batch agar tabel ramai tidak terus ditekan, lama satu task
+    # sebelum dilanjutkan task baru, dan umur progres yang dianggap macet
+    SCHOOL_DELETE_BATCH_SIZE = int(os.environ.get('SCHOOL_DELETE_BATCH_SIZE', '1000'))
+    SCHOOL_DELETE_BATCH_PAUSE = float(os.environ.get('SCHOOL_DELETE_BATCH_PAUSE', '0.05'))
+    SCHOOL_DELETE_TASK_SECONDS = float(os.environ.get('SCHOOL_DELETE_TASK_SECONDS', '120'))
+    SCHOOL_DELETE_STALE_SECONDS = int(os.environ.get('SCHOOL_DELETE_STALE_SECONDS', '900'))
+
+    # Export lengkap per sekolah (flask export-tenant / superadmin): format
+    # default (parquet butuh pyarrow, csv = CSV gzip), baris per chunk cursor,
+    # dan prefix key di bucket privat S3_PRIVATE_BUCKET_NAME (env)
+    TENANT_EXPORT_FORMAT = os.environ.get('TENANT_EXPORT_FORMAT') or 'parquet'
+    TENANT_EXPORT_CHUNK_SIZE = int(os.environ.get('TENANT_EXPORT_CHUNK_SIZE', '20000'))
+    TENANT_EXPORT_PREFIX = os.environ.get('TENANT_EXPORT_PREFIX') or 'exports/tenants'
+
+    # Onboarding banyak sekolah dari spreadsheet: sekolah per transaksi,
+    # thread hash password (0 = jumlah CPU) dan thread upload QR ke S3
+    ONBOARDING_BATCH_SIZE = int(os.environ.get('ONBOARDING_BATCH_SIZE', '25'))
+    ONBOARDING_HASH_WORKERS = int(os.environ.get('ONBOARDING_HASH_WORKERS', '0'))
+    ONBOARDING_UPLOAD_WORKERS = int(os.environ.get('ONBOARDING_UPLOAD_WORKERS', '8'))
+
+    # Link login di email (worker tidak punya request context untuk url_for)
+    LOGIN_URL = os.environ.get('LOGIN_URL') or 'https://www.hubsensi.com/auth/login'
+
+    # Health check config (readiness probe)
+    HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', '1.5'))
+    HEALTH_CACHE_SECONDS = float(os.environ.get('HEALTH_CACHE_SECONDS', '5'))
+    HEALTH_CHECK_S3 = os.environ.get('HEALTH_CHECK_S3', 'False').lower() == 'true'
+
+    # Metrics config (Prometheus). Untuk gunicorn multi-worker set juga
+    # PROMETHEUS_MULTIPROC_DIR ke direktori bersama sebelum server dijalankan.
+    # /metrics hanya dilayani jika METRICS_TOKEN diatur (Authorization: Bearer)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # Partisi bulanan attendances (PostgreSQL): partisi dibuat otomatis
+    # beberapa bulan ke depan; arsip partisi lama dijalankan manual lewat
+    # `flask attendance-partitions archive`
+    ATTENDANCE_PARTITION_MONTHS_AHEAD = int(os.environ.get('ATTENDANCE_PARTITION_MONTHS_AHEAD', '3'))
+    ATTENDANCE_ARCHIVE_AFTER_MONTHS = int(os.environ.get('ATTENDANCE_ARCHIVE_AFTER_MONTHS', '24'))
+    ATTENDANCE_ARCHIVE_PREFIX = os.environ.get('ATTENDANCE_ARCHIVE_PREFIX') or 'archives/attendances'
     
     # Session config
     PERMANENT_SESSION_LIFETIME = timedelta(hours=8)
@@ -4,10 +4,15 @@ from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 from flask_caching import Cache
+from celery import Celery
+from utils.db_routing import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
+# RoutingSession: SELECT di view read-only bisa diarahkan ke read replica
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 migrate = Migrate()
 csrf = CSRFProtect()
-cache = Cache()
\ No newline at end of file
+cache = Cache()
+# Satu instance Celery untuk web dan worker, dikonfigurasi di create_app
+celery = Celery('hubsensi', include=['tasks'])
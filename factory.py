@@ -1,26 +1,81 @@
 # factory.py
 import os
+import hmac
 from flask import Flask, abort, flash, jsonify, redirect, render_template, request, url_for, send_from_directory, make_response, render_template_string
 from flask_login import current_user, logout_user
-from config import Config
-from extensions import db, login_manager, migrate, csrf, cache
+from config import Config, config
+from extensions import db, login_manager, migrate, csrf, cache, celery
 from models import User, UserRole, jakarta_now
-from blueprints import init_app as init_blueprints
-from celery_worker import celery
+from utils import db_pool, db_routing, health, live_feed, metrics, roster, school_events
 
-def create_app(config_class=Config):
-    app = Flask(__name__)
-    app.config.from_object(config_class)
-
-    # Inisialisasi semua ekstensi
-    db.init_app(app)
-    login_manager.init_app(app)
-    migrate.init_app(app, db)
-    csrf.init_app(app)
-    cache.init_app(app)
-
-    # Perbarui konfigurasi Celery dari konfigurasi Flask
-    celery.conf.update(app.config)
+def init_celery(app):
+    """Konfigurasi instance Celery bersama dari konfigurasi Flask"""
+    from kombu import Queue
+    from celery.schedules import crontab
+    celery.conf.update(
+        broker_url=app.config['CELERY_BROKER_URL'],
+        result_backend=app.config.get('CELERY_RESULT_BACKEND'),
+        task_ignore_result=app.config.get('CELERY_RESULT_BACKEND') is None,
+        timezone='Asia/Jakarta',
+        broker_connection_retry_on_startup=True,
+        # Antrian terpisah per jenis pekerjaan
+        task_queues=[Queue(name) for name in app.config['CELERY_QUEUES']],
+        task_default_queue='default',
+        task_routes=app.config['CELERY_TASK_ROUTES'],
+        task_annotations={
+            'tasks.send_email_task': {'rate_limit': app.config['EMAIL_RATE_LIMIT']},
+            'tasks.send_email_batch_task': {'rate_limit': app.config['EMAIL_BATCH_RATE_LIMIT']},
+        },
+        # Prioritas di Redis: 0 paling tinggi, 9 paling rendah
+        broker_transport_options={
+            'priority_steps': list(range(10)),
+            'sep': ':',
+            'queue_order_strategy': 'priority',
+        },
+        task_default_priority=5,
+        # Ambil satu pesan per proses agar pesan prioritas tinggi tidak
+        # tertahan di belakang pesan yang sudah di-prefetch
+        worker_prefetch_multiplier=1,
+        beat_schedule={
+            'relay-email-outbox': {
+                'task': 'tasks.relay_outbox_task',
+                'schedule': app.config['OUTBOX_RELAY_INTERVAL'],
+            },
+            'ensure-attendance-partitions': {
+                'task': 'tasks.ensure_attendance_partitions_task',
+                'schedule': crontab(hour=1, minute=0),
+            },
+            'prune-scan-receipts': {
+                'task': 'tasks.prune_scan_receipts_task',
+                'schedule': crontab(hour=1, minute=30),
+            },
+            'prune-roster-changes': {
+                'task': 'tasks.prune_roster_changes_task',
+                'schedule': crontab(hour=1, minute=45),
+            },
+            'resume-school-deletions': {
+                'task': 'tasks.resume_school_deletions_task',
+                'schedule': 600.0,
+            },
+            'rollup-attendance-today': {
+                'task': 'tasks.rollup_attendance_task',
+                'schedule': app.config['ATTENDANCE_ROLLUP_INTERVAL'],
+            },
+            'rollup-attendance-recent': {
+                'task': 'tasks.rollup_attendance_task',
+                'schedule': crontab(hour=1, minute=15),
+                'kwargs': {'days': app.config['ATTENDANCE_ROLLUP_LOOKBACK_DAYS']},
+            },
+            'refresh-attendance-analytics': {
+                'task': 'tasks.refresh_attendance_analytics_task',
+                'schedule': crontab(hour=2, minute=0),
+            },
+            'auto-alpha': {
+                'task': 'tasks.auto_alpha_task',
+                'schedule': app.config['AUTO_ALPHA_INTERVAL'],
+            },
+        }
+    )
 
     # Buat ContextTask agar task Celery berjalan dalam konteks aplikasi
     class ContextTask(celery.Task):
@@ -28,10 +83,52 @@ def create_app(config_class=Config):
             with app.app_context():
                 return self.run(*args, **kwargs)
     celery.Task = ContextTask
+    app.extensions['celery'] = celery
+    metrics.init_celery()
+
+def create_app(config_class=Config, worker=False):
+    """
+    Buat aplikasi Flask. Dengan worker=True hanya ekstensi yang dipakai task
+    (database, cache, Celery) yang diinisialisasi: tanpa blueprint, form,
+    login manager maupun route, sehingga worker start jauh lebih cepat.
+    """
+    if isinstance(config_class, str):
+        config_class = config[config_class]
+
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+
+    # Ekstensi yang dibutuhkan web dan worker
+    db_pool.configure(app, worker=worker)
+    db.init_app(app)
+    db_routing.init_app(app, db)
+    live_feed.init_app(app, db)
+    roster.init_app(app, db)
+    school_events.init_app(app, db)
+    metrics.register_engines(app, db)
+    cache.init_app(app)
+    init_celery(app)
+
+    if worker:
+        return app
+
+    # Import di sini agar mode worker tidak memuat semua blueprint
+    from blueprints import init_app as init_blueprints
+    from commands import init_app as init_commands
+
+    # Inisialisasi ekstensi khusus web
+    login_manager.init_app(app)
+    migrate.init_app(app, db)
+    csrf.init_app(app)
+    if app.config.get('METRICS_ENABLED'):
+        metrics.init_app(app)
 
     # Inisialisasi semua blueprint
     init_blueprints(app)
 
+    # Registrasi perintah CLI (flask generate-data, dst.)
+    init_commands(app)
+
     # User loader untuk Flask-Login
     @login_manager.user_loader
     def load_user(user_id):
@@ -88,8 +185,14 @@ def create_app(config_class=Config):
             current_user.role == UserRole.SUPERADMIN or
             request.endpoint in ['auth.logout', 'auth.login', 'static']):
             return
-        
-        if (current_user.school_id and 
+
+        # Sekolah nonaktif (mis. sedang dihapus): sesi yang masih terbuka diakhiri
+        if current_user.school_id and current_user.school and not current_user.school.is_active:
+            logout_user()
+            flash('Sekolah Anda sedang dinonaktifkan. Silakan hubungi administrator.', 'warning')
+            return redirect(url_for('auth.login'))
+
+        if (current_user.school_id and
             hasattr(current_user, 'school') and 
             current_user.school.subscription):
             
@@ -154,5 +257,25 @@ def create_app(config_class=Config):
     @app.route('/health')
     def health_check():
         return jsonify({'status': 'healthy'}), 200
+
+    # Readiness probe: cek database, cache dan broker secara paralel
+    @app.route('/health/ready')
+    def readiness_check():
+        payload, status_code = health.readiness(app)
+        return jsonify(payload), status_code
+
+    # Endpoint metrics untuk Prometheus; label per sekolah tidak boleh publik,
+    # jadi tanpa METRICS_TOKEN endpoint ini tidak dilayani
+    if app.config.get('METRICS_ENABLED') and not app.config.get('METRICS_TOKEN') and not worker:
+        app.logger.warning('METRICS_TOKEN belum diatur, /metrics dinonaktifkan')
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        token = app.config.get('METRICS_TOKEN')
+        if not app.config.get('METRICS_ENABLED') or not token:
+            abort(404)
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            abort(403)
+        return metrics.metrics_response()
     
     return app
\ No newline at end of file
@@ -0,0 +1,22 @@
+# gunicorn.conf.py
+import os
+import shutil
+
+# Jumlah worker dibaca gunicorn dari WEB_CONCURRENCY. Pool database per worker
+# mengikuti jumlah thread ini (profil 'web' di config.py).
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+
+
+def on_starting(server):
+    # Bersihkan sisa file metrics dari proses sebelumnya
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Tandai worker yang mati agar gauge 'livesum' tidak ikut dihitung
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,46 @@
+"""Tambahkan tabel scan_receipts
+
+Revision ID: 3e9a61c4d7b2
+Revises: b7d41f9c3e68
+Create Date: 2026-10-19 16:21:08.274519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e9a61c4d7b2'
+down_revision = 'b7d41f9c3e68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scan_receipts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.String(length=64), nullable=False),
+        sa.Column('device_id', sa.String(length=64), nullable=True),
+        sa.Column('teacher_id', sa.Integer(), nullable=True),
+        sa.Column('scanned_at', sa.DateTime(), nullable=False),
+        sa.Column('attendance_id', sa.Integer(), nullable=True),
+        sa.Column('result', sa.String(length=20), nullable=False),
+        sa.Column('message', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('school_id', 'client_id', name='uq_scan_receipts_school_id_client_id')
+    )
+    with op.batch_alter_table('scan_receipts', schema=None) as batch_op:
+        # Pembersihan tanda terima lama (task harian)
+        batch_op.create_index('ix_scan_receipts_created_at', ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('scan_receipts', schema=None) as batch_op:
+        batch_op.drop_index('ix_scan_receipts_created_at')
+
+    op.drop_table('scan_receipts')
@@ -0,0 +1,48 @@
+"""Tambahkan tabel school_deletions
+
+Revision ID: 5c0e7a2b9d41
+Revises: d2f8b05a9c17
+Create Date: 2026-10-19 19:42:31.508113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c0e7a2b9d41'
+down_revision = 'd2f8b05a9c17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('school_deletions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('school_name', sa.String(length=100), nullable=True),
+        sa.Column('school_code', sa.String(length=20), nullable=True),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('current_table', sa.String(length=50), nullable=True),
+        sa.Column('total_rows', sa.JSON(), nullable=True),
+        sa.Column('deleted_rows', sa.JSON(), nullable=True),
+        sa.Column('s3_urls', sa.JSON(), nullable=True),
+        sa.Column('s3_deleted', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('school_deletions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_school_deletions_school_id'), ['school_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_school_deletions_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('school_deletions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_school_deletions_status'))
+        batch_op.drop_index(batch_op.f('ix_school_deletions_school_id'))
+
+    op.drop_table('school_deletions')
@@ -0,0 +1,116 @@
+"""Partisi bulanan tabel attendances (PostgreSQL)
+
+Revision ID: 5c0e7a4d2b91
+Revises: 96252f3345f5
+Create Date: 2026-10-19 13:40:02.118204
+
+Tabel lama diganti tabel partisi RANGE (date): satu partisi per bulan dari
+bulan data tertua sampai tiga bulan ke depan, ditambah partisi DEFAULT.
+Primary key menjadi (id, date) karena PostgreSQL mewajibkan kolom partisi
+ada di setiap unique constraint; sequence id tetap sama. Partisi berikutnya
+dibuat oleh `flask attendance-partitions create` / task beat harian.
+Di database selain PostgreSQL migration ini tidak melakukan apa-apa.
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c0e7a4d2b91'
+down_revision = '96252f3345f5'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'id, school_id, student_id, classroom_id, date, status, recorded_by, notes, created_at, updated_at'
+INDEXED_COLUMNS = ['school_id', 'student_id', 'classroom_id', 'date']
+MONTHS_AHEAD = 3
+
+
+def _add_months(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE attendances RENAME TO attendances_legacy')
+    op.execute('ALTER TABLE attendances_legacy RENAME CONSTRAINT attendances_pkey TO attendances_legacy_pkey')
+    for column in INDEXED_COLUMNS:
+        op.execute(f'DROP INDEX IF EXISTS ix_attendances_{column}')
+
+    op.execute("""
+        CREATE TABLE attendances (
+            id INTEGER NOT NULL DEFAULT nextval('attendances_id_seq'),
+            school_id INTEGER NOT NULL REFERENCES schools (id),
+            student_id INTEGER NOT NULL REFERENCES students (id),
+            classroom_id INTEGER NOT NULL REFERENCES classrooms (id),
+            date DATE NOT NULL,
+            status attendancestatus NOT NULL,
+            recorded_by INTEGER REFERENCES teachers (id),
+            notes TEXT,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT attendances_pkey PRIMARY KEY (id, date)
+        ) PARTITION BY RANGE (date)
+    """)
+    # Sequence dipindah ke tabel baru sebelum tabel lama di-drop
+    op.execute('ALTER TABLE attendances_legacy ALTER COLUMN id DROP DEFAULT')
+    op.execute('ALTER SEQUENCE attendances_id_seq OWNED BY attendances.id')
+
+    oldest = bind.execute(sa.text('SELECT MIN(date) FROM attendances_legacy')).scalar()
+    current = date.today().replace(day=1)
+    month = (oldest or current).replace(day=1)
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE attendances_y{month.year}m{month.month:02d} PARTITION OF attendances "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute('CREATE TABLE attendances_default PARTITION OF attendances DEFAULT')
+
+    op.execute(f'INSERT INTO attendances ({COLUMNS}) SELECT {COLUMNS} FROM attendances_legacy')
+    op.execute('DROP TABLE attendances_legacy')
+
+    # Index di tabel induk otomatis dibuat di setiap partisi
+    for column in INDEXED_COLUMNS:
+        op.execute(f'CREATE INDEX ix_attendances_{column} ON attendances ({column})')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE attendances RENAME TO attendances_partitioned')
+    op.execute('ALTER TABLE attendances_partitioned RENAME CONSTRAINT attendances_pkey TO attendances_partitioned_pkey')
+    for column in INDEXED_COLUMNS:
+        op.execute(f'DROP INDEX IF EXISTS ix_attendances_{column}')
+
+    op.execute("""
+        CREATE TABLE attendances (
+            id INTEGER NOT NULL DEFAULT nextval('attendances_id_seq'),
+            school_id INTEGER NOT NULL REFERENCES schools (id),
+            student_id INTEGER NOT NULL REFERENCES students (id),
+            classroom_id INTEGER NOT NULL REFERENCES classrooms (id),
+            date DATE NOT NULL,
+            status attendancestatus NOT NULL,
+            recorded_by INTEGER REFERENCES teachers (id),
+            notes TEXT,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT attendances_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute('ALTER TABLE attendances_partitioned ALTER COLUMN id DROP DEFAULT')
+    op.execute('ALTER SEQUENCE attendances_id_seq OWNED BY attendances.id')
+    op.execute(f'INSERT INTO attendances ({COLUMNS}) SELECT {COLUMNS} FROM attendances_partitioned')
+    # Partisi ikut terhapus bersama tabel induk
+    op.execute('DROP TABLE attendances_partitioned')
+
+    for column in INDEXED_COLUMNS:
+        op.execute(f'CREATE INDEX ix_attendances_{column} ON attendances ({column})')
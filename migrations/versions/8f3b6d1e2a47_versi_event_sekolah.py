@@ -0,0 +1,32 @@
+"""Versi event kalender sekolah dan index rentang event
+
+Revision ID: 8f3b6d1e2a47
+Revises: 5c0e7a2b9d41
+Create Date: 2026-10-19 20:31:06.274519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3b6d1e2a47'
+down_revision = '5c0e7a2b9d41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('schools', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('event_version', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('school_events', schema=None) as batch_op:
+        batch_op.create_index('ix_school_events_school_id_start_date', ['school_id', 'start_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('school_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_school_events_school_id_start_date')
+
+    with op.batch_alter_table('schools', schema=None) as batch_op:
+        batch_op.drop_column('event_version')
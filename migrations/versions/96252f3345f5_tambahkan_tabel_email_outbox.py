@@ -0,0 +1,50 @@
+"""Tambahkan tabel email_outbox
+
+Revision ID: 96252f3345f5
+Revises: 989db14b81c1
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '96252f3345f5'
+down_revision = '989db14b81c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('email_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('school_id', sa.Integer(), nullable=True),
+        sa.Column('idempotency_key', sa.String(length=64), nullable=False),
+        sa.Column('to_email', sa.String(length=120), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('interactive', sa.Boolean(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('claimed_by', sa.String(length=64), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('message_id', sa.String(length=64), nullable=True),
+        sa.Column('dispatched_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('idempotency_key')
+    )
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_email_outbox_school_id'), ['school_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_email_outbox_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_email_outbox_status'))
+        batch_op.drop_index(batch_op.f('ix_email_outbox_school_id'))
+
+    op.drop_table('email_outbox')
@@ -0,0 +1,28 @@
+"""Batas jam dan tanggal ALPHA otomatis per sekolah
+
+Revision ID: a41c9e7f0b53
+Revises: 8f3b6d1e2a47
+Create Date: 2026-10-19 21:12:47.903216
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c9e7f0b53'
+down_revision = '8f3b6d1e2a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('schools', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('auto_alpha_cutoff', sa.Time(), nullable=True))
+        batch_op.add_column(sa.Column('auto_alpha_date', sa.Date(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('schools', schema=None) as batch_op:
+        batch_op.drop_column('auto_alpha_date')
+        batch_op.drop_column('auto_alpha_cutoff')
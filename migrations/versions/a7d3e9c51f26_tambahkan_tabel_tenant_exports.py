@@ -0,0 +1,41 @@
+"""Tambahkan tabel tenant_exports
+
+Revision ID: a7d3e9c51f26
+Revises: f19b6c3d8e25
+Create Date: 2026-10-20 08:12:40.518273
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9c51f26'
+down_revision = 'f19b6c3d8e25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tenant_exports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('format', sa.String(length=10), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('manifest', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tenant_exports', schema=None) as batch_op:
+        batch_op.create_index('ix_tenant_exports_school_id_id', ['school_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tenant_exports', schema=None) as batch_op:
+        batch_op.drop_index('ix_tenant_exports_school_id_id')
+
+    op.drop_table('tenant_exports')
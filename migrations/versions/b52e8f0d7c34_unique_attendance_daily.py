@@ -0,0 +1,34 @@
+"""Unique (school_id, classroom_id, date) di attendance_daily
+
+Revision ID: b52e8f0d7c34
+Revises: a7d3e9c51f26
+Create Date: 2026-10-20 08:41:17.902655
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52e8f0d7c34'
+down_revision = 'a7d3e9c51f26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Buang baris dobel dari rekap yang tumpang tindih (isinya salinan)
+    op.execute(
+        'DELETE FROM attendance_daily WHERE id NOT IN ('
+        'SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM attendance_daily '
+        'GROUP BY school_id, classroom_id, date) AS keep)'
+    )
+    with op.batch_alter_table('attendance_daily', schema=None) as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_attendance_daily_school_id_classroom_id_date', ['school_id', 'classroom_id', 'date']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('attendance_daily', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_attendance_daily_school_id_classroom_id_date', type_='unique')
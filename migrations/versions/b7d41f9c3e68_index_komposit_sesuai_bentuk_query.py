@@ -0,0 +1,130 @@
+"""Index komposit sesuai bentuk query
+
+Revision ID: b7d41f9c3e68
+Revises: 5c0e7a4d2b91
+Create Date: 2026-10-19 15:02:37.640915
+
+Query panas memfilter (school_id, date), (student_id, date),
+(classroom_id, date) dan (school_id, nis), serta mengurutkan created_at per
+sekolah. Index satu kolom yang sudah tercakup kolom terdepan index komposit
+dihapus. Di PostgreSQL index dibuat CONCURRENTLY (tanpa mengunci tulis) dan
+kolom status di-INCLUDE untuk query statistik. Untuk attendances yang sudah
+dipartisi, index dibuat ON ONLY di tabel induk lalu per partisi secara
+concurrent dan di-attach.
+
+Bandingkan plan sebelum/sesudah dengan `python -m benchmarks.index_plans`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d41f9c3e68'
+down_revision = '5c0e7a4d2b91'
+branch_labels = None
+depends_on = None
+
+# (tabel, nama index, kolom, include)
+NEW_INDEXES = [
+    ('attendances', 'ix_attendances_school_id_date', ['school_id', 'date'], ['status']),
+    ('attendances', 'ix_attendances_student_id_date', ['student_id', 'date'], ['status']),
+    ('attendances', 'ix_attendances_classroom_id_date', ['classroom_id', 'date'], ['status']),
+    ('attendances', 'ix_attendances_school_id_created_at', ['school_id', 'created_at'], []),
+    ('students', 'ix_students_school_id_nis', ['school_id', 'nis'], []),
+    ('students', 'ix_students_school_id_created_at', ['school_id', 'created_at'], []),
+    ('teachers', 'ix_teachers_school_id_created_at', ['school_id', 'created_at'], []),
+    ('school_events', 'ix_school_events_school_id_created_at', ['school_id', 'created_at'], []),
+]
+
+# (tabel, nama index, kolom) yang digantikan index komposit di atas
+OLD_INDEXES = [
+    ('attendances', 'ix_attendances_school_id', ['school_id']),
+    ('attendances', 'ix_attendances_student_id', ['student_id']),
+    ('attendances', 'ix_attendances_classroom_id', ['classroom_id']),
+    ('attendances', 'ix_attendances_date', ['date']),
+    ('students', 'ix_students_school_id', ['school_id']),
+    ('students', 'ix_students_nis', ['nis']),
+    ('teachers', 'ix_teachers_school_id', ['school_id']),
+    ('school_events', 'ix_school_events_school_id', ['school_id']),
+]
+
+
+def _is_partitioned(bind, table):
+    return bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table)"
+    ), {'table': table}).scalar()
+
+
+def _partitions(bind, table):
+    return [row[0] for row in bind.execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table ORDER BY c.relname"
+    ), {'table': table})]
+
+
+def _create_pg(bind, table, name, columns, include):
+    columns_sql = ', '.join(columns)
+    include_sql = f" INCLUDE ({', '.join(include)})" if include else ''
+    if _is_partitioned(bind, table):
+        # Index induk tidak valid sampai semua index partisi di-attach
+        op.execute(f'CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} ({columns_sql}){include_sql}')
+        for partition in _partitions(bind, table):
+            child = f'{partition}_{name[len("ix_" + table) + 1:]}_idx'[:63]
+            with op.get_context().autocommit_block():
+                op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} ({columns_sql}){include_sql}')
+            op.execute(f'ALTER INDEX {name} ATTACH PARTITION {child}')
+    else:
+        with op.get_context().autocommit_block():
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns_sql}){include_sql}')
+
+
+def _drop_pg(bind, table, name):
+    if _is_partitioned(bind, table):
+        # DROP INDEX CONCURRENTLY tidak didukung untuk index tabel partisi
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+    else:
+        with op.get_context().autocommit_block():
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for table, name, columns, include in NEW_INDEXES:
+            _create_pg(bind, table, name, columns, include)
+        for table, name, _ in OLD_INDEXES:
+            _drop_pg(bind, table, name)
+        for table in sorted({table for table, *_ in NEW_INDEXES}):
+            op.execute(f'ANALYZE {table}')
+        return
+
+    # Database lain (SQLite): lewati index yang sudah ada (mis. dari create_all)
+    inspector = sa.inspect(bind)
+    tables = {table for table, *_ in NEW_INDEXES + OLD_INDEXES}
+    existing = {table: {i['name'] for i in inspector.get_indexes(table)} for table in tables}
+    for table, name, columns, _ in NEW_INDEXES:
+        if name not in existing[table]:
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.create_index(name, columns, unique=False)
+    for table, name, _ in OLD_INDEXES:
+        if name in existing[table]:
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.drop_index(name)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for table, name, columns in OLD_INDEXES:
+            _create_pg(bind, table, name, columns, [])
+        for table, name, _, _ in NEW_INDEXES:
+            _drop_pg(bind, table, name)
+        return
+
+    for table, name, columns in OLD_INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, columns, unique=False)
+    for table, name, _, _ in NEW_INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
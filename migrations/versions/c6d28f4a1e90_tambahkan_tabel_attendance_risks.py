@@ -0,0 +1,50 @@
+"""Tambahkan tabel attendance_risks
+
+Revision ID: c6d28f4a1e90
+Revises: a41c9e7f0b53
+Create Date: 2026-10-19 22:04:18.551730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6d28f4a1e90'
+down_revision = 'a41c9e7f0b53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendance_risks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('classroom_id', sa.Integer(), nullable=True),
+        sa.Column('computed_on', sa.Date(), nullable=False),
+        sa.Column('school_days', sa.Integer(), nullable=False),
+        sa.Column('rate_7', sa.Float(), nullable=True),
+        sa.Column('rate_30', sa.Float(), nullable=True),
+        sa.Column('baseline_rate', sa.Float(), nullable=True),
+        sa.Column('rate_drop', sa.Float(), nullable=True),
+        sa.Column('current_streak', sa.Integer(), nullable=False),
+        sa.Column('longest_streak', sa.Integer(), nullable=False),
+        sa.Column('anomaly_score', sa.Float(), nullable=True),
+        sa.Column('risk_score', sa.Float(), nullable=False),
+        sa.Column('is_at_risk', sa.Boolean(), nullable=False),
+        sa.Column('reasons', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('attendance_risks', schema=None) as batch_op:
+        batch_op.create_index('ix_attendance_risks_school_id_risk_score', ['school_id', 'risk_score'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('attendance_risks', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_risks_school_id_risk_score')
+
+    op.drop_table('attendance_risks')
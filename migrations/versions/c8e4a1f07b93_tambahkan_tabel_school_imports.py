@@ -0,0 +1,38 @@
+"""Tambahkan tabel school_imports
+
+Revision ID: c8e4a1f07b93
+Revises: b52e8f0d7c34
+Create Date: 2026-10-20 10:41:07.215864
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e4a1f07b93'
+down_revision = 'b52e8f0d7c34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('school_imports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('dry_run', sa.Boolean(), nullable=False),
+        sa.Column('skip_invalid', sa.Boolean(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('rows', sa.JSON(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('school_imports')
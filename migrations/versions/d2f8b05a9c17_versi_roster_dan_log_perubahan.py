@@ -0,0 +1,45 @@
+"""Versi roster sekolah dan log perubahan roster
+
+Revision ID: d2f8b05a9c17
+Revises: 3e9a61c4d7b2
+Create Date: 2026-10-19 17:05:44.812306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f8b05a9c17'
+down_revision = '3e9a61c4d7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('schools', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('roster_version', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('roster_changes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(length=10), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('roster_changes', schema=None) as batch_op:
+        batch_op.create_index('ix_roster_changes_school_id_version', ['school_id', 'version'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('roster_changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_roster_changes_school_id_version')
+
+    op.drop_table('roster_changes')
+
+    with op.batch_alter_table('schools', schema=None) as batch_op:
+        batch_op.drop_column('roster_version')
@@ -0,0 +1,26 @@
+"""Tambahkan email_outbox.outcome_unknown
+
+Revision ID: d4b9e2a6c815
+Revises: c8e4a1f07b93
+Create Date: 2026-10-20 13:22:51.804117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b9e2a6c815'
+down_revision = 'c8e4a1f07b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('outcome_unknown', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_column('outcome_unknown')
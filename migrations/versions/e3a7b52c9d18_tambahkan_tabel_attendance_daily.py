@@ -0,0 +1,45 @@
+"""Tambahkan tabel attendance_daily
+
+Revision ID: e3a7b52c9d18
+Revises: c6d28f4a1e90
+Create Date: 2026-10-19 22:48:09.137642
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a7b52c9d18'
+down_revision = 'c6d28f4a1e90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendance_daily',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('school_id', sa.Integer(), nullable=False),
+        sa.Column('classroom_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('recorded', sa.Integer(), nullable=False),
+        sa.Column('hadir', sa.Integer(), nullable=False),
+        sa.Column('izin', sa.Integer(), nullable=False),
+        sa.Column('sakit', sa.Integer(), nullable=False),
+        sa.Column('alpha', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('attendance_daily', schema=None) as batch_op:
+        batch_op.create_index('ix_attendance_daily_school_id_date', ['school_id', 'date'], unique=False)
+        batch_op.create_index('ix_attendance_daily_classroom_id_date', ['classroom_id', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('attendance_daily', schema=None) as batch_op:
+        batch_op.drop_index('ix_attendance_daily_classroom_id_date')
+        batch_op.drop_index('ix_attendance_daily_school_id_date')
+
+    op.drop_table('attendance_daily')
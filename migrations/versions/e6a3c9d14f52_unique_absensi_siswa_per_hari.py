@@ -0,0 +1,71 @@
+"""Unique (student_id, date) di attendances
+
+Revision ID: e6a3c9d14f52
+Revises: d4b9e2a6c815
+Create Date: 2026-10-20 14:05:33.640291
+
+Index ix_attendances_student_id_date diganti index unik dengan kolom yang
+sama, supaya ALPHA otomatis dan scan yang tersinkron bersamaan tidak
+membuat dua absensi untuk satu siswa di hari yang sama. Baris dobel yang
+sudah ada dibuang lebih dulu: absensi dari guru/admin dipertahankan di atas
+ALPHA otomatis, lalu yang terakhir diubah. Di tabel partisi index dibuat
+per partisi secara CONCURRENTLY lalu di-attach (sama seperti b7d41f9c3e68).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a3c9d14f52'
+down_revision = 'd4b9e2a6c815'
+branch_labels = None
+depends_on = None
+
+# Sama dengan utils.auto_alpha.NOTES saat migration ini dibuat
+AUTO_ALPHA_NOTES = 'ALPHA otomatis: tidak ada absensi sampai batas jam'
+NAME = 'uq_attendances_student_id_date'
+OLD_NAME = 'ix_attendances_student_id_date'
+
+
+def _partitions(bind):
+    return [row[0] for row in bind.execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = 'attendances' ORDER BY c.relname"
+    ))]
+
+
+def upgrade():
+    bind = op.get_bind()
+    bind.execute(sa.text(
+        'DELETE FROM attendances WHERE id IN ('
+        'SELECT id FROM (SELECT id, ROW_NUMBER() OVER ('
+        'PARTITION BY student_id, date '
+        'ORDER BY CASE WHEN recorded_by IS NULL AND notes = :notes THEN 1 ELSE 0 END, '
+        'updated_at DESC, id DESC) AS rn FROM attendances) AS ranked WHERE rn > 1)'
+    ), {'notes': AUTO_ALPHA_NOTES})
+
+    if bind.dialect.name != 'postgresql':
+        op.drop_index(OLD_NAME, table_name='attendances')
+        op.create_index(NAME, 'attendances', ['student_id', 'date'], unique=True)
+        return
+
+    partitions = _partitions(bind)
+    if partitions:
+        # Index induk tidak valid sampai semua index partisi di-attach
+        op.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS {NAME} ON ONLY attendances (student_id, date) INCLUDE (status)')
+        for partition in partitions:
+            child = f'{partition}_student_id_date_key'[:63]
+            with op.get_context().autocommit_block():
+                op.execute(f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {child} '
+                           f'ON {partition} (student_id, date) INCLUDE (status)')
+            op.execute(f'ALTER INDEX {NAME} ATTACH PARTITION {child}')
+    else:
+        with op.get_context().autocommit_block():
+            op.execute(f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {NAME} '
+                       f'ON attendances (student_id, date) INCLUDE (status)')
+    op.execute(f'DROP INDEX IF EXISTS {OLD_NAME}')
+
+
+def downgrade():
+    op.drop_index(NAME, table_name='attendances')
+    op.create_index(OLD_NAME, 'attendances', ['student_id', 'date'], postgresql_include=['status'])
@@ -0,0 +1,60 @@
+"""Index keyset direktori dan index trigram pencarian
+
+Revision ID: f19b6c3d8e25
+Revises: e3a7b52c9d18
+Create Date: 2026-10-19 23:26:52.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f19b6c3d8e25'
+down_revision = 'e3a7b52c9d18'
+branch_labels = None
+depends_on = None
+
+# Kolom yang dicari dengan ILIKE '%...%' di direktori (PostgreSQL saja)
+TRIGRAM_COLUMNS = [
+    ('students', 'full_name'),
+    ('students', 'nis'),
+    ('students', 'nisn'),
+    ('teachers', 'full_name'),
+    ('teachers', 'nip'),
+    ('users', 'email'),
+]
+
+
+def upgrade():
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.create_index('ix_students_school_id_full_name_id', ['school_id', 'full_name', 'id'], unique=False)
+
+    with op.batch_alter_table('teachers', schema=None) as batch_op:
+        batch_op.create_index('ix_teachers_school_id_full_name_id', ['school_id', 'full_name', 'id'], unique=False)
+
+    with op.batch_alter_table('classrooms', schema=None) as batch_op:
+        batch_op.create_index('ix_classrooms_school_id_name_id', ['school_id', 'name', 'id'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in TRIGRAM_COLUMNS:
+            op.execute(
+                f'CREATE INDEX IF NOT EXISTS ix_{table}_{column}_trgm '
+                f'ON {table} USING gin ({column} gin_trgm_ops)'
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, column in TRIGRAM_COLUMNS:
+            op.execute(f'DROP INDEX IF EXISTS ix_{table}_{column}_trgm')
+
+    with op.batch_alter_table('classrooms', schema=None) as batch_op:
+        batch_op.drop_index('ix_classrooms_school_id_name_id')
+
+    with op.batch_alter_table('teachers', schema=None) as batch_op:
+        batch_op.drop_index('ix_teachers_school_id_full_name_id')
+
+    with op.batch_alter_table('students', schema=None) as batch_op:
+        batch_op.drop_index('ix_students_school_id_full_name_id')
@@ -10,6 +10,10 @@ from zoneinfo import ZoneInfo
 def jakarta_now():
     return datetime.now(ZoneInfo("Asia/Jakarta"))
 
+def jakarta_now_naive():
+    # Kolom DateTime tanpa timezone, disimpan sebagai waktu Jakarta
+    return jakarta_now().replace(tzinfo=None)
+
 # Enum untuk tipe peran pengguna
 class UserRole(enum.Enum):
     SUPERADMIN = 'SUPERADMIN'
@@ -54,6 +58,16 @@ class School(BaseModel):
     primary_color = db.Column(db.String(7), default='#0d6efd')
     secondary_color = db.Column(db.String(7), default='#6c757d')
     logo_url = db.Column(db.String(200))
+
+    # Naik setiap ada perubahan roster siswa/kelas (lihat utils/roster.py)
+    roster_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Naik setiap ada perubahan event kalender (lihat utils/school_events.py)
+    event_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Batas jam absensi; setelahnya siswa tanpa absensi dicatat ALPHA
+    # otomatis (kosong = AUTO_ALPHA_CUTOFF). Lihat utils/auto_alpha.py
+    auto_alpha_cutoff = db.Column(db.Time)
+    auto_alpha_date = db.Column(db.Date)
     
     # Relationship
     users = db.relationship('User', backref='school', lazy=True)
@@ -91,8 +105,15 @@ class User(BaseModel, UserMixin):
 # Model untuk guru/staff
 class Teacher(BaseModel):
     __tablename__ = 'teachers'
+    __table_args__ = (
+        # Daftar guru terbaru per sekolah (dashboard admin)
+        db.Index('ix_teachers_school_id_created_at', 'school_id', 'created_at'),
+        # Direktori guru: keyset (nama, id) per sekolah (utils/directory.py).
+        # Index trigram pencarian hanya di PostgreSQL (migration f19b6c3d8e25)
+        db.Index('ix_teachers_school_id_full_name_id', 'school_id', 'full_name', 'id'),
+    )
     
-    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, index=True) # <-- Index ditambahkan
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True) # <-- Index ditambahkan
     nip = db.Column(db.String(20), index=True) # <-- Index ditambahkan
     full_name = db.Column(db.String(100), nullable=False)
@@ -105,10 +126,19 @@ class Teacher(BaseModel):
 # Model untuk siswa
 class Student(BaseModel):
     __tablename__ = 'students'
+    __table_args__ = (
+        # Lookup scan QR dan cek NIS unik per sekolah
+        db.Index('ix_students_school_id_nis', 'school_id', 'nis'),
+        # Daftar siswa terbaru per sekolah (dashboard admin)
+        db.Index('ix_students_school_id_created_at', 'school_id', 'created_at'),
+        # Direktori siswa: keyset (nama, id) per sekolah (utils/directory.py).
+        # Index trigram pencarian hanya di PostgreSQL (migration f19b6c3d8e25)
+        db.Index('ix_students_school_id_full_name_id', 'school_id', 'full_name', 'id'),
+    )
     
-    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, index=True) # <-- Index ditambahkan
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True) # <-- Index ditambahkan
-    nis = db.Column(db.String(20), nullable=False, index=True) # <-- Index ditambahkan
+    nis = db.Column(db.String(20), nullable=False)
     nisn = db.Column(db.String(20), index=True) # <-- Index ditambahkan
     full_name = db.Column(db.String(100), nullable=False)
     classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'), index=True) # <-- Index ditambahkan
@@ -120,6 +150,10 @@ class Student(BaseModel):
 # Model untuk kelas
 class Classroom(BaseModel):
     __tablename__ = 'classrooms'
+    __table_args__ = (
+        # Direktori kelas: keyset (nama, id) per sekolah
+        db.Index('ix_classrooms_school_id_name_id', 'school_id', 'name', 'id'),
+    )
     
     school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, index=True) # <-- Index ditambahkan
     name = db.Column(db.String(50), nullable=False)
@@ -130,14 +164,27 @@ class Classroom(BaseModel):
     students = db.relationship('Student', backref='classroom', lazy=True)
     attendance_records = db.relationship('Attendance', backref='classroom', lazy=True)
 
-# Model untuk absensi
+# Model untuk absensi. Di PostgreSQL tabel ini dipartisi per bulan
+# (migration 5c0e7a4d2b91, utils/partitions.py); model tetap sama.
 class Attendance(BaseModel):
     __tablename__ = 'attendances'
+    __table_args__ = (
+        # Index mengikuti bentuk query: filter (kolom, date) dan status ikut
+        # disimpan di index (PostgreSQL) agar statistik cukup index-only scan
+        db.Index('ix_attendances_school_id_date', 'school_id', 'date', postgresql_include=['status']),
+        # Satu absensi per siswa per hari (berisi kolom partisi date, jadi
+        # valid di tabel partisi); ALPHA otomatis memakai ON CONFLICT DO NOTHING
+        db.Index('uq_attendances_student_id_date', 'student_id', 'date', unique=True,
+                 postgresql_include=['status']),
+        db.Index('ix_attendances_classroom_id_date', 'classroom_id', 'date', postgresql_include=['status']),
+        # Aktivitas absensi terbaru per sekolah
+        db.Index('ix_attendances_school_id_created_at', 'school_id', 'created_at'),
+    )
     
-    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, index=True) # <-- Index ditambahkan
-    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False, index=True) # <-- Index ditambahkan
-    classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'), nullable=False, index=True) # <-- Index ditambahkan
-    date = db.Column(db.Date, nullable=False, index=True) # <-- Index ditambahkan
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
     status = db.Column(db.Enum(AttendanceStatus), nullable=False)
     recorded_by = db.Column(db.Integer, db.ForeignKey('teachers.id'))
     notes = db.Column(db.Text)
@@ -145,8 +192,14 @@ class Attendance(BaseModel):
 # Model untuk event sekolah
 class SchoolEvent(BaseModel):
     __tablename__ = 'school_events'
+    __table_args__ = (
+        # Event terbaru per sekolah (dashboard admin)
+        db.Index('ix_school_events_school_id_created_at', 'school_id', 'created_at'),
+        # Event dalam rentang tanggal per sekolah (kalender)
+        db.Index('ix_school_events_school_id_start_date', 'school_id', 'start_date'),
+    )
     
-    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, index=True) # <-- Index ditambahkan
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     start_date = db.Column(db.DateTime, nullable=False, index=True) # <-- Index ditambahkan
@@ -203,4 +256,153 @@ class SchoolSubscription(db.Model):
     def days_remaining(self):
         if not self.is_valid():
             return 0
-        return (self.end_date - jakarta_now().date()).days
\ No newline at end of file
+        return (self.end_date - jakarta_now().date()).days
+
+# Outbox email: ditulis dalam transaksi yang sama dengan perubahan akun,
+# lalu dikirim ke Celery oleh relay (lihat utils/outbox.py)
+class EmailOutbox(BaseModel):
+    __tablename__ = 'email_outbox'
+
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), index=True)
+    idempotency_key = db.Column(db.String(64), nullable=False, unique=True)
+    to_email = db.Column(db.String(120), nullable=False)
+    payload = db.Column(db.JSON)  # name, username, password; dikosongkan setelah selesai
+    interactive = db.Column(db.Boolean, default=False, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    claimed_by = db.Column(db.String(64))
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    # Klaim sebelumnya berakhir tanpa hasil (masih sending): cek Postmark sebelum kirim ulang
+    outcome_unknown = db.Column(db.Boolean, default=False, nullable=False, server_default=db.false())
+    last_error = db.Column(db.Text)
+    message_id = db.Column(db.String(64))
+    dispatched_at = db.Column(db.DateTime)
+    sent_at = db.Column(db.DateTime)
+
+# Tanda terima scan offline dari perangkat scanner: client_id unik per
+# sekolah membuat sync batch yang dikirim ulang tidak mencatat absensi ganda
+class ScanReceipt(BaseModel):
+    __tablename__ = 'scan_receipts'
+    __table_args__ = (
+        db.UniqueConstraint('school_id', 'client_id', name='uq_scan_receipts_school_id_client_id'),
+        # Pembersihan tanda terima lama (task harian)
+        db.Index('ix_scan_receipts_created_at', 'created_at'),
+    )
+
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    client_id = db.Column(db.String(64), nullable=False)
+    device_id = db.Column(db.String(64))
+    teacher_id = db.Column(db.Integer, db.ForeignKey('teachers.id'))
+    scanned_at = db.Column(db.DateTime, nullable=False)  # waktu scan di perangkat (Jakarta)
+    attendance_id = db.Column(db.Integer)  # tanpa FK: PK attendances (id, date) di PostgreSQL
+    result = db.Column(db.String(20), nullable=False)  # recorded / already_recorded / rejected
+    message = db.Column(db.String(255))
+
+# Log perubahan roster per versi, untuk mode delta API roster
+class RosterChange(BaseModel):
+    __tablename__ = 'roster_changes'
+    __table_args__ = (
+        db.Index('ix_roster_changes_school_id_version', 'school_id', 'version'),
+    )
+
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    student_id = db.Column(db.Integer)  # kosong untuk perubahan daftar kelas
+    action = db.Column(db.String(10), nullable=False)  # added / changed / removed / classrooms
+
+# Penghapusan sekolah di latar belakang (lihat utils/school_deletion.py).
+# Tanpa FK ke schools: baris tetap ada sebagai jejak setelah sekolah terhapus
+class SchoolDeletion(BaseModel):
+    __tablename__ = 'school_deletions'
+
+    school_id = db.Column(db.Integer, nullable=False, index=True)
+    school_name = db.Column(db.String(100))
+    school_code = db.Column(db.String(20))
+    requested_by = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    current_table = db.Column(db.String(50))
+    total_rows = db.Column(db.JSON, default=dict)    # nama tabel -> jumlah baris saat mulai
+    deleted_rows = db.Column(db.JSON, default=dict)  # nama tabel -> jumlah baris terhapus
+    s3_urls = db.Column(db.JSON, default=list)       # QR yang menunggu dihapus dari S3
+    s3_deleted = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    finished_at = db.Column(db.DateTime)
+
+# Status export lengkap per sekolah (lihat utils/tenant_export.py), disimpan
+# di database agar worker dan web melihat status yang sama. Tanpa FK ke
+# schools, sama seperti SchoolDeletion
+class TenantExport(BaseModel):
+    __tablename__ = 'tenant_exports'
+    __table_args__ = (
+        # Export terakhir per sekolah
+        db.Index('ix_tenant_exports_school_id_id', 'school_id', 'id'),
+    )
+
+    school_id = db.Column(db.Integer, nullable=False)
+    requested_by = db.Column(db.Integer)
+    format = db.Column(db.String(10))
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    manifest = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    finished_at = db.Column(db.DateTime)
+
+# Import sekolah dari spreadsheet yang diproses worker (lihat
+# utils/onboarding.py). rows berisi baris file sampai task selesai lalu
+# dikosongkan (bisa memuat password admin); result berisi ringkasan hasil
+class SchoolImport(BaseModel):
+    __tablename__ = 'school_imports'
+
+    requested_by = db.Column(db.Integer)
+    filename = db.Column(db.String(255))
+    dry_run = db.Column(db.Boolean, nullable=False, default=False)
+    skip_invalid = db.Column(db.Boolean, nullable=False, default=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    rows = db.Column(db.JSON)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    finished_at = db.Column(db.DateTime)
+
+# Hasil analitik kehadiran per siswa, dihitung ulang setiap malam
+# (lihat utils/attendance_analytics.py). Tanpa FK ke siswa/kelas agar
+# penghapusan siswa tidak tertahan; baris lama terganti saat refresh
+class AttendanceRisk(BaseModel):
+    __tablename__ = 'attendance_risks'
+    __table_args__ = (
+        # Daftar siswa berisiko per sekolah, urut skor
+        db.Index('ix_attendance_risks_school_id_risk_score', 'school_id', 'risk_score'),
+    )
+
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    student_id = db.Column(db.Integer, nullable=False)
+    classroom_id = db.Column(db.Integer)
+    computed_on = db.Column(db.Date, nullable=False)
+    school_days = db.Column(db.Integer, nullable=False, default=0)  # hari sekolah teramati di jendela
+    rate_7 = db.Column(db.Float)          # kehadiran 7 hari sekolah terakhir (0-1)
+    rate_30 = db.Column(db.Float)         # kehadiran 30 hari sekolah terakhir
+    baseline_rate = db.Column(db.Float)   # kehadiran sebelum 30 hari terakhir
+    rate_drop = db.Column(db.Float)       # baseline_rate - rate_30
+    current_streak = db.Column(db.Integer, nullable=False, default=0)  # tidak hadir berturut-turut sampai hari ini
+    longest_streak = db.Column(db.Integer, nullable=False, default=0)
+    anomaly_score = db.Column(db.Float)   # makin tinggi makin tidak biasa dibanding teman sekelas
+    risk_score = db.Column(db.Float, nullable=False, default=0)
+    is_at_risk = db.Column(db.Boolean, nullable=False, default=False)
+    reasons = db.Column(db.JSON, default=list)
+
+# Rekap absensi harian per kelas untuk grafik tren (lihat
+# utils/attendance_trends.py); dibangun ulang dari attendances
+class AttendanceDaily(BaseModel):
+    __tablename__ = 'attendance_daily'
+    __table_args__ = (
+        db.Index('ix_attendance_daily_school_id_date', 'school_id', 'date'),
+        db.Index('ix_attendance_daily_classroom_id_date', 'classroom_id', 'date'),
+        # Satu baris per kelas per hari; rekap ganda gagal alih-alih dobel
+        db.UniqueConstraint('school_id', 'classroom_id', 'date', name='uq_attendance_daily_school_id_classroom_id_date'),
+    )
+
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    classroom_id = db.Column(db.Integer, nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    recorded = db.Column(db.Integer, nullable=False, default=0)
+    hadir = db.Column(db.Integer, nullable=False, default=0)
+    izin = db.Column(db.Integer, nullable=False, default=0)
+    sakit = db.Column(db.Integer, nullable=False, default=0)
+    alpha = db.Column(db.Integer, nullable=False, default=0)
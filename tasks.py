@@ -1,35 +1,154 @@
 # tasks.py
+import uuid
 import logging
-from celery_worker import celery
-from utils.sendgrid_helper import send_login_email
-from flask import url_for
+from extensions import celery
+from utils import outbox
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@celery.task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
-def send_email_task(self, to_email: str, name: str, username: str, password: str):
+# Prioritas pesan (Redis: angka kecil diproses lebih dulu)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 9
+
+def _deliver(task, outbox_ids):
+    """Kirim email outbox; token klaim unik per percobaan task"""
+    token = f"{task.request.id or uuid.uuid4().hex}:{task.request.retries}"
+    final_attempt = task.request.retries >= task.max_retries
+    retry_ids, summary = outbox.deliver(outbox_ids, token, final_attempt=final_attempt)
+    logger.info(f"Outbox email: {summary['sent']} terkirim, {summary['failed']} gagal permanen, "
+                f"{summary['retry']} akan di-retry, {summary['skipped']} dilewati (sudah diproses)")
+    return retry_ids, summary
+
+@celery.task(bind=True, max_retries=3)
+def send_email_task(self, outbox_id: int):
+    """
+    Task untuk mengirim satu email informasi login dari outbox (interaktif,
+    mis. reset password). Error permanen Postmark tidak di-retry.
+    """
+    retry_ids, summary = _deliver(self, [outbox_id])
+    if retry_ids:
+        raise self.retry(countdown=60)
+    return summary
+
+@celery.task(bind=True, max_retries=3, priority=PRIORITY_BULK)
+def send_email_batch_task(self, outbox_ids: list):
+    """
+    Task untuk mengirim banyak email informasi login dari outbox dalam satu
+    request batch Postmark. Hanya pesan yang gagal karena error sementara
+    yang di-retry, pesan yang sudah terkirim atau gagal permanen dilewati.
+    """
+    retry_ids, summary = _deliver(self, outbox_ids)
+    if retry_ids:
+        raise self.retry(kwargs={'outbox_ids': retry_ids}, countdown=60 * (self.request.retries + 1))
+    return summary
+
+@celery.task
+def relay_outbox_task():
+    """Relay periodik (celery beat) untuk baris outbox yang belum masuk antrian"""
+    return outbox.relay()
+
+@celery.task
+def ensure_attendance_partitions_task():
+    """Buat partisi attendances bulan-bulan berikutnya (harian lewat beat)"""
+    from flask import current_app
+    from utils.partitions import ensure_partitions
+    return ensure_partitions(months_ahead=current_app.config['ATTENDANCE_PARTITION_MONTHS_AHEAD'])
+
+@celery.task
+def prune_scan_receipts_task():
+    """Hapus tanda terima sync scan offline yang sudah lewat masa retensi"""
+    from flask import current_app
+    from utils.scan_sync import prune_receipts
+    return prune_receipts(current_app.config['SCAN_RECEIPT_RETENTION_DAYS'])
+
+@celery.task
+def prune_roster_changes_task():
+    """Hapus log perubahan roster yang sudah lewat masa retensi"""
+    from flask import current_app
+    from utils.roster import prune_changes
+    return prune_changes(current_app.config['ROSTER_CHANGES_RETENTION_DAYS'])
+
+@celery.task(bind=True, max_retries=5)
+def delete_school_task(self, deletion_id: int):
     """
-    Task untuk mengirim email informasi login di background.
+    Hapus data sekolah per batch. Setiap task berjalan paling lama
+    SCHOOL_DELETE_TASK_SECONDS lalu melanjutkan di task baru, sehingga
+    worker tidak tertahan satu tenant besar.
     """
+    from utils import school_deletion
     try:
-        # url_for akan berfungsi karena task berjalan dalam konteks aplikasi
-        login_link = url_for('auth.login', _external=True)
+        status = school_deletion.run(deletion_id)
+    except Exception as exc:
+        logger.exception(f"Penghapusan sekolah {deletion_id} gagal")
+        if self.request.retries >= self.max_retries:
+            school_deletion.mark_failed(deletion_id, exc)
+            raise
+        from extensions import db
+        db.session.rollback()
+        raise self.retry(exc=exc, countdown=60 * (self.request.retries + 1))
+    if status == school_deletion.RUNNING:
+        school_deletion.enqueue(deletion_id)
+    return status
+
+@celery.task
+def resume_school_deletions_task():
+    """Lanjutkan penghapusan sekolah yang macet (worker mati atau broker gagal)"""
+    from utils import school_deletion
+    return school_deletion.resume_stalled()
+
+@celery.task
+def export_tenant_task(school_id: int, fmt: str = None, export_id: int = None):
+    """Export lengkap data satu sekolah ke S3 (Parquet / CSV gzip)"""
+    from utils import tenant_export
+    return tenant_export.run_export(school_id, fmt=fmt, export_id=export_id)
 
-        logger.info(f"Mengirim email ke {to_email} untuk user {name}")
+@celery.task
+def import_schools_task(import_id: int):
+    """Buat sekolah dari spreadsheet yang diunggah superadmin (status di school_imports)"""
+    from utils import onboarding
+    return onboarding.run_import(import_id)
 
-        result = send_login_email(
-            to_email=to_email,
-            name=name,
-            username=username,
-            password=password,
-            login_link=login_link
-        )
+@celery.task
+def auto_alpha_task():
+    """Kirim task ALPHA otomatis untuk sekolah yang sudah lewat batas jam (beat)"""
+    from utils import auto_alpha
+    return auto_alpha.dispatch()
 
-        logger.info(f"Email berhasil dikirim ke {to_email}")
-        return f"Email berhasil dikirim ke {to_email}"
+@celery.task(bind=True, max_retries=3)
+def auto_alpha_school_task(self, school_id: int, day: str):
+    """Catat ALPHA untuk siswa satu sekolah yang belum absen pada tanggal `day`"""
+    from datetime import date
+    from extensions import db
+    from utils import auto_alpha
+    try:
+        return auto_alpha.mark_absent(school_id, date.fromisoformat(day))
+    except Exception as exc:
+        db.session.rollback()
+        logger.exception(f"ALPHA otomatis sekolah {school_id} {day} gagal")
+        raise self.retry(exc=exc, countdown=60 * (self.request.retries + 1))
+
+@celery.task
+def refresh_attendance_analytics_task():
+    """Kirim task analitik kehadiran per sekolah aktif (beat, setiap malam)"""
+    from utils import attendance_analytics
+    return attendance_analytics.dispatch()
+
+@celery.task(bind=True, max_retries=3)
+def attendance_analytics_school_task(self, school_id: int):
+    """Hitung ulang siswa berisiko satu sekolah"""
+    from extensions import db
+    from utils import attendance_analytics
+    try:
+        return attendance_analytics.refresh_school(school_id)
+    except Exception as exc:
+        db.session.rollback()
+        logger.exception(f"Analitik kehadiran sekolah {school_id} gagal")
+        raise self.retry(exc=exc, countdown=300)
 
-    except Exception as e:
-        logger.error(f"Gagal mengirim email ke {to_email}: {str(e)}")
-        raise self.retry(exc=e)
\ No newline at end of file
+@celery.task
+def rollup_attendance_task(days: int = 0):
+    """Rekap absensi harian hari ini dan `days` hari sebelumnya (beat)"""
+    from utils import attendance_trends
+    return attendance_trends.rollup_recent(days)
@@ -0,0 +1,253 @@
+"""
+Analitik kehadiran per siswa dan kelas untuk mendeteksi siswa berisiko.
+
+Per sekolah, absensi ANALYTICS_WINDOW_DAYS hari terakhir dimuat dalam dua
+query (siswa aktif dan absensi) lalu disusun menjadi matriks siswa x hari
+sekolah (utils/school_calendar.py). Semua angka dihitung sekaligus untuk
+seluruh matriks dengan numpy/pandas, bukan query per siswa:
+
+- rate_7 / rate_30: kehadiran 7 dan 30 hari sekolah terakhir
+- baseline_rate dan rate_drop: kehadiran sebelum 30 hari terakhir dan
+  penurunannya; penurunan dianggap tidak biasa bila besar dan menyimpang
+  dari teman sekelas (z-score per kelas), jadi wabah satu kelas tidak
+  membuat semua siswanya ditandai
+- current_streak / longest_streak: tidak hadir tanpa keterangan berturut-turut
+
+Hari tanpa absensi dianggap tidak hadir, kecuali hari yang sama sekali tidak
+ada absensinya di sekolah (belum dicatat) atau sebelum siswa terdaftar.
+
+IZIN dan SAKIT sengaja dihitung tidak hadir pada rate (ketidakhadiran kronis
+tetap berisiko walau ada keterangannya), tetapi tidak masuk streak: streak
+hanya menghitung ALPHA dan hari tanpa absensi, dan hari IZIN/SAKIT di
+tengahnya dilewati (tidak menambah maupun memutus). Siswa yang sakit
+seminggu dengan surat tidak ditandai "Tidak hadir berturut-turut".
+Hasil disimpan di attendance_risks (diganti setiap refresh malam).
+"""
+import logging
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import case, delete, func, insert, select
+from extensions import db
+from models import (
+    Attendance, AttendanceRisk, AttendanceStatus, Classroom, School, Student, User, jakarta_now, jakarta_now_naive
+)
+from utils import school_calendar
+from utils.db_routing import replica_engine
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+CHRONIC = 'chronic'
+STREAK = 'streak'
+DROP = 'drop'
+REASON_LABELS = {
+    CHRONIC: 'Kehadiran rendah',
+    STREAK: 'Tidak hadir berturut-turut',
+    DROP: 'Penurunan tidak biasa',
+}
+
+
+def _load(school_id, start, end):
+    """Siswa aktif dan absensi sekolah di [start, end] dalam dua query"""
+    import pandas as pd
+    students, users, attendances = Student.__table__, User.__table__, Attendance.__table__
+    engine = replica_engine(db) or db.engine
+    with engine.connect() as connection:
+        roster = pd.DataFrame(connection.execute(
+            select(students.c.id, students.c.classroom_id, students.c.created_at)
+            .join(users, users.c.id == students.c.user_id)
+            .where(students.c.school_id == school_id, students.c.classroom_id.is_not(None),
+                   users.c.is_active.is_(True))
+            .order_by(students.c.id)
+        ).all(), columns=['student_id', 'classroom_id', 'created_at'])
+        records = pd.DataFrame(connection.execute(
+            select(attendances.c.student_id, attendances.c.date, attendances.c.status)
+            .where(attendances.c.school_id == school_id,
+                   attendances.c.date >= start, attendances.c.date <= end)
+        ).all(), columns=['student_id', 'date', 'status'])
+    return roster, records
+
+
+def _matrix(roster, records, days):
+    """
+    Matriks kehadiran siswa x hari: 1 hadir, 0 tidak hadir, NaN tidak
+    diketahui (belum terdaftar atau hari itu belum ada absensi sama sekali),
+    beserta matriks boolean hari IZIN/SAKIT
+    """
+    import numpy as np
+    import pandas as pd
+    matrix = np.full((len(roster), len(days)), np.nan)
+    excused = np.zeros((len(roster), len(days)), dtype=bool)
+    day_index = pd.Index(days)
+    if len(records):
+        rows = pd.Index(roster['student_id']).get_indexer(records['student_id'])
+        columns = day_index.get_indexer(records['date'])
+        known = (rows >= 0) & (columns >= 0)
+        present = (records['status'] == AttendanceStatus.HADIR).to_numpy(dtype=float)
+        matrix[rows[known], columns[known]] = present[known]
+        has_excuse = records['status'].isin([AttendanceStatus.IZIN, AttendanceStatus.SAKIT]).to_numpy()
+        excused[rows[known], columns[known]] = has_excuse[known]
+
+    recorded_days = np.isfinite(matrix).any(axis=0)
+    enrolled_from = np.array([created.date() if created else date.min for created in roster['created_at']],
+                             dtype=object)
+    enrolled = np.array(days, dtype=object)[None, :] >= enrolled_from[:, None]
+    return np.where(np.isnan(matrix) & enrolled & recorded_days[None, :], 0.0, matrix), excused
+
+
+def _rate(matrix):
+    import numpy as np
+    valid = np.isfinite(matrix)
+    counts = valid.sum(axis=1)
+    totals = np.where(valid, matrix, 0.0).sum(axis=1)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan), counts
+
+
+def _streaks(absent, skipped):
+    """
+    (berturut-turut sampai hari terakhir, terpanjang) per baris matriks
+    boolean `absent`; hari `skipped` tidak dihitung dan tidak memutus run
+    """
+    import numpy as np
+    if absent.shape[1] == 0:
+        zeros = np.zeros(absent.shape[0], dtype=int)
+        return zeros, zeros
+    span = absent | skipped
+    current = (np.cumprod(span[:, ::-1], axis=1).astype(bool) & absent[:, ::-1]).sum(axis=1)
+    running = np.cumsum(absent, axis=1)
+    # Nilai cumsum pada hari yang memutus run terakhir = awal run berikutnya
+    resets = np.maximum.accumulate(np.where(span, 0, running), axis=1)
+    longest = (running - resets).max(axis=1)
+    return current.astype(int), longest.astype(int)
+
+
+def compute(school_id, today=None):
+    """DataFrame hasil analitik satu sekolah (satu baris per siswa aktif)"""
+    import numpy as np
+    import pandas as pd
+    config = current_app.config
+    today = today or jakarta_now().date()
+    # Hari ini belum selesai; jendela berakhir kemarin
+    end = today - timedelta(days=1)
+    start = end - timedelta(days=config['ANALYTICS_WINDOW_DAYS'] - 1)
+    days = school_calendar.school_dates(school_id, start, end)
+    roster, records = _load(school_id, start, end)
+    if roster.empty:
+        return pd.DataFrame()
+
+    matrix, excused = _matrix(roster, records, days)
+    rate_7, _ = _rate(matrix[:, -7:])
+    rate_30, observed_30 = _rate(matrix[:, -30:])
+    baseline, _ = _rate(matrix[:, :-30])
+    current_streak, longest_streak = _streaks((matrix == 0.0) & ~excused, excused)
+
+    result = roster[['student_id', 'classroom_id']].copy()
+    result['school_days'] = np.isfinite(matrix).sum(axis=1)
+    result['rate_7'] = rate_7
+    result['rate_30'] = rate_30
+    result['baseline_rate'] = baseline
+    result['rate_drop'] = baseline - rate_30
+    result['current_streak'] = current_streak
+    result['longest_streak'] = longest_streak
+
+    # Penurunan dibandingkan teman sekelas (z-score per kelas)
+    by_class = result.groupby('classroom_id')['rate_drop']
+    spread = by_class.transform('std').replace(0, np.nan)
+    result['anomaly_score'] = ((result['rate_drop'] - by_class.transform('mean')) / spread).fillna(0.0)
+
+    judged = observed_30 >= config['ANALYTICS_MIN_DAYS']
+    chronic = judged & (result['rate_30'] < config['ANALYTICS_RISK_RATE'])
+    streak = result['current_streak'] >= config['ANALYTICS_RISK_STREAK']
+    drop = judged & (result['rate_drop'] >= config['ANALYTICS_DROP_THRESHOLD']) & (
+        result['anomaly_score'] >= config['ANALYTICS_DROP_ZSCORE']
+    )
+    result['is_at_risk'] = chronic | streak | drop
+    result['reasons'] = [
+        [reason for reason, flag in ((CHRONIC, c), (STREAK, s), (DROP, d)) if flag]
+        for c, s, d in zip(chronic, streak, drop)
+    ]
+    result['risk_score'] = (
+        (1 - result['rate_30'].fillna(1.0))
+        + 0.1 * result['current_streak']
+        + result['rate_drop'].clip(lower=0).fillna(0.0)
+    ).round(4)
+    return result
+
+
+def _native(value):
+    # Nilai numpy -> tipe Python biasa (psycopg2 tidak mengenal numpy), NaN -> None
+    if isinstance(value, list):
+        return value
+    if hasattr(value, 'item'):
+        value = value.item()
+    return None if isinstance(value, float) and value != value else value
+
+
+def refresh_school(school_id, today=None):
+    """Hitung ulang dan ganti baris attendance_risks satu sekolah"""
+    today = today or jakarta_now().date()
+    result = compute(school_id, today)
+    table = AttendanceRisk.__table__
+    now = jakarta_now_naive()
+    db.session.execute(delete(table).where(table.c.school_id == school_id))
+    if not result.empty:
+        db.session.execute(insert(table), [
+            {**{column: _native(value) for column, value in row.items()},
+             'school_id': school_id, 'computed_on': today, 'created_at': now, 'updated_at': now}
+            for row in result.to_dict('records')
+        ])
+    db.session.commit()
+    at_risk = int(result['is_at_risk'].sum()) if not result.empty else 0
+    logger.info(f"Analitik kehadiran sekolah {school_id}: {len(result)} siswa, {at_risk} berisiko")
+    return {'students': len(result), 'at_risk': at_risk}
+
+
+def dispatch():
+    """Kirim task refresh per sekolah aktif (dipanggil beat setiap malam)"""
+    from tasks import attendance_analytics_school_task
+    school_ids = [school_id for (school_id,) in db.session.query(School.id).filter(
+        School.is_active.is_(True)
+    ).order_by(School.id)]
+    for school_id in school_ids:
+        attendance_analytics_school_task.delay(school_id)
+    return school_ids
+
+
+def at_risk(school_id, limit=10):
+    """Siswa berisiko untuk dashboard admin, urut skor tertinggi"""
+    return [{
+        'student_id': risk.student_id,
+        'name': name,
+        'nis': nis,
+        'classroom': classroom,
+        'rate_30': risk.rate_30,
+        'current_streak': risk.current_streak,
+        'rate_drop': risk.rate_drop,
+        'reasons': [REASON_LABELS.get(reason, reason) for reason in risk.reasons or []],
+        'computed_on': risk.computed_on,
+    } for risk, name, nis, classroom in db.session.query(
+        AttendanceRisk, Student.full_name, Student.nis, Classroom.name
+    ).join(Student, Student.id == AttendanceRisk.student_id)
+     .outerjoin(Classroom, Classroom.id == AttendanceRisk.classroom_id)
+     .filter(AttendanceRisk.school_id == school_id, AttendanceRisk.is_at_risk.is_(True))
+     .order_by(AttendanceRisk.risk_score.desc(), AttendanceRisk.student_id)
+     .limit(limit)]
+
+
+def classroom_summary(school_id):
+    """Rata-rata kehadiran dan jumlah siswa berisiko per kelas"""
+    return [{
+        'classroom_id': classroom_id,
+        'classroom': name,
+        'students': students,
+        'rate_7': rate_7,
+        'rate_30': rate_30,
+        'at_risk': int(risky or 0),
+    } for classroom_id, name, students, rate_7, rate_30, risky in db.session.query(
+        AttendanceRisk.classroom_id, Classroom.name, func.count(AttendanceRisk.id),
+        func.avg(AttendanceRisk.rate_7), func.avg(AttendanceRisk.rate_30),
+        func.sum(case((AttendanceRisk.is_at_risk.is_(True), 1), else_=0))
+    ).outerjoin(Classroom, Classroom.id == AttendanceRisk.classroom_id)
+     .filter(AttendanceRisk.school_id == school_id)
+     .group_by(AttendanceRisk.classroom_id, Classroom.name)
+     .order_by(func.avg(AttendanceRisk.rate_30))]
@@ -0,0 +1,143 @@
+"""
+Tren kehadiran harian/mingguan/bulanan dari rekap attendance_daily.
+
+Rekap dibangun ulang per rentang tanggal untuk semua sekolah sekaligus:
+satu DELETE dan satu INSERT ... SELECT ... GROUP BY per rentang. Di
+PostgreSQL rebuild dijalankan di bawah advisory lock transaksi, sehingga
+job "hari ini" dan job malam (atau task yang dikirim ulang) yang tumpang
+tindih berjalan bergantian dan tidak menghitung dobel; unique constraint
+(sekolah, kelas, tanggal) menjaga sisanya. Beat
+merekap hari ini setiap ATTENDANCE_ROLLUP_INTERVAL detik dan beberapa hari
+terakhir setiap malam (absensi yang dikoreksi belakangan); riwayat lama
+bisa diisi dengan `flask attendance-rollup --days N`.
+
+Endpoint tren hanya membaca rekap (satu baris per kelas per hari), jadi
+biayanya tidak ikut membesar bersama tabel attendances. Rentang panjang
+diringkas per minggu atau bulan agar jumlah titik grafik tetap kecil, dan
+response di-cache per sekolah, kelas, rentang dan granularitas.
+"""
+import logging
+from datetime import timedelta
+from flask import current_app, jsonify
+from sqlalchemy import case, delete, func, insert, literal, select
+from extensions import cache, db
+from models import Attendance, AttendanceDaily, AttendanceStatus, jakarta_now, jakarta_now_naive
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+STATUSES = ('hadir', 'izin', 'sakit', 'alpha')
+GRANULARITIES = ('day', 'week', 'month')
+FIELDS = ['date', 'rate', 'recorded', 'hadir', 'izin', 'sakit', 'alpha']
+# Kunci pg_advisory_xact_lock untuk rebuild rekap
+ROLLUP_LOCK_ID = 0x61747464
+
+
+def rollup(start, end):
+    """Bangun ulang rekap semua sekolah untuk [start, end] (inklusif)"""
+    attendances, daily = Attendance.__table__, AttendanceDaily.__table__
+    now = jakarta_now_naive()
+    counts = select(
+        attendances.c.school_id,
+        attendances.c.classroom_id,
+        attendances.c.date,
+        func.count(),
+        *[func.sum(case((attendances.c.status == AttendanceStatus(status), 1), else_=0))
+          for status in STATUSES],
+        literal(now, daily.c.created_at.type),
+        literal(now, daily.c.updated_at.type),
+    ).where(
+        attendances.c.date >= start, attendances.c.date <= end
+    ).group_by(attendances.c.school_id, attendances.c.classroom_id, attendances.c.date)
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # Dilepas otomatis saat commit/rollback
+        db.session.execute(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_ID)))
+    db.session.execute(delete(daily).where(daily.c.date >= start, daily.c.date <= end))
+    rows = db.session.execute(insert(daily).from_select(
+        ['school_id', 'classroom_id', 'date', 'recorded', *STATUSES, 'created_at', 'updated_at'], counts
+    )).rowcount
+    db.session.commit()
+    logger.info(f"Rekap absensi {start} s/d {end}: {rows} baris")
+    return rows
+
+
+def rollup_recent(days=0, chunk_days=31):
+    """Rekap hari ini dan `days` hari sebelumnya, per potongan agar transaksi pendek"""
+    today = jakarta_now().date()
+    end = today
+    total = 0
+    while end >= today - timedelta(days=days):
+        start = max(end - timedelta(days=chunk_days - 1), today - timedelta(days=days))
+        total += rollup(start, end)
+        end = start - timedelta(days=1)
+    return total
+
+
+def pick_granularity(start, end, granularity=None):
+    """Granularitas yang diminta, atau yang terkecil dengan titik <= ATTENDANCE_TREND_MAX_POINTS"""
+    if granularity in GRANULARITIES:
+        return granularity
+    days = (end - start).days + 1
+    max_points = current_app.config['ATTENDANCE_TREND_MAX_POINTS']
+    if days <= max_points:
+        return 'day'
+    if days / 7 <= max_points:
+        return 'week'
+    return 'month'
+
+
+def _bucket(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def series(school_id, start, end, classroom_id=None, granularity='day'):
+    """Titik [tanggal awal bucket, rate, recorded, hadir, izin, sakit, alpha] urut tanggal"""
+    query = db.session.query(
+        AttendanceDaily.date,
+        func.sum(AttendanceDaily.recorded),
+        *[func.sum(getattr(AttendanceDaily, status)) for status in STATUSES]
+    ).filter(
+        AttendanceDaily.school_id == school_id,
+        AttendanceDaily.date >= start,
+        AttendanceDaily.date <= end
+    )
+    if classroom_id:
+        query = query.filter(AttendanceDaily.classroom_id == classroom_id)
+
+    buckets = {}
+    for day, *counts in query.group_by(AttendanceDaily.date).order_by(AttendanceDaily.date):
+        totals = buckets.setdefault(_bucket(day, granularity), [0] * (len(STATUSES) + 1))
+        for index, count in enumerate(counts):
+            totals[index] += int(count or 0)
+
+    # Rate = hadir / tercatat, dijumlah dulu per bucket agar hari ramai berbobot lebih
+    return [
+        [bucket.isoformat(), round(totals[1] / totals[0], 4) if totals[0] else None, *totals]
+        for bucket, totals in sorted(buckets.items())
+    ]
+
+
+def trend_response(school_id, start, end, classroom_id=None, granularity=None):
+    """Response JSON tren dengan cache per sekolah, kelas, rentang dan granularitas"""
+    granularity = pick_granularity(start, end, granularity)
+    key = f'attendance_trend:{school_id}:{classroom_id or "all"}:{start}:{end}:{granularity}'
+    body = cache.get(key)
+    if body is None:
+        body = {
+            'school_id': school_id,
+            'classroom_id': classroom_id,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'granularity': granularity,
+            'fields': FIELDS,
+            'points': series(school_id, start, end, classroom_id, granularity),
+        }
+        cache.set(key, body, timeout=current_app.config['ATTENDANCE_TREND_CACHE_SECONDS'])
+    response = jsonify(body)
+    response.headers['Cache-Control'] = f"private, max-age={current_app.config['ATTENDANCE_TREND_CACHE_SECONDS']}"
+    return response
@@ -0,0 +1,130 @@
+"""
+ALPHA otomatis untuk siswa yang tidak absen sampai jam pulang sekolah.
+
+Fitur ini opt-in (AUTO_ALPHA_ENABLED). Beat menjalankan dispatch() berkala: sekolah aktif yang sudah lewat batas
+jam (schools.auto_alpha_cutoff atau AUTO_ALPHA_CUTOFF) dan belum diproses
+hari ini mendapat task sendiri, jadi sekolah diproses paralel oleh worker.
+
+Per sekolah, baris sekolah dikunci lalu satu INSERT ... SELECT dengan
+NOT EXISTS (anti-join) mencatat ALPHA untuk siswa aktif yang belum punya
+absensi tanggal itu. schools.auto_alpha_date diisi di transaksi yang sama,
+sehingga task ganda atau beat yang berulang tidak membuat baris dobel.
+Scan yang masuk bersamaan dengan INSERT (tanpa kunci baris sekolah) dijaga
+index unik (student_id, date): INSERT memakai ON CONFLICT DO NOTHING dan
+scan sync yang bentrok diulang lalu mengganti ALPHA otomatis.
+Hari libur (akhir pekan dan event libur, utils/school_calendar.py) dilewati.
+
+Baris yang dibuat di sini ditandai recorded_by NULL dan notes NOTES (lihat
+is_auto_alpha), sehingga scan offline yang baru tersinkron setelah batas jam
+boleh menggantinya.
+"""
+import logging
+from datetime import time
+from flask import current_app
+from sqlalchemy import exists, insert, literal, or_, select
+from extensions import db
+from models import Attendance, AttendanceStatus, School, Student, User, jakarta_now, jakarta_now_naive
+from utils import school_calendar
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+NOTES = 'ALPHA otomatis: tidak ada absensi sampai batas jam'
+
+
+def is_auto_alpha(attendance):
+    """True jika absensi dibuat oleh job ini (belum disentuh guru/admin)"""
+    return attendance.recorded_by is None and attendance.notes == NOTES
+
+
+def default_cutoff():
+    return time.fromisoformat(current_app.config['AUTO_ALPHA_CUTOFF'])
+
+
+def due_schools(now=None):
+    """ID sekolah aktif yang sudah lewat batas jam dan belum diproses hari ini"""
+    now = now or jakarta_now()
+    today = now.date()
+    cutoff = default_cutoff()
+    rows = db.session.query(School.id, School.auto_alpha_cutoff).filter(
+        School.is_active.is_(True),
+        or_(School.auto_alpha_date.is_(None), School.auto_alpha_date < today)
+    ).order_by(School.id).all()
+    return [school_id for school_id, school_cutoff in rows if now.time() >= (school_cutoff or cutoff)]
+
+
+def _mark_processed(school, day):
+    if school.auto_alpha_date is None or school.auto_alpha_date < day:
+        school.auto_alpha_date = day
+
+
+def _insert(table):
+    """INSERT dialek PostgreSQL/SQLite (mendukung ON CONFLICT), selain itu INSERT biasa"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(table)
+    return dialect_insert(table)
+
+
+def mark_absent(school_id, day, force=False):
+    """
+    Catat ALPHA untuk siswa aktif sekolah yang belum punya absensi pada `day`.
+    Mengembalikan jumlah baris baru, atau None jika dilewati (sudah diproses,
+    sekolah nonaktif, atau bukan hari sekolah). force=True untuk mengisi
+    tanggal lampau yang terlewat; anti-join tetap mencegah baris dobel.
+    """
+    school = db.session.query(School).filter(School.id == school_id).with_for_update().first()
+    if (school is None or not school.is_active or
+            (not force and school.auto_alpha_date and school.auto_alpha_date >= day)):
+        db.session.rollback()
+        return None
+    if not school_calendar.is_school_day(school_id, day):
+        _mark_processed(school, day)
+        db.session.commit()
+        return None
+
+    attendances, students, users = Attendance.__table__, Student.__table__, User.__table__
+    now = jakarta_now_naive()
+    absent = select(
+        students.c.school_id,
+        students.c.id,
+        students.c.classroom_id,
+        literal(day, attendances.c.date.type),
+        literal(AttendanceStatus.ALPHA, attendances.c.status.type),
+        literal(NOTES),
+        literal(now, attendances.c.created_at.type),
+        literal(now, attendances.c.updated_at.type),
+    ).select_from(students).join(users, users.c.id == students.c.user_id).where(
+        students.c.school_id == school_id,
+        students.c.classroom_id.is_not(None),
+        users.c.is_active.is_(True),
+        ~exists().where(attendances.c.student_id == students.c.id, attendances.c.date == day)
+    )
+    statement = _insert(attendances).from_select(
+        ['school_id', 'student_id', 'classroom_id', 'date', 'status', 'notes', 'created_at', 'updated_at'],
+        absent
+    )
+    if hasattr(statement, 'on_conflict_do_nothing'):
+        # Scan yang tersimpan setelah anti-join dibaca tetap menang (uq_attendances_student_id_date)
+        statement = statement.on_conflict_do_nothing(index_elements=['student_id', 'date'])
+    created = db.session.execute(statement).rowcount
+    _mark_processed(school, day)
+    db.session.commit()
+    logger.info(f"ALPHA otomatis sekolah {school_id} {day}: {created} siswa")
+    return created
+
+
+def dispatch(now=None):
+    """Kirim task per sekolah yang sudah jatuh tempo (dipanggil beat)"""
+    if not current_app.config['AUTO_ALPHA_ENABLED']:
+        return []
+    now = now or jakarta_now()
+    from tasks import auto_alpha_school_task
+    school_ids = due_schools(now)
+    for school_id in school_ids:
+        auto_alpha_school_task.delay(school_id, now.date().isoformat())
+    return school_ids
@@ -0,0 +1,253 @@
+"""
+Generator data sintetis skala besar untuk benchmark dan capacity planning.
+
+Baris dibuat langsung sebagai tuple (tanpa objek ORM) lalu dimuat dengan
+COPY di PostgreSQL atau batched INSERT di database lain (SQLite). ID diisi
+secara eksplisit sehingga tidak perlu round-trip untuk mengambil primary key,
+dan sequence PostgreSQL disesuaikan di akhir. Hasil deterministik untuk seed
+dan kondisi database awal yang sama.
+"""
+import csv
+import io
+import json
+import enum
+import random
+import logging
+from datetime import date, datetime, timedelta
+from werkzeug.security import generate_password_hash
+from extensions import db
+from models import (
+    Attendance, AttendanceStatus, Classroom, EventType, School, SchoolEvent,
+    SchoolSubscription, Student, SubscriptionPlan, Teacher, User, UserRole, jakarta_now, jakarta_now_naive
+)
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+STATUS_CHOICES = [AttendanceStatus.HADIR, AttendanceStatus.IZIN, AttendanceStatus.SAKIT, AttendanceStatus.ALPHA]
+STATUS_WEIGHTS = [90, 4, 4, 2]
+FIRST_NAMES = ['Adi', 'Budi', 'Citra', 'Dewi', 'Eka', 'Fajar', 'Gita', 'Hadi', 'Indah', 'Joko',
+               'Kartika', 'Lestari', 'Made', 'Nur', 'Putri', 'Rizki', 'Sari', 'Tono', 'Wulan', 'Yusuf']
+LAST_NAMES = ['Pratama', 'Saputra', 'Wijaya', 'Santoso', 'Lestari', 'Hidayat', 'Kurniawan',
+              'Permata', 'Nugroho', 'Siregar', 'Wibowo', 'Halim', 'Gunawan', 'Utami']
+
+SCHOOL_COLUMNS = ['id', 'name', 'code', 'is_active', 'primary_color', 'secondary_color', 'created_at', 'updated_at']
+SUBSCRIPTION_COLUMNS = ['id', 'school_id', 'plan', 'is_active', 'start_date', 'end_date',
+                        'max_teachers', 'max_students', 'features']
+USER_COLUMNS = ['id', 'school_id', 'username', 'email', 'password_hash', 'role', 'is_active', 'created_at', 'updated_at']
+TEACHER_COLUMNS = ['id', 'school_id', 'user_id', 'nip', 'full_name', 'is_homeroom', 'created_at', 'updated_at']
+CLASSROOM_COLUMNS = ['id', 'school_id', 'name', 'grade_level', 'homeroom_teacher_id', 'created_at', 'updated_at']
+STUDENT_COLUMNS = ['id', 'school_id', 'user_id', 'nis', 'nisn', 'full_name', 'classroom_id', 'created_at', 'updated_at']
+EVENT_COLUMNS = ['id', 'school_id', 'title', 'description', 'start_date', 'end_date', 'event_type',
+                 'is_holiday', 'created_at', 'updated_at']
+ATTENDANCE_COLUMNS = ['id', 'school_id', 'student_id', 'classroom_id', 'date', 'status', 'recorded_by',
+                      'created_at', 'updated_at']
+
+
+def _to_copy_value(value):
+    """Konversi nilai Python ke representasi teks COPY (CSV)"""
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy Enum menyimpan *nama* anggota enum
+        return value.name
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+class BulkWriter:
+    """Tulis baris ke tabel dengan COPY (PostgreSQL) atau batched INSERT"""
+
+    def __init__(self, connection, batch_size=5000):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.is_postgres = connection.dialect.name == 'postgresql'
+        self.counts = {}
+
+    def write(self, table, columns, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._flush(table, columns, batch)
+                batch = []
+        if batch:
+            self._flush(table, columns, batch)
+
+    def _flush(self, table, columns, batch):
+        if self.is_postgres:
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            for row in batch:
+                writer.writerow(['' if v is None else v for v in map(_to_copy_value, row)])
+            buf.seek(0)
+            cursor = self.connection.connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf
+                )
+            finally:
+                cursor.close()
+        else:
+            self.connection.execute(table.insert(), [dict(zip(columns, row)) for row in batch])
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(batch)
+
+    def reset_sequences(self, tables):
+        """Samakan sequence PostgreSQL dengan id terbesar setelah insert id eksplisit"""
+        if not self.is_postgres:
+            return
+        for table in tables:
+            self.connection.exec_driver_sql(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+            )
+
+
+def school_days(start, end):
+    """Semua hari Senin-Jumat di rentang [start, end)"""
+    days = []
+    current = start
+    while current < end:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=1)
+    return days
+
+
+def _next_ids(connection, models):
+    return {
+        model.__table__.name: (connection.execute(
+            db.select(db.func.coalesce(db.func.max(model.id), 0))
+        ).scalar() + 1)
+        for model in models
+    }
+
+
+def generate_tenants(schools=10, classrooms=10, students=30, teachers=None, days=365,
+                     events=12, seed=42, password='password123', absent_rate=0.01,
+                     batch_size=5000, progress=None):
+    """
+    Generate data tenant secara massal.
+
+    `classrooms` per sekolah, `students` per kelas, `teachers` per sekolah
+    (default satu wali kelas per kelas ditambah 20%), `days` hari kalender
+    riwayat absensi sampai kemarin. `absent_rate` adalah peluang siswa tidak
+    punya baris absensi sama sekali pada suatu hari (tidak scan).
+    """
+    teachers = teachers or max(classrooms, int(classrooms * 1.2))
+    today = jakarta_now().date()
+    now = jakarta_now_naive()
+    history = school_days(today - timedelta(days=days), today)
+    password_hash = generate_password_hash(password)
+    models = [School, SchoolSubscription, User, Teacher, Classroom, Student, SchoolEvent, Attendance]
+
+    with db.engine.begin() as connection:
+        ids = _next_ids(connection, models)
+    # Mulai nomor sekolah dari id berikutnya agar code/username tetap unik
+    first_school_id = ids['schools']
+
+    totals = {}
+    for index in range(schools):
+        # RNG per sekolah: hasil satu sekolah tidak bergantung pada sekolah lain
+        rng = random.Random(f'{seed}:{index}')
+        school_id = first_school_id + index
+        tag = f'g{school_id}'
+
+        school_rows = [(school_id, f'Sekolah Sintetis {school_id}', f'GEN{school_id:06d}', True,
+                        '#0d6efd', '#6c757d', now, now)]
+        subscription_rows = [(ids['school_subscriptions'], school_id, SubscriptionPlan.PREMIUM, True,
+                              today - timedelta(days=days + 30), today + timedelta(days=365),
+                              teachers + 10, classrooms * students + 100, {})]
+        ids['school_subscriptions'] += 1
+
+        user_rows = []
+        user_rows.append((ids['users'], school_id, f'admin_{tag}', f'admin_{tag}@gen.local',
+                          password_hash, UserRole.ADMIN, True, now, now))
+        ids['users'] += 1
+
+        teacher_rows = []
+        for t in range(teachers):
+            user_id = ids['users']
+            ids['users'] += 1
+            user_rows.append((user_id, school_id, f'{tag}_t{t}', f'{tag}_t{t}@gen.local',
+                              password_hash, UserRole.TEACHER, True, now, now))
+            name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            teacher_rows.append((ids['teachers'], school_id, user_id, f'{school_id}{t:05d}', name,
+                                 t < classrooms, now, now))
+            ids['teachers'] += 1
+
+        classroom_rows = []
+        student_rows = []
+        for c in range(classrooms):
+            classroom_id = ids['classrooms']
+            ids['classrooms'] += 1
+            grade = c % 6 + 1
+            classroom_rows.append((classroom_id, school_id, f'Kelas {grade}-{c // 6 + 1}', str(grade),
+                                   teacher_rows[c][0], now, now))
+            for n in range(students):
+                user_id = ids['users']
+                ids['users'] += 1
+                nis = f'{school_id}{c:03d}{n:04d}'
+                user_rows.append((user_id, school_id, f'student_{tag}_{nis}', f'{tag}_{nis}@gen.local',
+                                  password_hash, UserRole.STUDENT, True, now, now))
+                name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+                student_rows.append((ids['students'], school_id, user_id, nis, f'00{nis}', name,
+                                     classroom_id, now, now))
+                ids['students'] += 1
+
+        event_rows = []
+        holidays = set()
+        for e in range(events):
+            start = today - timedelta(days=rng.randrange(max(days, 1)))
+            length = rng.randint(1, 5)
+            event_type = rng.choice(list(EventType))
+            is_holiday = event_type == EventType.LIBUR
+            if is_holiday:
+                holidays.update(start + timedelta(days=d) for d in range(length))
+            event_rows.append((ids['school_events'], school_id, f'{event_type.value.title()} {e + 1}', '',
+                               datetime.combine(start, datetime.min.time()),
+                               datetime.combine(start + timedelta(days=length), datetime.min.time()),
+                               event_type, is_holiday, now, now))
+            ids['school_events'] += 1
+
+        def attendance_rows():
+            # Generator: riwayat absensi tidak pernah dimuat utuh ke memori
+            for day in history:
+                if day in holidays:
+                    continue
+                created = datetime.combine(day, datetime.min.time()) + timedelta(hours=7)
+                for student in student_rows:
+                    if rng.random() < absent_rate:
+                        continue
+                    status = rng.choices(STATUS_CHOICES, STATUS_WEIGHTS)[0]
+                    teacher_id = teacher_rows[rng.randrange(len(teacher_rows))][0]
+                    yield (ids['attendances'], school_id, student[0], student[6], day, status,
+                           teacher_id, created, created)
+                    ids['attendances'] += 1
+
+        # Satu transaksi per sekolah: progres tersimpan dan memori tetap kecil
+        with db.engine.begin() as connection:
+            writer = BulkWriter(connection, batch_size=batch_size)
+            writer.write(School.__table__, SCHOOL_COLUMNS, school_rows)
+            writer.write(SchoolSubscription.__table__, SUBSCRIPTION_COLUMNS, subscription_rows)
+            writer.write(User.__table__, USER_COLUMNS, user_rows)
+            writer.write(Teacher.__table__, TEACHER_COLUMNS, teacher_rows)
+            writer.write(Classroom.__table__, CLASSROOM_COLUMNS, classroom_rows)
+            writer.write(Student.__table__, STUDENT_COLUMNS, student_rows)
+            writer.write(SchoolEvent.__table__, EVENT_COLUMNS, event_rows)
+            writer.write(Attendance.__table__, ATTENDANCE_COLUMNS, attendance_rows())
+
+        for table, count in writer.counts.items():
+            totals[table] = totals.get(table, 0) + count
+        if progress:
+            progress(index + 1, schools, totals)
+
+    with db.engine.begin() as connection:
+        BulkWriter(connection).reset_sequences([m.__table__ for m in models])
+
+    return totals
@@ -0,0 +1,104 @@
+"""
+Profil connection pool per jenis proses.
+
+- web: gunicorn, satu koneksi per thread request ditambah cadangan kecil
+- worker: celery prefork, satu task per proses
+- cli: perintah flask / skrip satu kali
+
+Profil dipilih otomatis di create_app (bisa dipaksa dengan DB_POOL_PROFILE).
+Dengan DB_PGBOUNCER=true pooling diserahkan ke PgBouncer (transaction
+pooling): NullPool, tanpa prepared statement di server dan tanpa parameter
+startup `options` (set timezone lewat ALTER DATABASE ... SET timezone).
+"""
+import logging
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+POOL_KEYS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping', 'poolclass')
+
+# Deteksi koneksi mati lewat TCP keepalive, bukan query tambahan per checkout
+KEEPALIVE_ARGS = {'keepalives': 1, 'keepalives_idle': 30, 'keepalives_interval': 10, 'keepalives_count': 3}
+
+
+def select_profile(app, worker=False):
+    """Pilih profil pool: DB_POOL_PROFILE, lalu worker, lalu CLI flask, selain itu web"""
+    profile = app.config.get('DB_POOL_PROFILE')
+    if profile:
+        return profile
+    if worker:
+        return 'worker'
+    import click
+    ctx = click.get_current_context(silent=True)
+    # `flask run` melayani request, perintah flask lainnya sekali jalan
+    if ctx is not None and ctx.info_name != 'run':
+        return 'cli'
+    return 'web'
+
+
+def engine_options(config, profile, url, base):
+    """Gabungkan opsi engine dasar dengan profil pool (hanya PostgreSQL)"""
+    options = dict(base)
+    if url is None or make_url(url).get_backend_name() != 'postgresql':
+        # SQLite dan lainnya memakai pool bawaan SQLAlchemy; parameter
+        # startup `options` hanya dikenal libpq
+        connect_args = {k: v for k, v in options.get('connect_args', {}).items() if k != 'options'}
+        if connect_args:
+            options['connect_args'] = connect_args
+        else:
+            options.pop('connect_args', None)
+        return options
+
+    connect_args = dict(options.get('connect_args', {}))
+    connect_args.update(KEEPALIVE_ARGS)
+    if config['DB_PGBOUNCER']:
+        options = {key: value for key, value in options.items() if key not in POOL_KEYS}
+        options['poolclass'] = NullPool
+        # PgBouncer menolak parameter startup selain yang di-whitelist
+        connect_args.pop('options', None)
+        if make_url(url).get_driver_name() == 'psycopg':
+            # psycopg 3 membuat prepared statement otomatis; matikan
+            connect_args['prepare_threshold'] = None
+    else:
+        options.update(config['DB_POOL_PROFILES'][profile])
+        options.setdefault('pool_recycle', config['DB_POOL_RECYCLE'])
+        options['pool_pre_ping'] = config['DB_POOL_PRE_PING']
+    options['connect_args'] = connect_args
+    return options
+
+
+def configure(app, worker=False):
+    """Terapkan profil pool ke SQLALCHEMY_ENGINE_OPTIONS dan semua bind"""
+    config = app.config
+    profile = select_profile(app, worker)
+    if profile not in config['DB_POOL_PROFILES']:
+        raise ValueError(f"DB_POOL_PROFILE '{profile}' tidak dikenal")
+
+    base = config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        config, profile, config.get('SQLALCHEMY_DATABASE_URI'), base
+    )
+    binds = {}
+    for key, value in config.get('SQLALCHEMY_BINDS', {}).items():
+        bind = {'url': value} if not isinstance(value, dict) else dict(value)
+        binds[key] = engine_options(config, profile, bind['url'], {**base, **bind})
+    config['SQLALCHEMY_BINDS'] = binds
+    config['DB_POOL_ACTIVE_PROFILE'] = 'pgbouncer' if config['DB_PGBOUNCER'] else profile
+    return profile
+
+
+def pool_stats(engine):
+    """Statistik pool dalam dict (NullPool tidak punya statistik)"""
+    pool = engine.pool
+    stats = {'class': type(pool).__name__}
+    for state, getter in (('size', 'size'), ('checked_out', 'checkedout'),
+                          ('idle', 'checkedin'), ('overflow', 'overflow')):
+        fn = getattr(pool, getter, None)
+        if fn is not None:
+            try:
+                stats[state] = max(fn(), 0)
+            except Exception:
+                pass
+    return stats
@@ -0,0 +1,128 @@
+"""
+Routing query baca ke read replica (opsional).
+
+Jika SQLALCHEMY_BINDS berisi bind 'replica', SELECT di dalam `read_replica`
+(decorator view) atau `use_replica()` (context manager untuk task/CLI) dikirim
+ke replica. Flush, INSERT/UPDATE/DELETE dan semua query di luar blok tersebut
+tetap ke primary. Replica dicek berkala; jika lag melebihi
+REPLICA_MAX_LAG_SECONDS atau tidak bisa dihubungi, query kembali ke primary.
+"""
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+
+_lock = threading.Lock()
+# Status replica per engine: {'healthy': bool, 'checked_at': float}
+_state = {}
+
+# Lag replay PostgreSQL; 0 jika semua WAL yang diterima sudah di-replay
+# (replay timestamp lama pada primary yang idle bukan berarti lag)
+PG_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class RoutingSession(Session):
+    """Session Flask-SQLAlchemy yang mengarahkan SELECT baca ke replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _replica_requested() \
+                and getattr(clause, 'is_select', False):
+            engine = replica_engine(self._db)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _replica_requested():
+    return has_app_context() and g.get('_use_replica', False)
+
+
+def _check(engine):
+    """Kembalikan True jika replica bisa dipakai (terhubung dan lag kecil)"""
+    max_lag = current_app.config['REPLICA_MAX_LAG_SECONDS']
+    try:
+        with engine.connect() as conn:
+            if engine.dialect.name == 'postgresql':
+                lag = float(conn.execute(PG_LAG_SQL).scalar() or 0)
+                if lag > max_lag:
+                    logger.warning(f"Replica tertinggal {lag:.1f}s (batas {max_lag}s), pakai primary")
+                    return False
+            else:
+                conn.execute(text('SELECT 1'))
+        return True
+    except Exception as e:
+        logger.warning(f"Replica tidak tersedia, pakai primary: {str(e)}")
+        return False
+
+
+def replica_engine(db):
+    """Engine replica jika dikonfigurasi dan sehat, selain itu None"""
+    engine = db.engines.get(REPLICA_BIND)
+    if engine is None:
+        return None
+
+    interval = current_app.config['REPLICA_CHECK_INTERVAL']
+    now = time.monotonic()
+    state = _state.get(engine)
+    if state is None or now - state['checked_at'] >= interval:
+        # Hanya satu thread yang melakukan pengecekan; lainnya memakai status lama
+        if _lock.acquire(blocking=state is None):
+            try:
+                state = {'healthy': _check(engine), 'checked_at': time.monotonic()}
+                _state[engine] = state
+            finally:
+                _lock.release()
+    return engine if state and state['healthy'] else None
+
+
+def mark_unhealthy(engine):
+    _state[engine] = {'healthy': False, 'checked_at': time.monotonic()}
+
+
+@contextmanager
+def use_replica():
+    """Arahkan SELECT di dalam blok ke replica (jika tersedia)"""
+    previous = g.get('_use_replica', False)
+    g._use_replica = True
+    try:
+        yield
+    finally:
+        g._use_replica = previous
+
+
+def read_replica(f):
+    """
+    Decorator untuk view read-only (export, dashboard, riwayat). Pasang
+    paling dekat dengan fungsi agar pengecekan login tetap memakai primary.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        with use_replica():
+            return f(*args, **kwargs)
+    return decorated_function
+
+
+def init_app(app, db):
+    """Pasang listener error pada engine replica (jika ada)"""
+    with app.app_context():
+        engine = db.engines.get(REPLICA_BIND)
+    if engine is None:
+        return
+
+    @event.listens_for(engine, 'handle_error')
+    def _on_error(context):
+        # Putus koneksi saat query: request berikutnya langsung ke primary
+        if context.is_disconnect:
+            mark_unhealthy(engine)
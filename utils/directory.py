@@ -0,0 +1,171 @@
+"""
+Direktori siswa, guru dan kelas per sekolah dengan keyset pagination.
+
+Urutan selalu (nama, id) dan halaman berikutnya diminta dengan cursor berisi
+nama dan id baris terakhir, jadi halaman ke-100 sama cepatnya dengan
+halaman pertama (index (school_id, nama, id)), tanpa OFFSET maupun COUNT.
+
+Pencarian memakai ILIKE '%kata%' pada nama, NIS, NISN/NIP dan email. Di
+PostgreSQL kolom-kolom itu punya index trigram (pg_trgm, migration
+f19b6c3d8e25); email dicari lewat subquery users agar tiap tabel tetap
+bisa memakai index-nya sendiri.
+"""
+import base64
+import json
+from flask import current_app
+from sqlalchemy import func, or_, select, tuple_
+from extensions import db
+from models import Classroom, Student, Teacher, User
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Cursor -> [nama, id]; ValueError jika rusak"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError('Cursor tidak valid') from e
+    if not (isinstance(values, list) and len(values) == 2 and isinstance(values[0], str)
+            and isinstance(values[1], int) and not isinstance(values[1], bool)):
+        raise ValueError('Cursor tidak valid')
+    return values
+
+
+def page_size(requested=None):
+    config = current_app.config
+    return min(max(requested or config['DIRECTORY_PAGE_SIZE'], 1), config['DIRECTORY_MAX_PAGE_SIZE'])
+
+
+def _pattern(search):
+    escaped = search.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _like(column, pattern):
+    return column.ilike(pattern, escape='\\')
+
+
+def _page(query, name_column, id_column, cursor, limit, serialize):
+    """Ambil satu halaman keyset; kembalikan dict items/next_cursor"""
+    if cursor:
+        name, last_id = decode_cursor(cursor)
+        query = query.filter(tuple_(name_column, id_column) > tuple_(name, last_id))
+    rows = query.order_by(name_column, id_column).limit(limit + 1).all()
+    items = [serialize(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor([getattr(last, name_column.key), getattr(last, id_column.key)])
+    return {'items': items, 'next_cursor': next_cursor, 'limit': limit}
+
+
+def _date(value):
+    return value.strftime('%d/%m/%Y') if value else None
+
+
+def _user_ids_by_email(school_id, pattern):
+    return select(User.id).where(User.school_id == school_id, _like(User.email, pattern))
+
+
+def students(school_id, search=None, classroom_id=None, cursor=None, limit=None):
+    """Satu halaman siswa urut nama, opsional cari dan filter kelas"""
+    query = db.session.query(
+        Student.id, Student.nis, Student.nisn, Student.full_name, Student.classroom_id,
+        Student.created_at, Classroom.name.label('classroom'), User.id.label('user_id'), User.email,
+        User.is_active
+    ).outerjoin(Classroom, Classroom.id == Student.classroom_id) \
+     .outerjoin(User, User.id == Student.user_id) \
+     .filter(Student.school_id == school_id)
+    if classroom_id:
+        query = query.filter(Student.classroom_id == classroom_id)
+    if search and search.strip():
+        pattern = _pattern(search)
+        query = query.filter(or_(
+            _like(Student.full_name, pattern),
+            _like(Student.nis, pattern),
+            _like(Student.nisn, pattern),
+            Student.user_id.in_(_user_ids_by_email(school_id, pattern)),
+        ))
+    return _page(query, Student.full_name, Student.id, cursor, page_size(limit), lambda row: {
+        'id': row.id,
+        'nis': row.nis,
+        'nisn': row.nisn,
+        'full_name': row.full_name,
+        'classroom_id': row.classroom_id,
+        'classroom': row.classroom,
+        'user_id': row.user_id,
+        'email': row.email,
+        'is_active': bool(row.is_active),
+        'created_at': _date(row.created_at),
+    })
+
+
+def teachers(school_id, search=None, is_homeroom=None, cursor=None, limit=None):
+    """Satu halaman guru urut nama beserta kelas perwaliannya, opsional filter wali kelas"""
+    query = db.session.query(
+        Teacher.id, Teacher.nip, Teacher.full_name, Teacher.is_homeroom, Teacher.created_at,
+        User.id.label('user_id'), User.email, User.is_active
+    ).outerjoin(User, User.id == Teacher.user_id).filter(Teacher.school_id == school_id)
+    if is_homeroom is not None:
+        query = query.filter(Teacher.is_homeroom.is_(is_homeroom))
+    if search and search.strip():
+        pattern = _pattern(search)
+        query = query.filter(or_(
+            _like(Teacher.full_name, pattern),
+            _like(Teacher.nip, pattern),
+            Teacher.user_id.in_(_user_ids_by_email(school_id, pattern)),
+        ))
+    page = _page(query, Teacher.full_name, Teacher.id, cursor, page_size(limit), lambda row: {
+        'id': row.id,
+        'nip': row.nip,
+        'full_name': row.full_name,
+        'is_homeroom': bool(row.is_homeroom),
+        'homeroom_class': None,
+        'user_id': row.user_id,
+        'email': row.email,
+        'is_active': bool(row.is_active),
+        'created_at': _date(row.created_at),
+    })
+
+    # Kelas perwalian untuk guru di halaman ini saja (satu query)
+    ids = [item['id'] for item in page['items']]
+    if ids:
+        homerooms = dict(db.session.query(Classroom.homeroom_teacher_id, Classroom.name).filter(
+            Classroom.homeroom_teacher_id.in_(ids)
+        ).order_by(Classroom.id.desc()))
+        for item in page['items']:
+            item['homeroom_class'] = homerooms.get(item['id'])
+    return page
+
+
+def classrooms(school_id, search=None, cursor=None, limit=None):
+    """Satu halaman kelas urut nama dengan wali kelas dan jumlah siswa"""
+    counts = db.session.query(
+        Student.classroom_id, func.count(Student.id).label('student_count')
+    ).filter(Student.school_id == school_id).group_by(Student.classroom_id).subquery()
+    query = db.session.query(
+        Classroom.id, Classroom.name, Classroom.grade_level, Classroom.homeroom_teacher_id,
+        Teacher.full_name.label('homeroom_teacher'), func.coalesce(counts.c.student_count, 0).label('student_count')
+    ).outerjoin(Teacher, Teacher.id == Classroom.homeroom_teacher_id) \
+     .outerjoin(counts, counts.c.classroom_id == Classroom.id) \
+     .filter(Classroom.school_id == school_id)
+    if search and search.strip():
+        query = query.filter(_like(Classroom.name, _pattern(search)))
+    return _page(query, Classroom.name, Classroom.id, cursor, page_size(limit), lambda row: {
+        'id': row.id,
+        'name': row.name,
+        'grade_level': row.grade_level,
+        'homeroom_teacher_id': row.homeroom_teacher_id,
+        'homeroom_teacher': row.homeroom_teacher,
+        'student_count': row.student_count,
+    })
+
+
+def classroom_options(school_id):
+    """(id, nama) semua kelas untuk dropdown filter, tanpa memuat objek Classroom"""
+    return [{'id': classroom_id, 'name': name} for classroom_id, name in db.session.query(
+        Classroom.id, Classroom.name
+    ).filter(Classroom.school_id == school_id).order_by(Classroom.name, Classroom.id)]
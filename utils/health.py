@@ -0,0 +1,181 @@
+import os
+import math
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Pesan error publik; detail (host, DSN) hanya masuk log
+ERROR_MESSAGE = 'tidak dapat dijangkau'
+
+_lock = threading.Lock()
+# Hanya satu probe berjalan per proses; pemanggil lain menunggu lalu memakai hasilnya
+_probe_lock = threading.Lock()
+_last_result = {'expires_at': 0, 'payload': None, 'status_code': 200}
+_probe_engines = {}
+
+
+def _probe_engine(engine, timeout, pgbouncer=False):
+    """
+    Engine khusus health check untuk PostgreSQL: tanpa pool (tidak menunggu
+    pool aplikasi yang penuh) dengan connect_timeout sesuai
+    HEALTH_CHECK_TIMEOUT. Tanpa parameter startup `options` supaya tetap
+    diterima PgBouncer (lihat utils/db_pool.py). Database lain (SQLite di
+    test) memakai engine asli.
+    """
+    if engine.url.get_backend_name() != 'postgresql':
+        return engine
+    key = (engine.url.render_as_string(hide_password=False), timeout, pgbouncer)
+    with _lock:
+        if key not in _probe_engines:
+            connect_args = {'connect_timeout': max(1, math.ceil(timeout))}
+            if pgbouncer and engine.url.get_driver_name() == 'psycopg':
+                connect_args['prepare_threshold'] = None
+            _probe_engines[key] = create_engine(engine.url, poolclass=NullPool, connect_args=connect_args)
+        return _probe_engines[key]
+
+
+def _select_one(app, engine):
+    """SELECT 1 dalam transaksi; di PostgreSQL dengan SET LOCAL statement_timeout"""
+    timeout = app.config['HEALTH_CHECK_TIMEOUT']
+    engine = _probe_engine(engine, timeout, app.config.get('DB_PGBOUNCER', False))
+    with engine.begin() as conn:
+        if engine.url.get_backend_name() == 'postgresql':
+            # SET LOCAL berlaku sampai akhir transaksi, aman untuk transaction pooling
+            conn.execute(text(f'SET LOCAL statement_timeout = {int(timeout * 1000)}'))
+        conn.execute(text('SELECT 1'))
+
+
+def check_database(app):
+    """SELECT 1 ke primary lewat koneksi probe dengan timeout"""
+    from extensions import db
+    with app.app_context():
+        _select_one(app, db.engine)
+
+
+def check_cache(app):
+    """Round-trip set/get ke backend Flask-Caching (Redis memakai CACHE_OPTIONS socket timeout)"""
+    from extensions import cache
+    with app.app_context():
+        # Key unik per probe: worker dan instance lain tidak saling menimpa
+        value = uuid.uuid4().hex
+        key = f'health:ready:{os.getpid()}:{value}'
+        cache.set(key, value, timeout=10)
+        try:
+            if cache.get(key) != value:
+                raise RuntimeError('Nilai cache tidak cocok')
+        finally:
+            cache.delete(key)
+
+
+def check_broker(app):
+    """Koneksi ke broker Celery dengan timeout ketat"""
+    from kombu import Connection
+    timeout = app.config['HEALTH_CHECK_TIMEOUT']
+    transport_options = {'socket_timeout': timeout, 'socket_connect_timeout': timeout}
+    with Connection(app.config['CELERY_BROKER_URL'], connect_timeout=timeout,
+                    transport_options=transport_options) as conn:
+        conn.ensure_connection(max_retries=1, timeout=timeout)
+
+
+def check_s3(app):
+    """HEAD bucket S3 untuk memastikan penyimpanan QR dapat dijangkau"""
+    import boto3
+    from botocore.config import Config as BotoConfig
+    timeout = app.config['HEALTH_CHECK_TIMEOUT']
+    s3_client = boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION"),
+        config=BotoConfig(connect_timeout=timeout, read_timeout=timeout, retries={'max_attempts': 0})
+    )
+    s3_client.head_bucket(Bucket=os.getenv("S3_BUCKET_NAME"))
+
+
+def check_replica(app):
+    """SELECT 1 ke read replica (jika dikonfigurasi)"""
+    from extensions import db
+    with app.app_context():
+        _select_one(app, db.engines['replica'])
+
+
+def _timed(check, app):
+    start = time.perf_counter()
+    check(app)
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def run_checks(app):
+    """
+    Jalankan semua pengecekan secara paralel dan tunggu sampai selesai.
+    Komponen 'critical' menentukan status readiness, komponen lain hanya
+    dilaporkan (degraded).
+    """
+    checks = {
+        'database': (check_database, True),
+        'cache': (check_cache, True),
+        'broker': (check_broker, True),
+    }
+    if app.config.get('SQLALCHEMY_BINDS', {}).get('replica'):
+        # Replica mati tidak membuat app unavailable: query kembali ke primary
+        checks['replica'] = (check_replica, False)
+    if app.config.get('HEALTH_CHECK_S3'):
+        checks['s3'] = (check_s3, False)
+
+    # Setiap check punya timeout sendiri (driver/socket), jadi semua future
+    # selesai sendiri; executor per probe tidak meninggalkan thread menggantung
+    with ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix='health') as executor:
+        futures = {name: executor.submit(_timed, fn, app) for name, (fn, _) in checks.items()}
+
+    components = {}
+    ready = True
+    degraded = False
+    for name, future in futures.items():
+        critical = checks[name][1]
+        try:
+            latency = future.result()
+            components[name] = {'status': 'up', 'latency_ms': latency, 'critical': critical}
+        except Exception:
+            logger.exception(f"Health check {name} gagal")
+            components[name] = {'status': 'down', 'error': ERROR_MESSAGE, 'critical': critical}
+
+        if components[name]['status'] == 'down':
+            if critical:
+                ready = False
+            else:
+                degraded = True
+
+    status = 'ready' if ready else 'unavailable'
+    if ready and degraded:
+        status = 'degraded'
+    return {'status': status, 'components': components}, 200 if ready else 503
+
+
+def readiness(app):
+    """Hasil readiness yang di-cache beberapa detik per proses"""
+    now = time.monotonic()
+    with _lock:
+        if _last_result['payload'] is not None and now < _last_result['expires_at']:
+            return _last_result['payload'], _last_result['status_code']
+
+    with _probe_lock:
+        # Probe lain mungkin baru selesai selagi menunggu lock
+        with _lock:
+            if _last_result['payload'] is not None and time.monotonic() < _last_result['expires_at']:
+                return _last_result['payload'], _last_result['status_code']
+
+        payload, status_code = run_checks(app)
+        with _lock:
+            _last_result.update(
+                expires_at=time.monotonic() + app.config['HEALTH_CACHE_SECONDS'],
+                payload=payload,
+                status_code=status_code
+            )
+        return payload, status_code
@@ -0,0 +1,242 @@
+"""
+Live feed absensi per sekolah lewat Server-Sent Events.
+
+Setiap commit yang membuat atau mengubah Attendance dipublikasikan ke channel
+Redis pub/sub sekolahnya (hook session, jadi semua jalur tulis ikut: scan,
+input manual, bulk, task). Halaman admin membuka satu EventSource ke
+/admin/attendance/stream dan memperbarui tabel secara incremental.
+
+Satu stream memakai satu thread gunicorn selama terbuka, jadi jumlah stream
+per proses dibatasi LIVE_FEED_MAX_STREAMS dan setiap stream ditutup setelah
+LIVE_FEED_MAX_SECONDS (browser otomatis menyambung ulang).
+"""
+import json
+import time
+import logging
+import threading
+from flask import Response, current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm.util import identity_key
+from models import Attendance, Student, Teacher
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'live_feed_events'
+
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    # Matikan buffering nginx agar event langsung terkirim
+    'X-Accel-Buffering': 'no',
+}
+
+_lock = threading.Lock()
+_clients = {}
+# Setelah publish gagal, publish dilewati sampai waktu ini (monotonic)
+_suspended_until = {'value': 0.0}
+_slots = {'semaphore': None, 'size': None}
+
+
+def channel(school_id):
+    return f'hubsensi:attendance:{school_id}'
+
+
+def _client(url):
+    """Client Redis per URL (thread-safe, dengan connection pool sendiri)"""
+    client = _clients.get(url)
+    if client is None:
+        import redis
+        with _lock:
+            client = _clients.get(url)
+            if client is None:
+                client = redis.Redis.from_url(url, socket_connect_timeout=1, socket_timeout=2,
+                                              health_check_interval=30)
+                _clients[url] = client
+    return client
+
+
+def _cached(session, model, pk):
+    """Ambil objek dari identity map tanpa query tambahan"""
+    if pk is None:
+        return None
+    return session.identity_map.get(identity_key(model, pk))
+
+
+def _attendance_event(session, attendance, created):
+    previous = None
+    if not created:
+        state = inspect(attendance)
+        status_history = state.attrs.status.history
+        if not status_history.has_changes() and not state.attrs.notes.history.has_changes():
+            return None
+        if status_history.deleted:
+            previous = status_history.deleted[0]
+
+    student = _cached(session, Student, attendance.student_id)
+    teacher = _cached(session, Teacher, attendance.recorded_by)
+    recorded_at = attendance.updated_at or attendance.created_at
+    return {
+        'type': 'attendance',
+        'school_id': attendance.school_id,
+        'id': attendance.id,
+        'student_id': attendance.student_id,
+        'student_name': student.full_name if student else None,
+        'student_nis': student.nis if student else None,
+        'classroom_id': attendance.classroom_id,
+        'date': attendance.date.isoformat(),
+        'status': attendance.status.value,
+        # Status sebelumnya (untuk koreksi hitungan di dashboard)
+        'previous_status': previous.value if previous is not None else None,
+        'created': created,
+        'notes': attendance.notes,
+        'recorded_by': teacher.full_name if teacher else None,
+        'time': recorded_at.strftime('%H:%M:%S') if recorded_at else None,
+    }
+
+
+def _collect(session, flush_context):
+    """after_flush: catat perubahan Attendance, dipublikasikan setelah commit"""
+    pending = None
+    for obj, created in [(o, True) for o in session.new] + [(o, False) for o in session.dirty]:
+        if not isinstance(obj, Attendance):
+            continue
+        try:
+            data = _attendance_event(session, obj, created)
+        except Exception as e:
+            logger.warning(f"Gagal menyiapkan event live feed: {str(e)}")
+            continue
+        if data is not None:
+            if pending is None:
+                pending = session.info.setdefault(PENDING_KEY, [])
+            pending.append(data)
+
+
+def _publish_pending(session):
+    """after_commit: kirim event yang terkumpul ke Redis per sekolah"""
+    events = session.info.pop(PENDING_KEY, None)
+    if not events or not has_app_context():
+        return
+    config = current_app.config
+    if not config['LIVE_FEED_ENABLED'] or time.monotonic() < _suspended_until['value']:
+        return
+
+    by_school = {}
+    for data in events:
+        by_school.setdefault(data['school_id'], []).append(data)
+    try:
+        pipe = _client(config['LIVE_FEED_REDIS_URL']).pipeline(transaction=False)
+        for school_id, items in by_school.items():
+            if len(items) > config['LIVE_FEED_MAX_BATCH']:
+                # Perubahan massal (mis. job otomatis): minta klien memuat ulang
+                pipe.publish(channel(school_id), json.dumps({'type': 'refresh', 'count': len(items)}))
+                continue
+            for data in items:
+                pipe.publish(channel(school_id), json.dumps(data))
+        pipe.execute()
+    except Exception as e:
+        # Live feed tidak boleh menggagalkan request; coba lagi nanti
+        _suspended_until['value'] = time.monotonic() + config['LIVE_FEED_RETRY_SECONDS']
+        logger.warning(f"Gagal publish live feed absensi: {str(e)}")
+
+
+def _discard_pending(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+def _acquire_slot(size):
+    with _lock:
+        if _slots['semaphore'] is None or _slots['size'] != size:
+            _slots['semaphore'] = threading.BoundedSemaphore(size) if size > 0 else None
+            _slots['size'] = size
+        semaphore = _slots['semaphore']
+    if semaphore is None or not semaphore.acquire(blocking=False):
+        return None
+    return semaphore
+
+
+def available():
+    """True jika proses ini bisa melayani stream; template hanya memasang EventSource jika True"""
+    config = current_app.config
+    return config['LIVE_FEED_ENABLED'] and config['LIVE_FEED_MAX_STREAMS'] > 0
+
+
+def stream_response(school_id):
+    """
+    Response SSE untuk satu sekolah. Mengembalikan 503 jika live feed mati,
+    slot stream penuh, atau Redis tidak bisa dihubungi; klien lalu mencoba
+    lagi setelah Retry-After.
+    """
+    config = current_app.config
+    unavailable = Response('Live feed tidak tersedia', status=503,
+                           headers={'Retry-After': str(config['LIVE_FEED_RETRY_AFTER'])})
+    if not available():
+        return unavailable
+    semaphore = _acquire_slot(config['LIVE_FEED_MAX_STREAMS'])
+    if semaphore is None:
+        return unavailable
+
+    try:
+        pubsub = _client(config['LIVE_FEED_REDIS_URL']).pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel(school_id))
+    except Exception as e:
+        semaphore.release()
+        logger.warning(f"Live feed tidak bisa subscribe ke Redis: {str(e)}")
+        return unavailable
+
+    from utils.metrics import LIVE_FEED_STREAMS
+    LIVE_FEED_STREAMS.inc()
+    state = {'closed': False}
+
+    def cleanup():
+        # Dipanggil dari generator dan call_on_close; cukup sekali
+        if state['closed']:
+            return
+        state['closed'] = True
+        try:
+            pubsub.close()
+        except Exception:
+            pass
+        semaphore.release()
+        LIVE_FEED_STREAMS.dec()
+
+    heartbeat = config['LIVE_FEED_HEARTBEAT_SECONDS']
+    max_seconds = config['LIVE_FEED_MAX_SECONDS']
+    retry_ms = int(config['LIVE_FEED_RETRY_AFTER'] * 1000)
+
+    def generate():
+        # Berjalan setelah app context ditutup: tanpa akses database
+        try:
+            yield f'retry: {retry_ms}\n\n'
+            deadline = time.monotonic() + max_seconds
+            last_sent = time.monotonic()
+            while time.monotonic() < deadline:
+                message = pubsub.get_message(timeout=heartbeat)
+                if message is not None and message['type'] == 'message':
+                    data = message['data']
+                    if isinstance(data, bytes):
+                        data = data.decode('utf-8')
+                    event_type = json.loads(data).get('type', 'attendance')
+                    yield f'event: {event_type}\ndata: {data}\n\n'
+                    last_sent = time.monotonic()
+                elif time.monotonic() - last_sent >= heartbeat:
+                    # Komentar SSE: menjaga koneksi proxy dan mendeteksi klien putus
+                    yield ': ping\n\n'
+                    last_sent = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Live feed sekolah {school_id} terputus: {str(e)}")
+        finally:
+            cleanup()
+
+    response = Response(generate(), mimetype='text/event-stream', headers=SSE_HEADERS)
+    response.call_on_close(cleanup)
+    return response
+
+
+def init_app(app, db):
+    """Pasang hook session yang mengumpulkan dan mempublikasikan perubahan absensi"""
+    app.jinja_env.globals['live_feed_available'] = available
+    session_class = db.session.session_factory.class_
+    if not event.contains(session_class, 'after_flush', _collect):
+        event.listen(session_class, 'after_flush', _collect)
+        event.listen(session_class, 'after_commit', _publish_pending)
+        event.listen(session_class, 'after_rollback', _discard_pending)
@@ -0,0 +1,194 @@
+import os
+import time
+import logging
+from flask import Response, request, g
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+    CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Mode multiprocess (gunicorn / celery prefork) aktif jika env ini di-set
+# SEBELUM proses dimulai. Semua proses menulis ke direktori yang sama dan
+# endpoint /metrics mengagregasi isinya.
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Bucket latency dalam detik, disesuaikan dengan pola request aplikasi
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TASK_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+REQUEST_LATENCY = Histogram(
+    'hubsensi_http_request_duration_seconds',
+    'Latency request HTTP per endpoint',
+    ['method', 'endpoint', 'status'],
+    buckets=LATENCY_BUCKETS
+)
+SCAN_TOTAL = Counter(
+    'hubsensi_scans_total',
+    'Jumlah scan QR per sekolah',
+    ['school_id', 'qr_type', 'result']
+)
+CACHE_REQUESTS = Counter(
+    'hubsensi_cache_requests_total',
+    'Jumlah lookup Flask-Caching berdasarkan hasil (hit/miss)',
+    ['result']
+)
+DB_POOL = Gauge(
+    'hubsensi_db_pool_connections',
+    'Pemakaian connection pool SQLAlchemy',
+    ['bind', 'profile', 'state'],
+    multiprocess_mode='livesum'
+)
+LIVE_FEED_STREAMS = Gauge(
+    'hubsensi_live_feed_streams',
+    'Jumlah koneksi SSE live feed absensi yang terbuka',
+    multiprocess_mode='livesum'
+)
+TASK_DURATION = Histogram(
+    'hubsensi_celery_task_duration_seconds',
+    'Durasi eksekusi task Celery',
+    ['task', 'state'],
+    buckets=TASK_BUCKETS
+)
+TASK_RETRIES = Counter(
+    'hubsensi_celery_task_retries_total',
+    'Jumlah retry task Celery',
+    ['task']
+)
+
+
+class InstrumentedCacheBackend:
+    """Proxy backend Flask-Caching yang menghitung hit dan miss"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+    def get(self, *args, **kwargs):
+        rv = self._backend.get(*args, **kwargs)
+        CACHE_REQUESTS.labels(result='hit' if rv is not None else 'miss').inc()
+        return rv
+
+    def get_many(self, *args, **kwargs):
+        values = self._backend.get_many(*args, **kwargs)
+        hits = sum(1 for v in values if v is not None)
+        if hits:
+            CACHE_REQUESTS.labels(result='hit').inc(hits)
+        if len(values) - hits:
+            CACHE_REQUESTS.labels(result='miss').inc(len(values) - hits)
+        return values
+
+
+def record_scan(school_id, qr_type, success):
+    """Catat satu scan QR untuk throughput per sekolah"""
+    SCAN_TOTAL.labels(
+        school_id=str(school_id),
+        qr_type=qr_type.lower(),
+        result='success' if success else 'failed'
+    ).inc()
+
+
+# Engine yang dipantau: {bind: engine}, diisi register_engines
+_engines = {}
+_pool_profile = {'name': 'unknown'}
+
+
+def register_engines(app, db):
+    """Catat engine aplikasi (primary dan bind lain) untuk gauge pool"""
+    with app.app_context():
+        _engines.clear()
+        _engines.update({key or 'primary': engine for key, engine in db.engines.items()})
+    _pool_profile['name'] = app.config.get('DB_POOL_ACTIVE_PROFILE', 'unknown')
+
+
+def update_pool_stats():
+    """Perbarui gauge pool dari semua engine (NullPool tidak punya statistik)"""
+    from utils.db_pool import pool_stats
+    for bind, engine in _engines.items():
+        for state, value in pool_stats(engine).items():
+            if state == 'class':
+                continue
+            DB_POOL.labels(bind=bind, profile=_pool_profile['name'], state=state).set(value)
+
+
+def init_app(app):
+    """Pasang hook request dan instrumentasi cache ke aplikasi Flask"""
+
+    # Bungkus backend cache yang sudah diinisialisasi
+    cache_backends = app.extensions.get('cache', {})
+    for ext, backend in list(cache_backends.items()):
+        if not isinstance(backend, InstrumentedCacheBackend):
+            cache_backends[ext] = InstrumentedCacheBackend(backend)
+
+    @app.before_request
+    def start_request_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None and request.endpoint != 'metrics_endpoint':
+            REQUEST_LATENCY.labels(
+                method=request.method,
+                endpoint=request.endpoint or 'unknown',
+                status=str(response.status_code)
+            ).observe(time.perf_counter() - start)
+            try:
+                update_pool_stats()
+            except Exception:
+                pass
+        return response
+
+
+def init_celery():
+    """Hubungkan signal Celery untuk durasi dan retry task"""
+    from celery import signals
+
+    started = {}
+
+    @signals.task_prerun.connect(weak=False, dispatch_uid='hubsensi_metrics_prerun')
+    def on_task_prerun(task_id=None, task=None, **kwargs):
+        started[task_id] = time.perf_counter()
+
+    @signals.task_postrun.connect(weak=False, dispatch_uid='hubsensi_metrics_postrun')
+    def on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+        start = started.pop(task_id, None)
+        if start is not None and task is not None:
+            TASK_DURATION.labels(task=task.name, state=state or 'UNKNOWN').observe(
+                time.perf_counter() - start
+            )
+        try:
+            update_pool_stats()
+        except Exception:
+            pass
+
+    @signals.task_retry.connect(weak=False, dispatch_uid='hubsensi_metrics_retry')
+    def on_task_retry(sender=None, **kwargs):
+        if sender is not None:
+            TASK_RETRIES.labels(task=sender.name).inc()
+
+    # Worker di dyno terpisah (tanpa direktori bersama) bisa mengekspos metrics sendiri
+    port = os.environ.get('CELERY_METRICS_PORT')
+    if port:
+        @signals.worker_ready.connect(weak=False, dispatch_uid='hubsensi_metrics_server')
+        def start_metrics_server(**kwargs):
+            from prometheus_client import start_http_server
+            start_http_server(int(port), registry=_registry())
+            logger.info(f"Metrics worker tersedia di port {port}")
+
+
+def _registry():
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_response():
+    """Render semua metrics dalam format teks Prometheus"""
+    return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
@@ -0,0 +1,294 @@
+"""
+Onboarding banyak sekolah sekaligus dari spreadsheet (mis. satu dinas
+pendidikan). Satu baris = satu sekolah beserta admin pertamanya.
+
+Semua bentrokan (kode/nama sekolah, username/email admin) dicek sekaligus:
+duplikat di dalam file dan satu query IN per kolom ke database, bukan
+query per baris. Hash password dihitung paralel (hashlib melepas GIL),
+lalu sekolah, langganan, admin dan QR sekolah dibuat per batch dalam satu
+transaksi per batch. Email login masuk outbox bersama akunnya dan dikirim
+per batch oleh relay.
+
+Dari halaman superadmin file hanya dibaca di request; pembuatan sekolah
+berjalan di worker (tasks.import_schools_task) dengan status di tabel
+school_imports yang dipantau halaman.
+"""
+import os
+import secrets
+import logging
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import func
+from werkzeug.security import generate_password_hash
+from extensions import db
+from models import (School, SchoolImport, SchoolQRCode, SchoolSubscription, SubscriptionPlan, User, UserRole,
+                    jakarta_now, jakarta_now_naive)
+from utils import outbox
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ['school_name', 'school_code', 'admin_username', 'admin_email']
+OPTIONAL_COLUMNS = [
+    'address', 'phone', 'email', 'website', 'admin_password',
+    'plan', 'start_date', 'end_date', 'max_teachers', 'max_students',
+]
+# Kolom yang harus unik: (kolom file, kolom database, label pesan)
+UNIQUE_COLUMNS = [
+    ('school_code', School.code, 'Kode sekolah'),
+    ('school_name', School.name, 'Nama sekolah'),
+    ('admin_username', User.username, 'Username admin'),
+    # Email di file sudah huruf kecil; email lama bisa saja huruf besar
+    ('admin_email', func.lower(User.email), 'Email admin'),
+]
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def read_sheet(file, filename=None):
+    """Baca CSV/Excel menjadi list dict per baris (nilai kosong -> None)"""
+    import pandas as pd
+    filename = filename or getattr(file, 'filename', None) or str(file)
+    if filename.lower().endswith('.csv'):
+        df = pd.read_csv(file, dtype=str)
+    else:
+        df = pd.read_excel(file, dtype=str)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"File harus memiliki kolom: {', '.join(REQUIRED_COLUMNS)} (kurang: {', '.join(missing)})")
+    df = df.astype(object).where(df.notna(), None)
+    return [
+        {column: (str(row[column]).strip() or None) if row.get(column) is not None else None
+         for column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if column in df.columns}
+        for row in df.to_dict('records')
+    ]
+
+
+def _parse(row, today):
+    """Normalisasi satu baris; kembalikan (data, pesan error)"""
+    from dateutil.parser import parse as parse_date
+    data = {column: row.get(column) for column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+    missing = [column for column in REQUIRED_COLUMNS if not data[column]]
+    if missing:
+        return data, f"Kolom wajib kosong: {', '.join(missing)}"
+    data['admin_email'] = data['admin_email'].lower()
+    if len(data['school_code']) > 20 or len(data['school_name']) > 100:
+        return data, 'Kode sekolah maksimal 20 karakter dan nama maksimal 100 karakter'
+    try:
+        data['plan'] = SubscriptionPlan((data['plan'] or 'basic').lower())
+    except ValueError:
+        return data, f"Paket '{data['plan']}' tidak dikenal"
+    try:
+        data['start_date'] = parse_date(data['start_date']).date() if data['start_date'] else today
+        data['end_date'] = (parse_date(data['end_date']).date() if data['end_date']
+                            else data['start_date'] + timedelta(days=365))
+        for column in ('max_teachers', 'max_students'):
+            data[column] = int(float(data[column])) if data[column] else None
+    except (ValueError, OverflowError) as e:
+        return data, f'Format tanggal/angka tidak valid: {e}'
+    if data['end_date'] < data['start_date']:
+        return data, 'Tanggal akhir langganan sebelum tanggal mulai'
+    return data, None
+
+
+def _existing(column, values):
+    """Nilai yang sudah ada di database, satu query per 1000 nilai"""
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), 1000):
+        found.update(v for (v,) in db.session.query(column).filter(column.in_(values[start:start + 1000])))
+    return found
+
+
+def validate(rows):
+    """
+    Cek semua baris. Mengembalikan (baris valid, error) dengan error berupa
+    list {'row': nomor baris di file, 'message': ...}.
+    """
+    today = jakarta_now().date()
+    parsed, errors = [], []
+    for number, row in enumerate(rows, start=2):  # baris 1 = header
+        data, error = _parse(row, today)
+        if error:
+            errors.append({'row': number, 'message': error})
+        else:
+            parsed.append((number, data))
+
+    # Duplikat di dalam file dan bentrok dengan database
+    invalid = set()
+    for key, column, label in UNIQUE_COLUMNS:
+        seen = {}
+        for number, data in parsed:
+            value = data[key]
+            if value in seen:
+                errors.append({'row': number, 'message': f'{label} {value} sama dengan baris {seen[value]}'})
+                invalid.add(number)
+            else:
+                seen[value] = number
+        for value in _existing(column, seen):
+            errors.append({'row': seen[value], 'message': f'{label} {value} sudah terdaftar'})
+            invalid.add(seen[value])
+
+    errors.sort(key=lambda e: e['row'])
+    return [data for number, data in parsed if number not in invalid], errors
+
+
+def _hash_passwords(passwords):
+    workers = current_app.config['ONBOARDING_HASH_WORKERS'] or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='onboarding-hash') as executor:
+        return list(executor.map(generate_password_hash, passwords))
+
+
+def _upload_school_qr(school_id):
+    from utils.qr_helper import generate_qr_png
+    from utils.s3_helper import upload_file_to_s3
+    return upload_file_to_s3(generate_qr_png(f"SCHOOL:{school_id}"), folder="qr_codes",
+                             filename=f"school_{school_id}.png")
+
+
+def _create_batch(batch, send_email):
+    passwords = [data['admin_password'] or secrets.token_urlsafe(8) for data in batch]
+    hashes = _hash_passwords(passwords)
+
+    schools = [School(
+        name=data['school_name'],
+        code=data['school_code'],
+        address=data['address'],
+        phone=data['phone'],
+        email=data['email'],
+        website=data['website'],
+        is_active=True
+    ) for data in batch]
+    db.session.add_all(schools)
+    db.session.flush()
+
+    for school, data, password, password_hash in zip(schools, batch, passwords, hashes):
+        subscription = SchoolSubscription(
+            school_id=school.id,
+            plan=data['plan'],
+            is_active=True,
+            start_date=data['start_date'],
+            end_date=data['end_date']
+        )
+        if data['max_teachers'] is not None:
+            subscription.max_teachers = data['max_teachers']
+        if data['max_students'] is not None:
+            subscription.max_students = data['max_students']
+        db.session.add(subscription)
+        db.session.add(User(
+            school_id=school.id,
+            username=data['admin_username'],
+            email=data['admin_email'],
+            password_hash=password_hash,
+            role=UserRole.ADMIN,
+            is_active=True
+        ))
+        if send_email:
+            outbox.add_login_email(
+                to_email=data['admin_email'],
+                name=data['admin_username'],
+                username=data['admin_username'],
+                password=password,
+                school_id=school.id
+            )
+
+    # Upload QR sekolah paralel (I/O ke S3)
+    workers = current_app.config['ONBOARDING_UPLOAD_WORKERS']
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='onboarding-qr') as executor:
+        urls = list(executor.map(_upload_school_qr, [school.id for school in schools]))
+    db.session.add_all(SchoolQRCode(school_id=school.id, qr_code=url) for school, url in zip(schools, urls))
+    db.session.commit()
+    return [{'id': school.id, 'code': school.code, 'name': school.name} for school in schools]
+
+
+def onboard(rows, dry_run=False, skip_invalid=False, send_email=True, batch_size=None):
+    """
+    Buat sekolah dari baris spreadsheet. Tanpa skip_invalid, satu baris
+    bermasalah membatalkan seluruh file (tidak ada yang dibuat). Mengembalikan
+    {'created': [...], 'errors': [...], 'valid': jumlah baris valid}.
+    """
+    valid, errors = validate(rows)
+    result = {'created': [], 'errors': errors, 'valid': len(valid), 'total': len(rows)}
+    if dry_run or (errors and not skip_invalid) or not valid:
+        return result
+
+    batch_size = batch_size or current_app.config['ONBOARDING_BATCH_SIZE']
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        try:
+            result['created'].extend(_create_batch(batch, send_email))
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Onboarding batch {start // batch_size + 1} gagal: {e}")
+            result['errors'].append({
+                'row': None,
+                'message': f"Batch {', '.join(d['school_code'] for d in batch)} gagal dibuat: {e}"
+            })
+            break
+        logger.info(f"Onboarding: {len(result['created'])}/{len(valid)} sekolah dibuat")
+
+    if result['created']:
+        from utils import tenant_overview
+        tenant_overview.invalidate()
+        if send_email:
+            outbox.relay_safely()
+    return result
+
+
+def request_import(rows, filename=None, dry_run=False, skip_invalid=False, requested_by=None):
+    """Catat import baru berstatus QUEUED; task dikirim oleh pemanggil"""
+    school_import = SchoolImport(rows=rows, filename=filename, dry_run=dry_run, skip_invalid=skip_invalid,
+                                 requested_by=requested_by, status=QUEUED)
+    db.session.add(school_import)
+    db.session.commit()
+    return school_import
+
+
+def _set_status(school_import, status, **fields):
+    school_import.status = status
+    for name, value in fields.items():
+        setattr(school_import, name, value)
+    if status in (DONE, FAILED):
+        school_import.finished_at = jakarta_now_naive()
+        school_import.rows = None
+    db.session.commit()
+
+
+def run_import(import_id):
+    """Jalankan import dari task Celery dengan pencatatan status"""
+    school_import = db.session.get(SchoolImport, import_id)
+    if school_import is None or school_import.status != QUEUED:
+        # Task terkirim ulang setelah import selesai/berjalan
+        return school_import.status if school_import else None
+    _set_status(school_import, RUNNING)
+    try:
+        result = onboard(school_import.rows or [], dry_run=school_import.dry_run,
+                         skip_invalid=school_import.skip_invalid)
+    except Exception as e:
+        db.session.rollback()
+        logger.exception(f"Import sekolah {import_id} gagal")
+        _set_status(school_import, FAILED, error=str(e)[:1000])
+        raise
+    _set_status(school_import, DONE, result=result)
+    return {'created': len(result['created']), 'errors': len(result['errors'])}
+
+
+def get_status(import_id):
+    """Status satu import untuk dipantau halaman, atau None"""
+    school_import = db.session.get(SchoolImport, import_id)
+    if school_import is None:
+        return None
+    return {
+        'id': school_import.id,
+        'status': school_import.status,
+        'filename': school_import.filename,
+        'dry_run': school_import.dry_run,
+        'skip_invalid': school_import.skip_invalid,
+        'result': school_import.result,
+        'error': school_import.error,
+    }
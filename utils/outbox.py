@@ -0,0 +1,210 @@
+"""
+Transactional outbox untuk email akun (login baru dan reset password).
+
+Route menulis baris EmailOutbox di transaksi yang sama dengan perubahan akun,
+sehingga email tidak hilang saat broker bermasalah dan tidak pernah terkirim
+untuk perubahan yang di-rollback. Relay memindahkan baris pending ke Celery
+per batch. Task mengklaim baris (pending/queued -> sending) sebelum mengirim,
+jadi pesan broker ganda atau relay ganda tidak menghasilkan email ganda.
+
+Pengiriman bersifat at-least-once. Worker bisa mati setelah Postmark
+menerima pesan tetapi sebelum status SENT di-commit; baris sending yang
+macet lalu diantrikan ulang oleh relay dengan tanda outcome_unknown. Hanya
+baris bertanda itu yang dicari dulu di Postmark lewat metadata
+idempotency_key sebelum dikirim ulang; pesan yang ditemukan langsung
+ditandai SENT. Baris yang gagal pasti (429, 5xx, jaringan) tidak dicek. Jika pencarian gagal atau indeks
+Postmark belum memuat pesan itu, email tetap dikirim ulang (bisa ganda).
+"""
+import uuid
+import logging
+from datetime import timedelta
+from flask import current_app
+from extensions import db
+from models import EmailOutbox, jakarta_now_naive
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'    # tersimpan, belum ada task di broker
+QUEUED = 'queued'      # task sudah di broker (atau menunggu retry)
+SENDING = 'sending'    # sedang dikirim oleh satu worker
+SENT = 'sent'
+FAILED = 'failed'
+
+
+
+def add_login_email(to_email, name, username, password, school_id=None, interactive=False,
+                    idempotency_key=None):
+    """
+    Tambahkan email login ke outbox di session aktif. Tidak melakukan commit:
+    baris ikut tersimpan (atau batal) bersama transaksi pemanggil.
+    """
+    entry = EmailOutbox(
+        school_id=school_id,
+        idempotency_key=idempotency_key or uuid.uuid4().hex,
+        to_email=to_email,
+        payload={'name': name, 'username': username, 'password': password},
+        interactive=interactive,
+        status=PENDING
+    )
+    db.session.add(entry)
+    return entry
+
+
+def relay(school_id=None, limit=None):
+    """
+    Kirim baris pending ke Celery: email interaktif satu task per email dengan
+    prioritas tertinggi, sisanya per BATCH_SIZE. Baris queued/sending yang
+    macet lebih dari OUTBOX_STALE_SECONDS ikut dikirim ulang (dicek dulu ke
+    Postmark oleh deliver, lihat docstring modul). Mengembalikan jumlah
+    baris yang masuk antrian.
+    """
+    from tasks import send_email_task, send_email_batch_task, PRIORITY_INTERACTIVE
+    from utils.sendgrid_helper import BATCH_SIZE
+
+    limit = limit or current_app.config['OUTBOX_RELAY_LIMIT']
+    stale_before = jakarta_now_naive() - timedelta(seconds=current_app.config['OUTBOX_STALE_SECONDS'])
+    query = EmailOutbox.query.filter(db.or_(
+        EmailOutbox.status == PENDING,
+        db.and_(EmailOutbox.status.in_([QUEUED, SENDING]), EmailOutbox.dispatched_at < stale_before)
+    ))
+    if school_id is not None:
+        query = query.filter(EmailOutbox.school_id == school_id)
+    # SKIP LOCKED: relay dari web dan beat tidak mengambil baris yang sama
+    rows = query.order_by(EmailOutbox.interactive.desc(), EmailOutbox.id) \
+        .limit(limit).with_for_update(skip_locked=True).all()
+
+    interactive = [[row] for row in rows if row.interactive]
+    bulk = [row for row in rows if not row.interactive]
+    chunks = interactive + [bulk[start:start + BATCH_SIZE] for start in range(0, len(bulk), BATCH_SIZE)]
+
+    # Status di-commit sebelum publish supaya worker tidak pernah melihat
+    # baris yang masih pending; chunk yang gagal dipublish dikembalikan.
+    for row in rows:
+        if row.status == SENDING:
+            row.outcome_unknown = True
+        row.status = QUEUED
+        row.claimed_by = None
+        row.dispatched_at = jakarta_now_naive()
+    db.session.commit()
+
+    dispatched = 0
+    for index, chunk in enumerate(chunks):
+        try:
+            if chunk[0].interactive:
+                send_email_task.apply_async(kwargs={'outbox_id': chunk[0].id}, priority=PRIORITY_INTERACTIVE)
+            else:
+                send_email_batch_task.delay(outbox_ids=[row.id for row in chunk])
+        except Exception as e:
+            # Sisa baris kembali pending dan diambil relay berikutnya
+            logger.error(f"Relay outbox berhenti setelah {dispatched} email: {str(e)}")
+            for rest in chunks[index:]:
+                for row in rest:
+                    row.status = PENDING
+            db.session.commit()
+            break
+        dispatched += len(chunk)
+    return dispatched
+
+
+def relay_safely(school_id=None):
+    """Relay dari request web: kegagalan hanya dicatat, beat akan mengulang"""
+    try:
+        return relay(school_id=school_id)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Relay outbox gagal: {str(e)}")
+        return 0
+
+
+def claim(outbox_ids, token):
+    """Klaim baris untuk dikirim. Baris yang sudah diklaim atau selesai dilewati."""
+    db.session.execute(
+        db.update(EmailOutbox)
+        .where(EmailOutbox.id.in_(outbox_ids), EmailOutbox.status.in_([PENDING, QUEUED]))
+        .values(status=SENDING, claimed_by=token, attempts=EmailOutbox.attempts + 1,
+                dispatched_at=jakarta_now_naive())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return EmailOutbox.query.filter_by(claimed_by=token, status=SENDING).order_by(EmailOutbox.id).all()
+
+
+def _mark_sent(row, message_id):
+    row.status = SENT
+    row.sent_at = jakarta_now_naive()
+    row.message_id = message_id
+    row.last_error = None
+    row.outcome_unknown = False
+    row.payload = None  # password tidak disimpan lebih lama dari perlu
+
+
+def _already_sent(row):
+    """MessageID jika percobaan sebelumnya ternyata sudah diterima Postmark"""
+    from utils.sendgrid_helper import find_sent_message
+    try:
+        return find_sent_message(row.to_email, row.idempotency_key)
+    except Exception as e:
+        logger.warning(f"Cek Postmark untuk outbox {row.id} gagal, email dikirim ulang: {str(e)}")
+        return None
+
+
+def deliver(outbox_ids, token, final_attempt=False):
+    """
+    Kirim email untuk baris yang berhasil diklaim dan simpan hasilnya.
+    Gagal permanen langsung FAILED tanpa retry; gagal sementara kembali ke
+    QUEUED (atau FAILED pada percobaan terakhir). Mengembalikan
+    (id yang perlu di-retry, ringkasan).
+    """
+    from utils.sendgrid_helper import send_login_email_batch
+
+    rows = claim(outbox_ids, token)
+    summary = {'sent': 0, 'failed': 0, 'retry': 0, 'skipped': len(set(outbox_ids)) - len(rows)}
+
+    # Hanya baris yang klaim sebelumnya berakhir tanpa hasil (worker mati saat sending)
+    unsent = []
+    for row in rows:
+        message_id = _already_sent(row) if row.outcome_unknown else None
+        if message_id:
+            _mark_sent(row, message_id)
+            summary['sent'] += 1
+        else:
+            unsent.append(row)
+    rows = unsent
+    if not rows:
+        db.session.commit()
+        return [], summary
+
+    jobs = [
+        {'to_email': row.to_email, **(row.payload or {}),
+         'metadata': {'idempotency_key': row.idempotency_key}}
+        for row in rows
+    ]
+    try:
+        results = send_login_email_batch(jobs, login_link=current_app.config['LOGIN_URL'])
+    except Exception as e:
+        # Client Postmark belum tersedia (konfigurasi/jaringan), coba lagi nanti
+        results = [{'success': False, 'retryable': True, 'error_code': None,
+                    'message': str(e), 'message_id': None} for _ in rows]
+
+    retry_ids = []
+    for row, result in zip(rows, results):
+        if result['success']:
+            _mark_sent(row, result['message_id'])
+            summary['sent'] += 1
+        elif result['retryable'] and not final_attempt:
+            # Gagal pasti: percobaan berikutnya tidak perlu cek Postmark
+            row.status = QUEUED
+            row.outcome_unknown = False
+            row.last_error = result['message']
+            retry_ids.append(row.id)
+            summary['retry'] += 1
+        else:
+            row.status = FAILED
+            row.outcome_unknown = False
+            row.last_error = f"[{result['error_code']}] {result['message']}"
+            row.payload = None
+            summary['failed'] += 1
+            logger.error(f"Email ke {row.to_email} gagal permanen: {row.last_error}")
+    db.session.commit()
+    return retry_ids, summary
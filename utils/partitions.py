@@ -0,0 +1,180 @@
+"""
+Partisi bulanan tabel `attendances` (PostgreSQL).
+
+Migration 5c0e7a4d2b91 mengubah `attendances` menjadi tabel partisi RANGE
+(date) dengan satu partisi per bulan (`attendances_y2026m01`, ...) ditambah
+partisi DEFAULT. Modul ini membuat partisi bulan-bulan mendatang dan
+mengarsipkan partisi lama: COPY ke CSV gzip, upload ke bucket S3 privat
+(atau direktori lokal), lalu DETACH dan DROP dalam satu transaksi. Di
+SQLite tabel tetap biasa dan semua fungsi di sini tidak melakukan apa-apa.
+"""
+import os
+import gzip
+import shutil
+import logging
+import tempfile
+from datetime import date
+from sqlalchemy import text
+from extensions import db
+from models import jakarta_now
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+PARENT = 'attendances'
+
+LIST_SQL = text("""
+    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound,
+           pg_total_relation_size(c.oid) AS size_bytes
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    WHERE p.relname = :parent
+    ORDER BY c.relname
+""")
+
+
+def add_months(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month_start):
+    return f'{PARENT}_y{month_start.year}m{month_start.month:02d}'
+
+
+def is_partitioned(connection):
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :parent)"
+    ), {'parent': PARENT}).scalar()
+
+
+def list_partitions(connection):
+    """Daftar partisi: [{'name', 'bound', 'size_bytes', 'month'}], month None untuk DEFAULT"""
+    partitions = []
+    for row in connection.execute(LIST_SQL, {'parent': PARENT}):
+        month = None
+        if row.relname.startswith(f'{PARENT}_y'):
+            year, mon = row.relname[len(PARENT) + 2:].split('m')
+            month = date(int(year), int(mon), 1)
+        partitions.append({'name': row.relname, 'bound': row.bound,
+                           'size_bytes': row.size_bytes, 'month': month})
+    return partitions
+
+
+def _create_partition(connection, name, start, default_name):
+    """
+    Buat partisi bulan `start`. Baris yang sudah masuk partisi DEFAULT untuk
+    bulan itu dipindahkan di transaksi yang sama: tabel dibuat terpisah,
+    baris dipindah dari DEFAULT, lalu di-ATTACH (CREATE ... PARTITION OF
+    langsung akan gagal selama DEFAULT berisi baris bulan tersebut).
+    """
+    end = add_months(start, 1)
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    params = {'start': start, 'end': end}
+    has_rows = default_name and connection.execute(text(
+        f'SELECT EXISTS (SELECT 1 FROM {default_name} WHERE date >= :start AND date < :end)'
+    ), params).scalar()
+    if not has_rows:
+        connection.execute(text(f'CREATE TABLE {name} PARTITION OF {PARENT} FOR VALUES {bounds}'))
+        return 0
+
+    connection.execute(text(f'LOCK TABLE {default_name} IN SHARE ROW EXCLUSIVE MODE'))
+    connection.execute(text(f'CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    moved = connection.execute(text(
+        f'WITH moved AS (DELETE FROM {default_name} WHERE date >= :start AND date < :end RETURNING *) '
+        f'INSERT INTO {name} SELECT * FROM moved'
+    ), params).rowcount
+    connection.execute(text(f'ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES {bounds}'))
+    return moved
+
+
+def ensure_partitions(months_ahead=3, today=None):
+    """
+    Buat partisi bulan berjalan sampai `months_ahead` bulan ke depan jika
+    belum ada, satu transaksi per bulan. Mengembalikan nama partisi yang dibuat.
+    """
+    today = today or jakarta_now().date()
+    created = []
+    with db.engine.connect() as connection:
+        if not is_partitioned(connection):
+            return created
+        partitions = list_partitions(connection)
+    existing = {p['name'] for p in partitions}
+    default_name = next((p['name'] for p in partitions if p['bound'] == 'DEFAULT'), None)
+
+    current = today.replace(day=1)
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+        with db.engine.begin() as connection:
+            moved = _create_partition(connection, name, start, default_name)
+        created.append(name)
+        if moved:
+            logger.warning(f"Partisi {name} dibuat, {moved} baris dipindah dari {default_name}")
+        else:
+            logger.info(f"Partisi {name} dibuat")
+    return created
+
+
+def archivable_partitions(older_than_months, today=None):
+    """Partisi bulanan yang seluruh isinya lebih tua dari `older_than_months` bulan"""
+    today = today or jakarta_now().date()
+    cutoff = add_months(today.replace(day=1), -older_than_months)
+    with db.engine.connect() as connection:
+        if not is_partitioned(connection):
+            return []
+        return [p for p in list_partitions(connection) if p['month'] and p['month'] < cutoff]
+
+
+def _upload(path, key, output_dir=None):
+    """Simpan arsip ke direktori lokal atau bucket S3 privat, kembalikan lokasinya"""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        destination = os.path.join(output_dir, os.path.basename(key))
+        shutil.copyfile(path, destination)
+        return destination
+    from utils.s3_helper import upload_private_file_to_s3
+    with open(path, 'rb') as f:
+        return upload_private_file_to_s3(f, key, content_type='application/gzip')
+
+
+def archive_partition(name, prefix='archives/attendances', output_dir=None, keep_table=False):
+    """
+    Salin isi partisi ke CSV gzip (dengan header), upload, lalu DETACH dan
+    DROP. Semua dalam satu transaksi dengan partisi dikunci dari penulisan:
+    jika COPY atau upload gagal, partisi tetap ter-attach utuh dan bisa
+    diarsip ulang. Partisi yang sudah ter-detach (sisa run lama) tetap
+    bisa diarsipkan.
+    """
+    with tempfile.NamedTemporaryFile(suffix='.csv.gz', delete=False) as tmp:
+        path = tmp.name
+    try:
+        with db.engine.begin() as connection:
+            attached = name in {p['name'] for p in list_partitions(connection)}
+            # Tidak ada perubahan di partisi antara COPY dan DETACH
+            connection.execute(text(f'LOCK TABLE {name} IN SHARE MODE'))
+            cursor = connection.connection.cursor()
+            try:
+                with gzip.open(path, 'wb') as gz:
+                    cursor.copy_expert(f'COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true)', gz)
+                rows = cursor.rowcount
+            finally:
+                cursor.close()
+            location = _upload(path, f'{prefix}/{name}.csv.gz', output_dir=output_dir)
+            logger.info(f"Partisi {name} ({rows} baris) diarsipkan ke {location}")
+
+            if attached:
+                connection.execute(text(f'ALTER TABLE {PARENT} DETACH PARTITION {name}'))
+                logger.info(f"Partisi {name} di-detach")
+            if not keep_table:
+                connection.execute(text(f'DROP TABLE {name}'))
+                logger.info(f"Tabel {name} dihapus")
+    finally:
+        os.remove(path)
+    return {'name': name, 'rows': rows, 'location': location}
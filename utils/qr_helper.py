@@ -0,0 +1,19 @@
+import io
+
+def generate_qr_png(data: str) -> io.BytesIO:
+    """
+    Buat gambar QR code (PNG) di memori. qrcode/PIL baru di-import di sini
+    agar tidak ikut dimuat saat aplikasi atau worker start.
+    """
+    import qrcode
+    qr = qrcode.QRCode(
+        version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    img_bytes = io.BytesIO()
+    img.save(img_bytes, format='PNG')
+    img_bytes.seek(0)
+    return img_bytes
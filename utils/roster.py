@@ -0,0 +1,216 @@
+"""
+Roster siswa dalam JSON dengan versi, ETag dan mode delta.
+
+Setiap flush yang menambah/mengubah/menghapus siswa, mengubah status aktif
+akun siswa, atau mengubah daftar kelas menaikkan schools.roster_version dan
+mencatat RosterChange dengan versi tersebut (hook session, transaksi yang
+sama).
+
+- Snapshot: semua siswa (atau satu kelas) dengan ETag kuat per versi
+  (utils/versioning.py); If-None-Match yang cocok dijawab 304.
+- Delta (?since=<versi>): daftar siswa added/changed/removed sejak versi itu.
+  Jika log untuk rentang tersebut sudah dihapus, snapshot penuh dikirim
+  dengan full=true.
+
+Baris siswa: [id, nis, nama, classroom_id, aktif].
+"""
+import logging
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import event, func, insert, inspect, select
+from extensions import db
+from models import Classroom, RosterChange, Student, User, UserRole, jakarta_now_naive
+from utils import versioning
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+ADDED = 'added'
+CHANGED = 'changed'
+REMOVED = 'removed'
+CLASSROOMS = 'classrooms'
+
+FIELDS = ['id', 'nis', 'name', 'classroom_id', 'active']
+STUDENT_FIELDS = ('nis', 'full_name', 'classroom_id')
+
+
+
+def _changed(obj, attrs):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _track(session, flush_context):
+    """after_flush: naikkan versi roster sekolah dan catat perubahannya"""
+    changes = {}
+
+    def add(school_id, student_id, action):
+        if school_id is not None:
+            changes.setdefault(school_id, []).append((student_id, action))
+
+    connection = None
+    for obj in session.new:
+        if isinstance(obj, Student):
+            add(obj.school_id, obj.id, ADDED)
+        elif isinstance(obj, Classroom):
+            add(obj.school_id, None, CLASSROOMS)
+    for obj in session.dirty:
+        if isinstance(obj, Student) and _changed(obj, STUDENT_FIELDS):
+            add(obj.school_id, obj.id, CHANGED)
+        elif isinstance(obj, Classroom) and _changed(obj, ('name',)):
+            add(obj.school_id, None, CLASSROOMS)
+        elif isinstance(obj, User) and obj.role == UserRole.STUDENT and _changed(obj, ('is_active',)):
+            connection = connection or session.connection()
+            for student_id in connection.execute(
+                select(Student.__table__.c.id).where(Student.__table__.c.user_id == obj.id)
+            ).scalars():
+                add(obj.school_id, student_id, CHANGED)
+    for obj in session.deleted:
+        if isinstance(obj, Student):
+            add(obj.school_id, obj.id, REMOVED)
+        elif isinstance(obj, Classroom):
+            add(obj.school_id, None, CLASSROOMS)
+
+    if not changes:
+        return
+    connection = connection or session.connection()
+    now = jakarta_now_naive()
+    for school_id, items in changes.items():
+        version = versioning.bump(connection, 'roster_version', school_id)
+        if version is None:
+            continue
+        connection.execute(insert(RosterChange.__table__), [
+            {'school_id': school_id, 'version': version, 'student_id': student_id,
+             'action': action, 'created_at': now, 'updated_at': now}
+            for student_id, action in dict.fromkeys(items)
+        ])
+
+
+def current_version(school_id):
+    return versioning.current('roster_version', school_id)
+
+
+def _rows(school_id, classroom_id=None, student_ids=None):
+    query = db.session.query(
+        Student.id, Student.nis, Student.full_name, Student.classroom_id, User.is_active
+    ).join(User, User.id == Student.user_id).filter(Student.school_id == school_id)
+    if classroom_id:
+        query = query.filter(Student.classroom_id == classroom_id)
+    if student_ids is not None:
+        query = query.filter(Student.id.in_(student_ids))
+    return [[sid, nis, name, cid, bool(active)] for sid, nis, name, cid, active in query.order_by(Student.id)]
+
+
+def _classrooms(school_id):
+    return {
+        str(cid): name for cid, name in db.session.query(Classroom.id, Classroom.name).filter(
+            Classroom.school_id == school_id
+        ).order_by(Classroom.id)
+    }
+
+
+def snapshot(school_id, classroom_id=None, version=None):
+    """Roster penuh sekolah/kelas pada versi saat ini"""
+    return {
+        'school_id': school_id,
+        'classroom_id': classroom_id,
+        'version': current_version(school_id) if version is None else version,
+        'full': True,
+        'fields': FIELDS,
+        'students': _rows(school_id, classroom_id),
+        'classrooms': _classrooms(school_id),
+    }
+
+
+def delta(school_id, since, classroom_id=None, version=None):
+    """
+    Perubahan roster sejak versi `since`, atau snapshot penuh jika log
+    rentang itu sudah tidak lengkap
+    """
+    version = current_version(school_id) if version is None else version
+    if since >= version:
+        return {
+            'school_id': school_id, 'classroom_id': classroom_id, 'version': version, 'since': since,
+            'full': False, 'fields': FIELDS, 'added': [], 'changed': [], 'removed': [], 'classrooms': None,
+        }
+
+    oldest = db.session.query(func.min(RosterChange.version)).filter(
+        RosterChange.school_id == school_id
+    ).scalar()
+    if since < 0 or oldest is None or oldest > since + 1:
+        return snapshot(school_id, classroom_id, version)
+
+    first, last = {}, {}
+    classrooms_changed = False
+    for student_id, action in db.session.query(RosterChange.student_id, RosterChange.action).filter(
+        RosterChange.school_id == school_id,
+        RosterChange.version > since,
+        RosterChange.version <= version
+    ).order_by(RosterChange.version, RosterChange.id):
+        if action == CLASSROOMS:
+            classrooms_changed = True
+            continue
+        first.setdefault(student_id, action)
+        last[student_id] = action
+
+    added, changed, removed = set(), set(), set()
+    for student_id, action in last.items():
+        if action == REMOVED:
+            if first[student_id] != ADDED:
+                removed.add(student_id)
+        elif first[student_id] == ADDED:
+            added.add(student_id)
+        else:
+            changed.add(student_id)
+
+    rows = {row[0]: row for row in _rows(school_id, student_ids=added | changed)} if added | changed else {}
+    result = {'added': [], 'changed': [], 'removed': sorted(removed)}
+    for student_id in sorted(added | changed):
+        row = rows.get(student_id)
+        in_scope = row is not None and (not classroom_id or row[3] == classroom_id)
+        if in_scope:
+            result[ADDED if student_id in added else CHANGED].append(row)
+        elif student_id in changed or row is None:
+            # Pindah keluar kelas atau sudah terhapus
+            result['removed'].append(student_id)
+    result['removed'].sort()
+
+    result.update({
+        'school_id': school_id,
+        'classroom_id': classroom_id,
+        'version': version,
+        'since': since,
+        'full': False,
+        'fields': FIELDS,
+        'classrooms': _classrooms(school_id) if classrooms_changed else None,
+    })
+    return result
+
+
+def roster_response(school_id, classroom_id=None, since=None):
+    """Response JSON roster dengan ETag kuat per versi (utils/versioning.py)"""
+    version = current_version(school_id)
+    scope = classroom_id or 'all'
+    etag = f'roster-{school_id}-{scope}-v{version}' + (f'-since{since}' if since is not None else '')
+
+    def build():
+        if since is None:
+            return snapshot(school_id, classroom_id, version)
+        return delta(school_id, since, classroom_id, version)
+
+    return versioning.json_response(etag, build, current_app.config['ROSTER_CACHE_SECONDS'])
+
+
+def prune_changes(retention_days):
+    """Hapus log perubahan lama; klien dengan versi lebih lama mendapat snapshot penuh"""
+    cutoff = jakarta_now_naive() - timedelta(days=retention_days)
+    deleted = RosterChange.query.filter(RosterChange.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def init_app(app, db):
+    """Pasang hook session yang mencatat perubahan roster"""
+    session_class = db.session.session_factory.class_
+    if not event.contains(session_class, 'after_flush', _track):
+        event.listen(session_class, 'after_flush', _track)
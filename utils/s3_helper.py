@@ -1,4 +1,4 @@
-def upload_file_to_s3(file_obj, folder='', filename='file.png'):
+def upload_file_to_s3(file_obj, folder='', filename='file.png', content_type='image/png'):
     import boto3, os
     s3_client = boto3.client(
         "s3",
@@ -14,13 +14,39 @@ def upload_file_to_s3(file_obj, folder='', filename='file.png'):
         file_obj,
         os.getenv("S3_BUCKET_NAME"),
         key,
-        ExtraArgs={"ContentType": "image/png"}
+        ExtraArgs={"ContentType": content_type}
     )
     
     bucket_name = os.getenv("S3_BUCKET_NAME")
     region = os.getenv("AWS_REGION")
     return f"https://{bucket_name}.s3.{region}.amazonaws.com/{key}"
 
+def upload_private_file_to_s3(file_obj, key, content_type='application/octet-stream'):
+    """
+    Upload file berisi data pribadi (export sekolah, arsip absensi) ke bucket
+    privat S3_PRIVATE_BUCKET_NAME, bukan bucket publik QR code. Objek diberi
+    ACL private dan enkripsi server-side; hanya bisa diunduh lewat
+    generate_presigned_url. Mengembalikan URI s3://bucket/key.
+    """
+    import boto3, os
+
+    bucket = os.getenv("S3_PRIVATE_BUCKET_NAME")
+    if not bucket:
+        raise RuntimeError("S3_PRIVATE_BUCKET_NAME belum diatur; file privat tidak disimpan di bucket publik")
+    s3_client = boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION")
+    )
+    s3_client.upload_fileobj(
+        file_obj,
+        bucket,
+        key,
+        ExtraArgs={"ContentType": content_type, "ACL": "private", "ServerSideEncryption": "AES256"}
+    )
+    return f"s3://{bucket}/{key}"
+
 def delete_file_from_s3(s3_url):
     """
     Menghapus file di S3 berdasarkan URL.
@@ -46,3 +72,56 @@ def delete_file_from_s3(s3_url):
     except Exception as e:
         print(f"Gagal hapus file S3: {e}")
         return False
+
+def delete_files_from_s3(s3_urls):
+    """
+    Menghapus banyak file di S3 sekaligus (DeleteObjects, maksimal 1000 key
+    per request). Mengembalikan daftar URL yang gagal dihapus.
+    """
+    import boto3, os
+    from urllib.parse import urlparse
+
+    s3_client = boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION")
+    )
+    bucket = os.getenv("S3_BUCKET_NAME")
+
+    urls = {urlparse(url).path.lstrip('/'): url for url in s3_urls}
+    keys = list(urls)
+    failed = []
+    for start in range(0, len(keys), 1000):
+        chunk = keys[start:start + 1000]
+        try:
+            response = s3_client.delete_objects(
+                Bucket=bucket,
+                Delete={'Objects': [{'Key': key} for key in chunk], 'Quiet': True}
+            )
+        except Exception as e:
+            print(f"Gagal hapus file S3: {e}")
+            failed.extend(urls[key] for key in chunk)
+            continue
+        failed.extend(urls[error['Key']] for error in response.get('Errors', []) if error.get('Key') in urls)
+    return failed
+
+def generate_presigned_url(s3_url, expires_in=3600):
+    """URL unduhan sementara untuk file privat di S3 (URI s3://bucket/key atau URL bucket publik)"""
+    import boto3, os
+    from urllib.parse import urlparse
+
+    parsed = urlparse(s3_url)
+    bucket = parsed.netloc if parsed.scheme == 's3' else os.getenv("S3_BUCKET_NAME")
+
+    s3_client = boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION")
+    )
+    return s3_client.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket, 'Key': parsed.path.lstrip('/')},
+        ExpiresIn=expires_in
+    )
@@ -0,0 +1,245 @@
+"""
+Sinkronisasi scan offline dari halaman scanner guru.
+
+Perangkat menyimpan setiap scan di antrian lokal (IndexedDB) bersama waktu
+scan di perangkat dan client_id unik, lalu mengirimnya per batch ke
+/teacher/scan/sync. Server mencatat tanda terima (ScanReceipt) per client_id,
+sehingga batch yang dikirim ulang (timeout, jaringan putus) mendapat hasil
+yang sama tanpa absensi ganda. Scan yang terlambat sampai tetap dicatat pada
+tanggal scan di perangkat, bukan tanggal sync.
+"""
+import logging
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import Attendance, AttendanceStatus, ScanReceipt, Student, jakarta_now_naive
+from utils import auto_alpha, metrics
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+JAKARTA = ZoneInfo('Asia/Jakarta')
+
+RECORDED = 'recorded'                  # absensi baru dicatat
+ALREADY_RECORDED = 'already_recorded'  # siswa sudah punya absensi di tanggal itu
+REJECTED = 'rejected'                  # tidak valid, tidak akan berhasil jika diulang
+
+
+
+def parse_scanned_at(value):
+    """Waktu scan perangkat (epoch milidetik) sebagai datetime Jakarta tanpa tzinfo"""
+    try:
+        return datetime.fromtimestamp(float(value) / 1000, tz=JAKARTA).replace(tzinfo=None)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _result(client_id, result, message, date=None, student_name=None):
+    return {
+        'client_id': client_id,
+        'success': result != REJECTED,
+        'result': result,
+        'message': message,
+        'date': date.isoformat() if date else None,
+        'student_name': student_name,
+    }
+
+
+def _receipt_result(receipt):
+    return _result(receipt.client_id, receipt.result, receipt.message, receipt.scanned_at.date())
+
+
+def _check(scan, students, now):
+    """Validasi satu scan; kembalikan (student, date, status) atau pesan error"""
+    config = current_app.config
+    if scan.get('error'):
+        return scan['error']
+    scanned_at = scan['scanned_at']
+    if scanned_at > now + timedelta(seconds=config['SCAN_SYNC_CLOCK_SKEW_SECONDS']):
+        return 'Waktu scan di perangkat melebihi waktu server, periksa jam perangkat'
+    if scanned_at.date() < now.date() - timedelta(days=config['SCAN_SYNC_MAX_AGE_DAYS']):
+        return f"Scan lebih lama dari {config['SCAN_SYNC_MAX_AGE_DAYS']} hari tidak diterima"
+    try:
+        status = AttendanceStatus(scan.get('status') or 'hadir')
+    except ValueError:
+        return f"Status '{scan.get('status')}' tidak dikenal"
+    student = students.get(scan['nis'])
+    if student is None:
+        return f"Siswa dengan NIS {scan['nis']} tidak ditemukan"
+    if not student.user or not student.user.is_active:
+        return f'Akun siswa {student.full_name} tidak aktif'
+    if student.classroom_id is None:
+        return f'Siswa {student.full_name} belum memiliki kelas'
+    return student, scanned_at.date(), status
+
+
+def _apply(school_id, teacher_id, device_id, scans):
+    now = jakarta_now_naive()
+    client_ids = list({scan['client_id'] for scan in scans})
+    receipts = {
+        r.client_id: r for r in ScanReceipt.query.filter(
+            ScanReceipt.school_id == school_id,
+            ScanReceipt.client_id.in_(client_ids)
+        )
+    }
+
+    pending = {}
+    for scan in scans:
+        if scan['client_id'] not in receipts and scan['client_id'] not in pending:
+            pending[scan['client_id']] = scan
+
+    nis_list = {scan['nis'] for scan in pending.values() if scan.get('nis')}
+    students = {
+        s.nis: s for s in Student.query.options(db.joinedload(Student.user)).filter(
+            Student.school_id == school_id,
+            Student.nis.in_(nis_list)
+        )
+    } if nis_list else {}
+
+    # Absensi yang sudah ada untuk pasangan (siswa, tanggal) di batch ini
+    checked = {cid: _check(scan, students, now) for cid, scan in pending.items()}
+    keys = {(c[0].id, c[1]) for c in checked.values() if isinstance(c, tuple)}
+    existing = {}
+    if keys:
+        for a in Attendance.query.filter(
+            Attendance.school_id == school_id,
+            Attendance.student_id.in_({k[0] for k in keys}),
+            Attendance.date.in_({k[1] for k in keys})
+        ):
+            existing[(a.student_id, a.date)] = a
+
+    results = {}
+    new_receipts = []
+    for cid, scan in pending.items():
+        check = checked[cid]
+        attendance = None
+        if not isinstance(check, tuple):
+            result, message, date, name = REJECTED, check, scan['scanned_at'].date(), None
+        else:
+            student, date, status = check
+            name = student.full_name
+            current = existing.get((student.id, date))
+            if current is not None and auto_alpha.is_auto_alpha(current):
+                # ALPHA otomatis tercatat sebelum scan ini tersinkron: scan yang menang
+                current.status = status
+                current.recorded_by = teacher_id
+                current.notes = scan.get('notes') or None
+                attendance = current
+                result = RECORDED
+                message = f'Absensi {name} berhasil dicatat'
+            elif current is not None:
+                # Scan pertama yang tercatat yang berlaku; koreksi manual tidak ditimpa
+                result = ALREADY_RECORDED
+                message = f'{name} sudah absen ({current.status.value}) pada {date.strftime("%d/%m/%Y")}'
+                attendance = current
+            else:
+                attendance = Attendance(
+                    school_id=school_id,
+                    student_id=student.id,
+                    classroom_id=student.classroom_id,
+                    date=date,
+                    status=status,
+                    recorded_by=teacher_id,
+                    notes=scan.get('notes') or None,
+                    created_at=scan['scanned_at'],
+                )
+                db.session.add(attendance)
+                existing[(student.id, date)] = attendance
+                result = RECORDED
+                message = f'Absensi {name} berhasil dicatat'
+
+        receipt = ScanReceipt(
+            school_id=school_id,
+            client_id=cid,
+            device_id=device_id,
+            teacher_id=teacher_id,
+            scanned_at=scan['scanned_at'],
+            result=result,
+            message=message[:255],
+        )
+        db.session.add(receipt)
+        new_receipts.append((receipt, attendance))
+        results[cid] = _result(cid, result, message, date, name)
+
+    db.session.flush()
+    for receipt, attendance in new_receipts:
+        if attendance is not None:
+            receipt.attendance_id = attendance.id
+    db.session.commit()
+
+    for receipt in receipts.values():
+        results[receipt.client_id] = _receipt_result(receipt)
+    for cid, result in results.items():
+        if cid in pending:
+            metrics.record_scan(school_id, 'STUDENT', result['success'])
+    return [results[scan['client_id']] for scan in scans]
+
+
+def apply_scans(school_id, teacher_id, device_id, scans):
+    """
+    Terapkan batch scan offline. Setiap scan berisi client_id, scanned_at
+    (datetime), dan nis/status/notes atau error (scan tidak valid). Hasil
+    dikembalikan berurutan sesuai input.
+    """
+    try:
+        return _apply(school_id, teacher_id, device_id, scans)
+    except IntegrityError:
+        # Batch yang sama sedang/baru diproses request lain, atau absensi
+        # siswa hari itu baru dibuat (mis. ALPHA otomatis): ulangi sekali,
+        # tanda terima dan absensi yang sudah tersimpan dipakai sebagai hasil
+        db.session.rollback()
+        logger.info(f"Sync scan sekolah {school_id} bentrok dengan request lain, diulang")
+    try:
+        return _apply(school_id, teacher_id, device_id, scans)
+    except IntegrityError:
+        # Masih gagal: ada scan yang tidak bisa disimpan. Proses satu per satu
+        # agar scan lain tetap tercatat dan antrian perangkat tidak macet
+        db.session.rollback()
+        logger.warning(f"Sync scan sekolah {school_id} gagal per batch, diproses per scan")
+        return _apply_each(school_id, teacher_id, device_id, scans)
+
+
+def _apply_each(school_id, teacher_id, device_id, scans):
+    results = {}
+    for scan in scans:
+        cid = scan['client_id']
+        if cid in results:
+            continue
+        try:
+            results[cid] = _apply(school_id, teacher_id, device_id, [scan])[0]
+        except IntegrityError:
+            db.session.rollback()
+            logger.exception(f"Scan {cid} sekolah {school_id} gagal disimpan")
+            results[cid] = _reject(school_id, teacher_id, device_id, scan, 'Scan gagal disimpan, hubungi admin sekolah')
+    return [results[scan['client_id']] for scan in scans]
+
+
+def _reject(school_id, teacher_id, device_id, scan, message):
+    """Simpan tanda terima REJECTED agar perangkat berhenti mengirim ulang scan ini"""
+    receipt = ScanReceipt(
+        school_id=school_id,
+        client_id=scan['client_id'],
+        device_id=device_id,
+        teacher_id=teacher_id,
+        scanned_at=scan['scanned_at'],
+        result=REJECTED,
+        message=message,
+    )
+    db.session.add(receipt)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Tanda terima sudah disimpan request lain
+        db.session.rollback()
+        receipt = ScanReceipt.query.filter_by(school_id=school_id, client_id=scan['client_id']).one()
+    return _receipt_result(receipt)
+
+
+def prune_receipts(retention_days):
+    """Hapus tanda terima yang lebih lama dari retention_days"""
+    cutoff = jakarta_now_naive() - timedelta(days=retention_days)
+    deleted = ScanReceipt.query.filter(ScanReceipt.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,143 @@
+"""
+Kalender hari sekolah per sekolah per tahun.
+
+Hari sekolah = bukan akhir pekan (SCHOOL_WEEKEND_DAYS) dan tidak tertutup
+event libur (is_holiday atau jenis LIBUR). Hasilnya disimpan sebagai bitmap
+satu bit per hari (46 byte per tahun) plus jumlah kumulatif, sehingga "apakah
+tanggal D hari sekolah" dan "berapa hari sekolah di rentang" dijawab dalam
+waktu konstan untuk laporan dan deteksi ketidakhadiran.
+
+Cache dikunci dengan schools.event_version, yang naik setiap event
+ditambah/diubah/dihapus (lihat utils/school_events.py), jadi kalender lama
+otomatis tidak dipakai lagi tanpa perlu menghapus cache secara manual.
+
+end_date event bersifat eksklusif bila jamnya 00:00 (cara halaman kalender
+dan generator data menyimpannya); selain itu tanggal akhirnya ikut dihitung.
+"""
+import logging
+from array import array
+from datetime import date, datetime, time, timedelta
+from flask import current_app
+from sqlalchemy import or_
+from extensions import cache, db
+from models import EventType, SchoolEvent
+from utils import school_events
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+class SchoolCalendar:
+    """Bitmap hari sekolah satu sekolah untuk satu tahun"""
+
+    def __init__(self, school_id, year, version, bits):
+        self.school_id = school_id
+        self.year = year
+        self.version = version
+        self.bits = bytes(bits)
+        self.first = date(year, 1, 1)
+        self.length = (date(year + 1, 1, 1) - self.first).days
+        # prefix[i] = jumlah hari sekolah sebelum hari ke-i dalam tahun
+        self.prefix = array('H', [0])
+        for index in range(self.length):
+            self.prefix.append(self.prefix[-1] + self._bit(index))
+
+    def _bit(self, index):
+        return (self.bits[index >> 3] >> (index & 7)) & 1
+
+    def _index(self, day):
+        if day.year != self.year:
+            raise ValueError(f'{day} di luar kalender tahun {self.year}')
+        return (day - self.first).days
+
+    def is_school_day(self, day):
+        return bool(self._bit(self._index(day)))
+
+    def count(self, start, end):
+        """Jumlah hari sekolah di [start, end] (inklusif), dipotong ke tahun ini"""
+        start, end = max(start, self.first), min(end, date(self.year, 12, 31))
+        if start > end:
+            return 0
+        return self.prefix[self._index(end) + 1] - self.prefix[self._index(start)]
+
+    def days(self, start=None, end=None):
+        """Tanggal-tanggal hari sekolah di [start, end] (inklusif)"""
+        start = max(start or self.first, self.first)
+        end = min(end or date(self.year, 12, 31), date(self.year, 12, 31))
+        return [
+            self.first + timedelta(days=index)
+            for index in range(self._index(start), self._index(end) + 1) if self._bit(index)
+        ] if start <= end else []
+
+    @property
+    def total(self):
+        return self.prefix[-1]
+
+
+def _holiday_ranges(school_id, year):
+    """(tanggal awal, tanggal akhir inklusif) event libur yang beririsan dengan tahun"""
+    start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    ranges = []
+    for first, last in db.session.query(SchoolEvent.start_date, SchoolEvent.end_date).filter(
+        SchoolEvent.school_id == school_id,
+        SchoolEvent.start_date < end,
+        SchoolEvent.end_date >= start,
+        or_(SchoolEvent.is_holiday.is_(True), SchoolEvent.event_type == EventType.LIBUR)
+    ):
+        last_day = last.date()
+        if last.time() == time.min and last_day > first.date():
+            last_day -= timedelta(days=1)
+        ranges.append((first.date(), last_day))
+    return ranges
+
+
+def build(school_id, year, version):
+    weekend = set(current_app.config['SCHOOL_WEEKEND_DAYS'])
+    first = date(year, 1, 1)
+    length = (date(year + 1, 1, 1) - first).days
+    bits = bytearray((length + 7) // 8)
+    for index in range(length):
+        if (first + timedelta(days=index)).weekday() not in weekend:
+            bits[index >> 3] |= 1 << (index & 7)
+    for holiday_start, holiday_end in _holiday_ranges(school_id, year):
+        for index in range(max((holiday_start - first).days, 0), min((holiday_end - first).days + 1, length)):
+            bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+    return SchoolCalendar(school_id, year, version, bits)
+
+
+def get_calendar(school_id, year, version=None):
+    """Kalender satu tahun dari cache (satu query versi bila version tidak diberikan)"""
+    version = school_events.current_version(school_id) if version is None else version
+    key = f'school_calendar:{school_id}:{year}:v{version}'
+    calendar = cache.get(key)
+    if calendar is None:
+        calendar = build(school_id, year, version)
+        cache.set(key, calendar, timeout=current_app.config['SCHOOL_CALENDAR_CACHE_SECONDS'])
+    return calendar
+
+
+def is_school_day(school_id, day):
+    return get_calendar(school_id, day.year).is_school_day(day)
+
+
+def count_school_days(school_id, start, end):
+    """Jumlah hari sekolah di [start, end] (inklusif), boleh lintas tahun"""
+    if start > end:
+        return 0
+    version = school_events.current_version(school_id)
+    return sum(
+        get_calendar(school_id, year, version).count(start, end)
+        for year in range(start.year, end.year + 1)
+    )
+
+
+def school_dates(school_id, start, end):
+    """Daftar tanggal hari sekolah di [start, end] (inklusif), boleh lintas tahun"""
+    if start > end:
+        return []
+    version = school_events.current_version(school_id)
+    return [
+        day
+        for year in range(start.year, end.year + 1)
+        for day in get_calendar(school_id, year, version).days(start, end)
+    ]
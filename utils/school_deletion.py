@@ -0,0 +1,249 @@
+"""
+Penghapusan sekolah (tenant) di latar belakang.
+
+Request hanya menonaktifkan sekolah (login langsung ditolak) dan mencatat
+SchoolDeletion. Task Celery lalu menghapus baris terkait tabel per tabel
+dalam batch kecil, masing-masing satu transaksi pendek, sehingga tabel
+yang ramai (attendances, users) tidak terkunci lama. Progres disimpan per
+batch, jadi task yang mati bisa dilanjutkan dari sisa baris. URL QR siswa
+dan sekolah dikumpulkan selama penghapusan lalu dihapus dari S3 sekaligus
+di akhir.
+"""
+import logging
+import time
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import delete, func, select
+from extensions import db
+from models import (
+    Attendance, AttendanceDaily, AttendanceRisk, Classroom, EmailOutbox, RosterChange, ScanReceipt, School,
+    SchoolDeletion, SchoolEvent, SchoolQRCode, SchoolSubscription, Student, Teacher, TeacherAttendance, User,
+    jakarta_now_naive
+)
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'    # tercatat, belum diproses worker
+RUNNING = 'running'    # sedang/akan dilanjutkan
+DONE = 'done'
+FAILED = 'failed'
+ACTIVE = (PENDING, RUNNING)
+
+# Urutan mengikuti foreign key: tabel anak lebih dulu, users terakhir
+TABLES = [
+    ScanReceipt, RosterChange, EmailOutbox, AttendanceRisk, AttendanceDaily, Attendance, TeacherAttendance,
+    SchoolEvent, SchoolQRCode, Student, Classroom, Teacher, User, SchoolSubscription,
+]
+# Kolom berisi URL file S3 yang ikut dihapus
+S3_COLUMNS = {'students': 'qr_code', 'school_qr_codes': 'qr_code'}
+
+
+
+def active_deletion(school_id):
+    return SchoolDeletion.query.filter(
+        SchoolDeletion.school_id == school_id,
+        SchoolDeletion.status.in_(ACTIVE)
+    ).first()
+
+
+def pending_for(school_ids):
+    """Penghapusan yang belum selesai per sekolah, untuk daftar sekolah"""
+    if not school_ids:
+        return {}
+    return {
+        d.school_id: d for d in SchoolDeletion.query.filter(
+            SchoolDeletion.school_id.in_(school_ids),
+            SchoolDeletion.status.in_(ACTIVE + (FAILED,))
+        ).order_by(SchoolDeletion.id)
+    }
+
+
+def enqueue(deletion_id, countdown=None):
+    """Kirim task penghapusan; jika broker gagal, beat resume yang mengirim ulang"""
+    from tasks import delete_school_task
+    try:
+        delete_school_task.apply_async(kwargs={'deletion_id': deletion_id}, countdown=countdown)
+        return True
+    except Exception as e:
+        logger.error(f"Gagal mengirim task hapus sekolah {deletion_id}: {e}")
+        return False
+
+
+def request_deletion(school, requested_by=None):
+    """Nonaktifkan sekolah sekarang dan jadwalkan penghapusan datanya"""
+    deletion = active_deletion(school.id)
+    if deletion is None:
+        school.is_active = False
+        deletion = SchoolDeletion(
+            school_id=school.id,
+            school_name=school.name,
+            school_code=school.code,
+            requested_by=requested_by,
+            status=PENDING,
+            total_rows={},
+            deleted_rows={},
+            s3_urls=[]
+        )
+        db.session.add(deletion)
+        db.session.commit()
+        logger.info(f"Penghapusan sekolah {school.id} ({school.code}) dijadwalkan")
+    enqueue(deletion.id)
+    return deletion
+
+
+def retry(deletion):
+    """Lanjutkan penghapusan yang gagal dari sisa baris"""
+    deletion.status = RUNNING
+    deletion.last_error = None
+    db.session.commit()
+    enqueue(deletion.id)
+    return deletion
+
+
+def _count(school_id):
+    counts = {}
+    for model in TABLES:
+        table = model.__table__
+        counts[table.name] = db.session.execute(
+            select(func.count()).select_from(table).where(table.c.school_id == school_id)
+        ).scalar()
+    return counts
+
+
+def _delete_batch(deletion, table, batch_size):
+    """Hapus satu batch baris sekolah dari `table`, commit bersama progresnya"""
+    s3_column = S3_COLUMNS.get(table.name)
+    columns = [table.c.id] + ([table.c[s3_column]] if s3_column else [])
+    rows = db.session.execute(
+        select(*columns).where(table.c.school_id == deletion.school_id).limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+
+    ids = [row[0] for row in rows]
+    db.session.execute(delete(table).where(table.c.school_id == deletion.school_id, table.c.id.in_(ids)))
+
+    deleted = dict(deletion.deleted_rows or {})
+    deleted[table.name] = deleted.get(table.name, 0) + len(ids)
+    deletion.deleted_rows = deleted
+    deletion.current_table = table.name
+    if s3_column:
+        urls = [row[1] for row in rows if row[1] and row[1].startswith('https://')]
+        if urls:
+            deletion.s3_urls = list(deletion.s3_urls or []) + urls
+    db.session.commit()
+    return len(ids)
+
+
+def _delete_files(deletion):
+    from utils.s3_helper import delete_files_from_s3
+    urls = list(deletion.s3_urls or [])
+    if not urls:
+        return
+    deletion.current_table = 's3'
+    failed = delete_files_from_s3(urls)
+    deletion.s3_deleted = (deletion.s3_deleted or 0) + len(urls) - len(failed)
+    deletion.s3_urls = []
+    if failed:
+        # Tidak menahan penghapusan; sisa file dicatat untuk dibersihkan manual
+        deletion.last_error = f"{len(failed)} file QR gagal dihapus dari S3: " + ', '.join(failed[:20])
+        logger.warning(f"Penghapusan sekolah {deletion.school_id}: {len(failed)} file QR gagal dihapus dari S3")
+    db.session.commit()
+
+
+def run(deletion_id, time_budget=None):
+    """
+    Lanjutkan penghapusan sampai selesai atau melewati time_budget detik.
+    Mengembalikan status terakhir; RUNNING berarti perlu dilanjutkan task baru.
+    """
+    config = current_app.config
+    batch_size = config['SCHOOL_DELETE_BATCH_SIZE']
+    pause = config['SCHOOL_DELETE_BATCH_PAUSE']
+    time_budget = time_budget or config['SCHOOL_DELETE_TASK_SECONDS']
+    started = time.monotonic()
+
+    deletion = db.session.get(SchoolDeletion, deletion_id)
+    if deletion is None or deletion.status not in ACTIVE:
+        return deletion.status if deletion else None
+    if deletion.status == PENDING:
+        deletion.total_rows = _count(deletion.school_id)
+        deletion.status = RUNNING
+        db.session.commit()
+
+    # Ulangi sampai satu putaran penuh tidak menemukan baris lagi (mis. data
+    # yang masih ditulis sesi lama sesaat setelah sekolah dinonaktifkan)
+    while True:
+        found = False
+        for model in TABLES:
+            while True:
+                if time.monotonic() - started > time_budget:
+                    return RUNNING
+                if not _delete_batch(deletion, model.__table__, batch_size):
+                    break
+                found = True
+                if pause:
+                    time.sleep(pause)
+        if not found:
+            break
+
+    _delete_files(deletion)
+    db.session.execute(delete(School.__table__).where(School.__table__.c.id == deletion.school_id))
+    deletion.status = DONE
+    deletion.current_table = None
+    deletion.finished_at = jakarta_now_naive()
+    db.session.commit()
+
+    from utils import tenant_overview
+    tenant_overview.invalidate()
+    logger.info(f"Sekolah {deletion.school_id} ({deletion.school_code}) selesai dihapus: {deletion.deleted_rows}")
+    return DONE
+
+
+def mark_failed(deletion_id, error):
+    db.session.rollback()
+    deletion = db.session.get(SchoolDeletion, deletion_id)
+    if deletion is not None and deletion.status in ACTIVE:
+        deletion.status = FAILED
+        deletion.last_error = str(error)[:2000]
+        db.session.commit()
+
+
+def resume_stalled(stale_seconds=None):
+    """Kirim ulang task untuk penghapusan yang lama tidak bergerak (worker mati, broker gagal)"""
+    stale_seconds = stale_seconds or current_app.config['SCHOOL_DELETE_STALE_SECONDS']
+    cutoff = jakarta_now_naive() - timedelta(seconds=stale_seconds)
+    stalled = [d.id for d in SchoolDeletion.query.filter(
+        SchoolDeletion.status.in_(ACTIVE),
+        SchoolDeletion.updated_at < cutoff
+    )]
+    for deletion_id in stalled:
+        enqueue(deletion_id)
+    return len(stalled)
+
+
+def progress(deletion):
+    """Ringkasan progres untuk tampilan superadmin"""
+    total = sum((deletion.total_rows or {}).values())
+    deleted = sum((deletion.deleted_rows or {}).values())
+    if deletion.status == DONE:
+        percent = 100
+    elif total:
+        percent = min(99, int(deleted * 100 / total))
+    else:
+        percent = 0
+    return {
+        'id': deletion.id,
+        'school_id': deletion.school_id,
+        'school_name': deletion.school_name,
+        'status': deletion.status,
+        'percent': percent,
+        'current_table': deletion.current_table,
+        'total_rows': deletion.total_rows or {},
+        'deleted_rows': deletion.deleted_rows or {},
+        's3_pending': len(deletion.s3_urls or []),
+        's3_deleted': deletion.s3_deleted or 0,
+        'last_error': deletion.last_error,
+        'created_at': deletion.created_at.isoformat() if deletion.created_at else None,
+        'finished_at': deletion.finished_at.isoformat() if deletion.finished_at else None,
+    }
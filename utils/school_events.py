@@ -0,0 +1,97 @@
+"""
+Event kalender sekolah dalam JSON untuk FullCalendar.
+
+Setiap flush yang menambah/mengubah/menghapus SchoolEvent menaikkan
+schools.event_version (hook session, transaksi yang sama). Response API
+memakai ETag per versi dan rentang tanggal, jadi kalender yang berpindah
+bulan bolak-balik cukup mendapat 304 selama event sekolah tidak berubah.
+
+Rentang mengikuti parameter start/end FullCalendar (end eksklusif); event
+yang beririsan dengan rentang itu diambil lewat index start_date/end_date.
+"""
+import logging
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
+from models import SchoolEvent, jakarta_now
+from utils import versioning
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+
+def _track(session, flush_context):
+    """after_flush: naikkan versi event sekolah yang eventnya berubah"""
+    school_ids = {
+        obj.school_id for obj in session.new if isinstance(obj, SchoolEvent)
+    } | {
+        obj.school_id for obj in session.dirty if isinstance(obj, SchoolEvent) and session.is_modified(obj)
+    } | {
+        obj.school_id for obj in session.deleted if isinstance(obj, SchoolEvent)
+    }
+    school_ids.discard(None)
+    if school_ids:
+        versioning.bump_many(session.connection(), 'event_version', school_ids)
+
+
+def current_version(school_id):
+    return versioning.current('event_version', school_id)
+
+
+def parse_datetime(value):
+    """
+    Tanggal ISO dari FullCalendar ('2026-10-01' atau dengan jam dan offset)
+    menjadi datetime naive waktu Jakarta seperti kolom database
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(jakarta_now().tzinfo).replace(tzinfo=None)
+    return parsed
+
+
+def serialize(school_event):
+    """Bentuk event yang dipakai semua kalender (field tambahan masuk extendedProps)"""
+    return {
+        'id': school_event.id,
+        'title': school_event.title,
+        'start': school_event.start_date.isoformat(),
+        'end': school_event.end_date.isoformat(),
+        'allDay': True,
+        'description': school_event.description,
+        'event_type': school_event.event_type.value,
+        'is_holiday': bool(school_event.is_holiday),
+    }
+
+
+def in_range(school_id, start=None, end=None):
+    """Event sekolah yang beririsan dengan [start, end), urut tanggal mulai"""
+    query = SchoolEvent.query.filter(SchoolEvent.school_id == school_id)
+    if end is not None:
+        query = query.filter(SchoolEvent.start_date < end)
+    if start is not None:
+        query = query.filter(SchoolEvent.end_date > start)
+    return query.order_by(SchoolEvent.start_date, SchoolEvent.id).all()
+
+
+def events_response(school_id, start=None, end=None):
+    """Response JSON event dalam rentang dengan ETag kuat per versi (utils/versioning.py)"""
+    start, end = parse_datetime(start), parse_datetime(end)
+    version = current_version(school_id)
+    scope = '-'.join(value.strftime('%Y%m%d%H%M') if value else 'all' for value in (start, end))
+    return versioning.json_response(
+        f'events-{school_id}-v{version}-{scope}',
+        lambda: [serialize(school_event) for school_event in in_range(school_id, start, end)],
+        current_app.config['EVENTS_CACHE_SECONDS']
+    )
+
+
+def init_app(app, db):
+    """Pasang hook session yang menaikkan versi event sekolah"""
+    session_class = db.session.session_factory.class_
+    if not event.contains(session_class, 'after_flush', _track):
+        event.listen(session_class, 'after_flush', _track)
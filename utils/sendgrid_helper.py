@@ -1,6 +1,5 @@
 import os
 import logging
-from postmarker.core import PostmarkClient
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -29,7 +28,8 @@ def validate_and_init_postmark():
         if template_id_int <= 0:
             raise ValueError("POSTMARK_TEMPLATE_ID harus berupa angka positif")
         
-        # Initialize client
+        # Initialize client (postmarker baru di-import saat pertama kali dibutuhkan)
+        from postmarker.core import PostmarkClient
         client = PostmarkClient(server_token=POSTMARK_API_KEY)
         logger.info("Postmark client berhasil diinisialisasi")
         
@@ -39,16 +39,93 @@ def validate_and_init_postmark():
         logger.error(f"Gagal inisialisasi Postmark: {e}")
         return None, None
 
-# Initialize pada import
-postmark_client, TEMPLATE_ID_INT = validate_and_init_postmark()
+DEFAULT_LOGIN_LINK = "https://www.hubsensi.com/auth/login"
 
-def send_login_email(to_email: str, name: str, username: str, password: str) -> dict:
+# Batas jumlah pesan per request ke endpoint batch Postmark
+BATCH_SIZE = 500
+
+class StubPostmarkClient:
+    """
+    Pengganti PostmarkClient untuk test/offline. Tidak melakukan HTTP call,
+    semua pesan disimpan di `sent` dan dibalas seperti respons Postmark sukses.
+    Alamat yang ada di `fail_addresses` dibalas dengan ErrorCode 406.
+    """
+
+    def __init__(self, fail_addresses=None):
+        self.sent = []
+        self.batches = []
+        self.fail_addresses = set(fail_addresses or [])
+        self.emails = self
+
+    def _respond(self, message):
+        self.sent.append(message)
+        if message['To'] in self.fail_addresses:
+            return {'ErrorCode': 406, 'Message': 'Inactive recipient', 'To': message['To']}
+        return {'ErrorCode': 0, 'Message': 'OK', 'To': message['To'],
+                'MessageID': f'stub-{len(self.sent)}'}
+
+    def send_with_template(self, **message):
+        return self._respond(message)
+
+    def send_template_batch(self, *messages, **extra):
+        self.batches.append(len(messages))
+        return [self._respond({**message, **extra}) for message in messages]
+
+    def call(self, method, endpoint, **params):
+        # Hanya pencarian pesan keluar (lihat find_sent_message)
+        filters = {key[len('metadata_'):]: value for key, value in params.items() if key.startswith('metadata_')}
+        found = [
+            {'MessageID': f'stub-{number}', 'To': message['To']}
+            for number, message in enumerate(self.sent, start=1)
+            if message['To'] == params.get('recipient')
+            and all((message.get('Metadata') or {}).get(key) == value for key, value in filters.items())
+            and message['To'] not in self.fail_addresses
+        ]
+        return {'TotalCount': len(found), 'Messages': found[:params.get('count', 500)]}
+
+# Client dibuat saat email pertama dikirim, bukan saat modul di-import
+_client_cache = {}
+
+def get_postmark_client():
+    """Kembalikan (client, template_id), diinisialisasi sekali per proses"""
+    global LOGO_URL, FROM_EMAIL
+    if 'client' not in _client_cache:
+        if os.environ.get('POSTMARK_USE_STUB', 'false').lower() == 'true':
+            LOGO_URL = LOGO_URL or ''
+            FROM_EMAIL = FROM_EMAIL or 'noreply@hubsensi.local'
+            template_id = int(TEMPLATE_ID) if TEMPLATE_ID.isdigit() and int(TEMPLATE_ID) > 0 else 1
+            set_postmark_client(StubPostmarkClient(), template_id)
+            logger.info("Postmark stub client aktif (POSTMARK_USE_STUB)")
+        else:
+            client, template_id = validate_and_init_postmark()
+            if client:
+                set_postmark_client(client, template_id)
+            else:
+                return None, None
+    return _client_cache['client'], _client_cache['template_id']
+
+def set_postmark_client(client, template_id=1):
+    """Ganti client yang dipakai (mis. StubPostmarkClient di test)"""
+    _client_cache['client'] = client
+    _client_cache['template_id'] = template_id
+
+def build_template_model(name: str, username: str, password: str, login_link: str = None) -> dict:
+    return {
+        "name": name,
+        "username": username,
+        "password": password,
+        "login_link": login_link or DEFAULT_LOGIN_LINK,
+        "logo_url": LOGO_URL
+    }
+
+def send_login_email(to_email: str, name: str, username: str, password: str, login_link: str = None) -> dict:
     """
     Mengirim email login info menggunakan template Postmark dengan error handling yang robust
     """
-    login_link = "https://www.hubsensi.com/auth/login"
+    login_link = login_link or DEFAULT_LOGIN_LINK
+    postmark_client, template_id = get_postmark_client()
     # Validasi client
-    if not postmark_client or not TEMPLATE_ID_INT:
+    if not postmark_client or not template_id:
         raise RuntimeError("Postmark client tidak tersedia. Periksa konfigurasi environment variables.")
     
     # Validasi input parameters
@@ -56,20 +133,14 @@ def send_login_email(to_email: str, name: str, username: str, password: str) ->
         raise ValueError("Semua parameter email harus diisi")
     
     try:
-        template_model = {
-            "name": name,
-            "username": username,
-            "password": password,
-            "login_link": login_link,
-            "logo_url": LOGO_URL
-        }
+        template_model = build_template_model(name, username, password, login_link)
         
-        logger.info(f"Mengirim email ke {to_email} dengan template ID {TEMPLATE_ID_INT}")
+        logger.info(f"Mengirim email ke {to_email} dengan template ID {template_id}")
         
         resp = postmark_client.emails.send_with_template(
             From=FROM_EMAIL,
             To=to_email,
-            TemplateId=TEMPLATE_ID_INT,
+            TemplateId=template_id,
             TemplateModel=template_model
         )
         
@@ -91,4 +162,83 @@ def send_login_email(to_email: str, name: str, username: str, password: str) ->
     except Exception as e:
         error_msg = f"Gagal mengirim email login info ke {to_email}: {str(e)}"
         logger.error(error_msg)
-        raise RuntimeError(error_msg)
\ No newline at end of file
+        raise RuntimeError(error_msg)
+
+def find_sent_message(to_email: str, idempotency_key: str):
+    """
+    Cari pesan yang sudah diterima Postmark untuk penerima dan idempotency key
+    (metadata) ini. Mengembalikan MessageID atau None; error API diteruskan.
+    Indeks pencarian Postmark bisa tertinggal beberapa detik.
+    """
+    postmark_client, _ = get_postmark_client()
+    if not postmark_client:
+        raise RuntimeError("Postmark client tidak tersedia. Periksa konfigurasi environment variables.")
+    response = postmark_client.call(
+        'GET', '/messages/outbound', count=1, offset=0, recipient=to_email,
+        metadata_idempotency_key=idempotency_key
+    )
+    messages = response.get('Messages') or []
+    return messages[0].get('MessageID') if messages else None
+
+def send_login_email_batch(jobs: list, login_link: str = None) -> list:
+    """
+    Mengirim banyak email login info lewat endpoint batch-with-templates Postmark
+    (maksimal BATCH_SIZE pesan per request).
+
+    `jobs` berisi dict dengan key to_email, name, username, password (dan
+    metadata opsional). Hasilnya satu dict per job dengan urutan yang sama:
+    {'to_email', 'success', 'error_code', 'message', 'message_id', 'retryable'}.
+    Kegagalan per pesan (mis. alamat tidak aktif) bersifat permanen, sedangkan
+    kegagalan request satu chunk (jaringan, 5xx, rate limit) ditandai retryable.
+    """
+    postmark_client, template_id = get_postmark_client()
+    if not postmark_client or not template_id:
+        raise RuntimeError("Postmark client tidak tersedia. Periksa konfigurasi environment variables.")
+
+    results = []
+    for start in range(0, len(jobs), BATCH_SIZE):
+        chunk = jobs[start:start + BATCH_SIZE]
+        messages = [
+            {
+                "From": FROM_EMAIL,
+                "To": job['to_email'],
+                "TemplateId": template_id,
+                "TemplateModel": build_template_model(job['name'], job['username'], job['password'], login_link),
+                # Metadata opsional (mis. idempotency key outbox) ikut tercatat di Postmark
+                **({"Metadata": job['metadata']} if job.get('metadata') else {})
+            }
+            for job in chunk
+        ]
+
+        try:
+            logger.info(f"Mengirim batch {len(messages)} email dengan template ID {template_id}")
+            responses = postmark_client.emails.send_template_batch(*messages)
+        except Exception as e:
+            from postmarker.exceptions import ClientError
+            # ClientError = request ditolak Postmark (token/template salah), percuma diulang
+            logger.error(f"Gagal mengirim batch {len(messages)} email: {str(e)}")
+            results.extend({
+                'to_email': job['to_email'],
+                'success': False,
+                'error_code': getattr(e, 'error_code', None),
+                'message': str(e),
+                'message_id': None,
+                'retryable': not isinstance(e, ClientError)
+            } for job in chunk)
+            continue
+
+        # Postmark membalas satu item per pesan dengan urutan yang sama
+        for job, resp in zip(chunk, responses):
+            error_code = resp.get('ErrorCode', 0)
+            if error_code != 0:
+                logger.error(f"Postmark error {error_code} untuk {job['to_email']}: {resp.get('Message')}")
+            results.append({
+                'to_email': job['to_email'],
+                'success': error_code == 0,
+                'error_code': error_code,
+                'message': resp.get('Message'),
+                'message_id': resp.get('MessageID'),
+                'retryable': False
+            })
+
+    return results
@@ -0,0 +1,295 @@
+"""
+Export lengkap data satu sekolah (offboarding, audit, analitik).
+
+Setiap dataset (siswa, kelas, guru, event, absensi siswa, absensi guru)
+dibaca lewat server-side cursor per chunk dan langsung ditulis ke file
+Parquet (pyarrow, satu row group per chunk) atau CSV gzip, jadi memori
+tetap kecil berapa pun panjang riwayat absensinya. Semua dataset dibaca
+dari satu snapshot (REPEATABLE READ di PostgreSQL) lewat replica bila
+tersedia. File diupload ke bucket S3 privat (atau disimpan ke direktori
+lokal) bersama manifest.json berisi jumlah baris per dataset; key memuat
+token acak dan file hanya bisa diunduh lewat presigned URL.
+"""
+import os
+import csv
+import json
+import gzip
+import time
+import shutil
+import secrets
+import logging
+import tempfile
+from sqlalchemy import Boolean, Date, DateTime, Integer, select
+from flask import current_app
+from extensions import db
+from models import (
+    Attendance, Classroom, School, SchoolEvent, Student, Teacher, TeacherAttendance, TenantExport, User,
+    jakarta_now, jakarta_now_naive
+)
+from utils.db_routing import replica_engine
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+FORMATS = ('parquet', 'csv')
+
+
+def _datasets(school_id):
+    """(nama, select) per dataset; urutan kolom = urutan di file"""
+    students, classrooms, teachers, users = (
+        Student.__table__, Classroom.__table__, Teacher.__table__, User.__table__
+    )
+    events, attendances, teacher_attendances = (
+        SchoolEvent.__table__, Attendance.__table__, TeacherAttendance.__table__
+    )
+    homeroom = teachers.alias('homeroom')
+    return [
+        ('students', select(
+            students.c.id, students.c.nis, students.c.nisn, students.c.full_name,
+            students.c.classroom_id, classrooms.c.name.label('classroom_name'),
+            users.c.username, users.c.email, users.c.is_active, students.c.created_at
+        ).select_from(students)
+         .outerjoin(classrooms, classrooms.c.id == students.c.classroom_id)
+         .outerjoin(users, users.c.id == students.c.user_id)
+         .where(students.c.school_id == school_id).order_by(students.c.id)),
+        ('classrooms', select(
+            classrooms.c.id, classrooms.c.name, classrooms.c.grade_level,
+            classrooms.c.homeroom_teacher_id, homeroom.c.full_name.label('homeroom_teacher_name'),
+            classrooms.c.created_at
+        ).select_from(classrooms)
+         .outerjoin(homeroom, homeroom.c.id == classrooms.c.homeroom_teacher_id)
+         .where(classrooms.c.school_id == school_id).order_by(classrooms.c.id)),
+        ('teachers', select(
+            teachers.c.id, teachers.c.nip, teachers.c.full_name, teachers.c.is_homeroom,
+            users.c.username, users.c.email, users.c.is_active, teachers.c.created_at
+        ).select_from(teachers)
+         .outerjoin(users, users.c.id == teachers.c.user_id)
+         .where(teachers.c.school_id == school_id).order_by(teachers.c.id)),
+        ('events', select(
+            events.c.id, events.c.title, events.c.description, events.c.start_date, events.c.end_date,
+            events.c.event_type, events.c.is_holiday, events.c.created_at
+        ).where(events.c.school_id == school_id).order_by(events.c.id)),
+        ('attendances', select(
+            attendances.c.id, attendances.c.date, attendances.c.student_id, attendances.c.classroom_id,
+            attendances.c.status, attendances.c.recorded_by, attendances.c.notes,
+            attendances.c.created_at, attendances.c.updated_at
+        ).where(attendances.c.school_id == school_id).order_by(attendances.c.date, attendances.c.id)),
+        ('teacher_attendances', select(
+            teacher_attendances.c.id, teacher_attendances.c.date, teacher_attendances.c.teacher_id,
+            teacher_attendances.c.time_in, teacher_attendances.c.time_out, teacher_attendances.c.status,
+            teacher_attendances.c.created_at
+        ).where(teacher_attendances.c.school_id == school_id)
+         .order_by(teacher_attendances.c.date, teacher_attendances.c.id)),
+    ]
+
+
+def _kind(column_type):
+    # DateTime dicek sebelum Date (keduanya tipe terpisah di SQLAlchemy)
+    for base, kind in ((Boolean, 'bool'), (Integer, 'int'), (DateTime, 'datetime'), (Date, 'date')):
+        if isinstance(column_type, base):
+            return kind
+    return 'string'
+
+
+def _value(value):
+    # Enum disimpan sebagai nilainya ('hadir', 'LIBUR', ...)
+    return value.value if hasattr(value, 'value') else value
+
+
+class _CsvWriter:
+    extension = 'csv.gz'
+    content_type = 'application/gzip'
+
+    def __init__(self, path, columns):
+        self.file = gzip.open(path, 'wt', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+
+    def write(self, rows):
+        self.writer.writerows(
+            ['' if value is None else (value.isoformat() if hasattr(value, 'isoformat') else value)
+             for value in map(_value, row)]
+            for row in rows
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    extension = 'parquet'
+    content_type = 'application/vnd.apache.parquet'
+
+    def __init__(self, path, columns):
+        # pyarrow baru dimuat saat export, bukan saat aplikasi start
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        types = {
+            'bool': pa.bool_(), 'int': pa.int64(), 'datetime': pa.timestamp('us'),
+            'date': pa.date32(), 'string': pa.string(),
+        }
+        self.pa = pa
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write(self, rows):
+        values = list(zip(*[[_value(value) for value in row] for row in rows]))
+        self.writer.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(column, type=field.type) for column, field in zip(values, self.schema)],
+            schema=self.schema
+        ))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {'parquet': _ParquetWriter, 'csv': _CsvWriter}
+
+
+def _store(path, key, content_type, output_dir=None):
+    """Simpan file ke direktori lokal atau S3, kembalikan lokasinya"""
+    if output_dir:
+        destination = os.path.join(output_dir, key)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copyfile(path, destination)
+        return destination
+    from utils.s3_helper import upload_private_file_to_s3
+    with open(path, 'rb') as f:
+        return upload_private_file_to_s3(f, key, content_type=content_type)
+
+
+def _connect():
+    engine = replica_engine(db) or db.engine
+    connection = engine.connect()
+    if connection.dialect.name == 'postgresql':
+        # Semua dataset dari snapshot yang sama
+        connection = connection.execution_options(isolation_level='REPEATABLE READ')
+    return connection
+
+
+def export_school(school_id, fmt=None, output_dir=None, chunk_size=None):
+    """
+    Export semua dataset satu sekolah. Mengembalikan manifest (juga disimpan
+    sebagai manifest.json di lokasi yang sama).
+    """
+    config = current_app.config
+    fmt = fmt or config['TENANT_EXPORT_FORMAT']
+    if fmt not in FORMATS:
+        raise ValueError(f"Format export '{fmt}' tidak dikenal (pilih {', '.join(FORMATS)})")
+    chunk_size = chunk_size or config['TENANT_EXPORT_CHUNK_SIZE']
+    school = db.session.get(School, school_id)
+    if school is None:
+        raise ValueError(f'Sekolah {school_id} tidak ditemukan')
+
+    writer_class = WRITERS[fmt]
+    generated_at = jakarta_now()
+    # Token acak agar lokasi export tidak bisa ditebak dari kode sekolah dan waktu
+    prefix = (f"{config['TENANT_EXPORT_PREFIX']}/{school.code}/"
+              f"{generated_at.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(16)}")
+    manifest = {
+        'school_id': school.id,
+        'school_code': school.code,
+        'school_name': school.name,
+        'format': fmt,
+        'generated_at': generated_at.isoformat(),
+        'datasets': {},
+    }
+
+    workdir = tempfile.mkdtemp(prefix='tenant-export-')
+    started = time.monotonic()
+    try:
+        with _connect() as connection, connection.begin():
+            for name, query in _datasets(school.id):
+                dataset_started = time.monotonic()
+                columns = [(c.name, _kind(c.type)) for c in query.selected_columns]
+                path = os.path.join(workdir, f'{name}.{writer_class.extension}')
+                writer = writer_class(path, columns)
+                rows = 0
+                try:
+                    result = connection.execute(
+                        query.execution_options(stream_results=True, max_row_buffer=chunk_size)
+                    )
+                    for chunk in result.partitions(chunk_size):
+                        writer.write(chunk)
+                        rows += len(chunk)
+                finally:
+                    writer.close()
+                location = _store(path, f'{prefix}/{name}.{writer_class.extension}',
+                                  writer_class.content_type, output_dir)
+                os.remove(path)
+                manifest['datasets'][name] = {
+                    'rows': rows,
+                    'columns': [column for column, _ in columns],
+                    'location': location,
+                    'seconds': round(time.monotonic() - dataset_started, 2),
+                }
+                logger.info(f"Export sekolah {school.id}: {name} {rows:,} baris -> {location}")
+
+        manifest['seconds'] = round(time.monotonic() - started, 2)
+        path = os.path.join(workdir, 'manifest.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        manifest['location'] = _store(path, f'{prefix}/manifest.json', 'application/json', output_dir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return manifest
+
+
+# Status export per sekolah untuk halaman superadmin, di tabel
+# tenant_exports agar worker dan web melihat nilai yang sama
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def _status(export):
+    return {
+        'id': export.id,
+        'school_id': export.school_id,
+        'status': export.status,
+        'format': export.format,
+        'updated_at': export.updated_at.isoformat() if export.updated_at else None,
+        'manifest': export.manifest,
+        'error': export.error,
+    }
+
+
+def get_status(school_id):
+    """Status export terakhir sekolah, atau None jika belum pernah"""
+    export = TenantExport.query.filter(TenantExport.school_id == school_id) \
+        .order_by(TenantExport.id.desc()).first()
+    return _status(export) if export else None
+
+
+def request_export(school_id, fmt=None, requested_by=None):
+    """Catat export baru berstatus QUEUED; task dikirim oleh pemanggil"""
+    export = TenantExport(school_id=school_id, format=fmt, requested_by=requested_by, status=QUEUED)
+    db.session.add(export)
+    db.session.commit()
+    return export
+
+
+def _set_status(export, status, **fields):
+    export.status = status
+    for name, value in fields.items():
+        setattr(export, name, value)
+    if status in (DONE, FAILED):
+        export.finished_at = jakarta_now_naive()
+    db.session.commit()
+
+
+def run_export(school_id, fmt=None, export_id=None):
+    """Export dari task Celery dengan pencatatan status"""
+    export = db.session.get(TenantExport, export_id) if export_id else None
+    if export is None:
+        export = request_export(school_id, fmt)
+    _set_status(export, RUNNING)
+    try:
+        manifest = export_school(school_id, fmt=fmt)
+    except Exception as e:
+        db.session.rollback()
+        _set_status(export, FAILED, error=str(e)[:1000])
+        raise
+    _set_status(export, DONE, format=manifest['format'], manifest=manifest)
+    return manifest['location']
@@ -0,0 +1,167 @@
+"""
+Ringkasan lintas sekolah untuk halaman superadmin.
+
+Semua angka dihitung dengan beberapa query GROUP BY untuk satu halaman
+sekolah sekaligus (bukan per sekolah lewat relationship), lalu disimpan di
+cache dengan TTL pendek. Perubahan data sekolah dari halaman superadmin
+memanggil invalidate() agar tabel langsung segar; perubahan lain (siswa
+baru, absensi) cukup mengikuti TTL. Query di sini selalu ke primary: isi
+cache dari replica yang tertinggal akan bertahan selama TTL.
+"""
+import logging
+import math
+import time
+from flask import current_app
+from sqlalchemy import case, extract, func, or_
+from extensions import cache, db
+from models import Attendance, AttendanceStatus, School, SchoolSubscription, User, UserRole, jakarta_now
+from utils import school_deletion
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'tenant_overview:generation'
+STATUSES = ('active', 'inactive')
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = invalidate()
+    return generation
+
+
+def invalidate():
+    """Buang semua ringkasan yang ter-cache (kunci lama tidak dipakai lagi)"""
+    generation = str(time.time_ns())
+    cache.set(GENERATION_KEY, generation, timeout=0)
+    return generation
+
+
+def _cached(name, build):
+    today = jakarta_now().date()
+    key = f'tenant_overview:{_generation()}:{today.isoformat()}:{name}'
+    value = cache.get(key)
+    if value is None:
+        value = build(today)
+        cache.set(key, value, timeout=current_app.config['TENANT_OVERVIEW_CACHE_SECONDS'])
+    return value
+
+
+def _subscription(subscription, today):
+    if subscription is None:
+        return None
+    valid = bool(subscription.is_active) and today <= subscription.end_date
+    return {
+        'plan': subscription.plan.value,
+        'is_active': bool(subscription.is_active),
+        'end_date': subscription.end_date,
+        'valid': valid,
+        'days_remaining': (subscription.end_date - today).days if valid else 0,
+    }
+
+
+def _rows(schools, today):
+    """Baris ringkasan untuk daftar (School, SchoolSubscription) dalam 3 query"""
+    ids = [school.id for school, _ in schools]
+    users, attendance = {}, {}
+    if ids:
+        for school_id, role, count, first_username in db.session.query(
+            User.school_id, User.role, func.count(User.id), func.min(User.username)
+        ).filter(User.school_id.in_(ids)).group_by(User.school_id, User.role):
+            users[(school_id, role)] = (count, first_username)
+
+        for school_id, recorded, present in db.session.query(
+            Attendance.school_id,
+            func.count(Attendance.id),
+            func.sum(case((Attendance.status == AttendanceStatus.HADIR, 1), else_=0))
+        ).filter(Attendance.school_id.in_(ids), Attendance.date == today).group_by(Attendance.school_id):
+            attendance[school_id] = (recorded, int(present or 0))
+
+    deletions = school_deletion.pending_for(ids)
+
+    rows = []
+    for school, subscription in schools:
+        students = users.get((school.id, UserRole.STUDENT), (0, None))[0]
+        admins, admin_username = users.get((school.id, UserRole.ADMIN), (0, None))
+        recorded, present = attendance.get(school.id, (0, 0))
+        rows.append({
+            'id': school.id,
+            'name': school.name,
+            'code': school.code,
+            'address': school.address,
+            'is_active': bool(school.is_active),
+            'created_at': school.created_at,
+            'admin_username': admin_username,
+            'admin_count': admins,
+            'student_count': students,
+            'teacher_count': users.get((school.id, UserRole.TEACHER), (0, None))[0],
+            'attendance_recorded': recorded,
+            'attendance_present': present,
+            'attendance_rate': round(present * 100 / students, 1) if students else None,
+            'subscription': _subscription(subscription, today),
+            'deletion': school_deletion.progress(deletions[school.id]) if school.id in deletions else None,
+        })
+    return rows
+
+
+def _schools_query():
+    return db.session.query(School, SchoolSubscription).outerjoin(
+        SchoolSubscription, SchoolSubscription.school_id == School.id
+    )
+
+
+def summary(recent=5):
+    """Total sekolah, admin, sekolah baru per bulan, dan sekolah terbaru"""
+    def build(today):
+        total, active = db.session.query(
+            func.count(School.id),
+            func.sum(case((School.is_active.is_(True), 1), else_=0))
+        ).one()
+        month_counts = [0] * 12
+        for month, count in db.session.query(
+            extract('month', School.created_at), func.count(School.id)
+        ).group_by(extract('month', School.created_at)):
+            if month:
+                month_counts[int(month) - 1] = count
+        latest = _schools_query().order_by(School.created_at.desc(), School.id.desc()).limit(recent).all()
+        return {
+            'total': total,
+            'active': int(active or 0),
+            'inactive': total - int(active or 0),
+            'admin_count': User.query.filter(User.role == UserRole.ADMIN).count(),
+            'month_counts': month_counts,
+            'recent': _rows(latest, today),
+        }
+    return _cached(f'summary:{recent}', build)
+
+
+def page(number=1, per_page=25, search=None, status=None):
+    """
+    Satu halaman ringkasan sekolah (urut nama), dengan filter nama/kode dan
+    status aktif. Mengembalikan dict items/page/pages/total.
+    """
+    search = (search or '').strip()
+    status = status if status in STATUSES else None
+
+    def build(today):
+        query = _schools_query()
+        if search:
+            pattern = f'%{search}%'
+            query = query.filter(or_(School.name.ilike(pattern), School.code.ilike(pattern)))
+        if status:
+            query = query.filter(School.is_active.is_(status == 'active'))
+        total = query.order_by(None).count()
+        pages = max(1, math.ceil(total / per_page))
+        current = min(max(1, number), pages)
+        schools = query.order_by(School.name, School.id).offset((current - 1) * per_page).limit(per_page).all()
+        return {
+            'items': _rows(schools, today),
+            'page': current,
+            'per_page': per_page,
+            'pages': pages,
+            'total': total,
+            'search': search,
+            'status': status,
+        }
+    return _cached(f'page:{number}:{per_page}:{status}:{search.lower()}', build)
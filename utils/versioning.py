@@ -0,0 +1,64 @@
+"""
+Versi data per sekolah (kolom schools.*_version) dan response JSON ber-ETag.
+
+Hook session menaikkan versi lewat UPDATE di transaksi yang sama dengan
+perubahannya; UPDATE mengunci baris sekolah sampai commit, jadi urutan versi
+sama dengan urutan commit. Response memakai ETag kuat yang memuat versi:
+klien yang sudah punya versi itu mendapat 304 tanpa query, dan isi response
+untuk satu ETag tidak pernah berubah sehingga aman di-cache per ETag.
+Dipakai oleh roster siswa (utils/roster.py) dan event kalender
+(utils/school_events.py).
+"""
+from flask import jsonify, request, Response
+from sqlalchemy import update
+from extensions import cache, db
+from models import School
+
+
+def _column(name):
+    return School.__table__.c[name]
+
+
+def bump(connection, column, school_id):
+    """Naikkan schools.<column> satu sekolah, kembalikan versi baru (None jika sekolah tidak ada)"""
+    schools = School.__table__
+    return connection.execute(
+        update(schools).where(schools.c.id == school_id)
+        .values({column: _column(column) + 1})
+        .returning(_column(column))
+    ).scalar()
+
+
+def bump_many(connection, column, school_ids):
+    """Naikkan schools.<column> beberapa sekolah sekaligus"""
+    schools = School.__table__
+    connection.execute(
+        update(schools).where(schools.c.id.in_(school_ids)).values({column: _column(column) + 1})
+    )
+
+
+def current(column, school_id):
+    return db.session.query(_column(column)).filter(School.id == school_id).scalar() or 0
+
+
+def json_response(etag, build, cache_seconds):
+    """
+    Response JSON dengan ETag `etag`: 304 jika klien sudah punya, selain itu
+    isi dari cache atau build() lalu di-cache per ETag. Klien selalu
+    revalidasi (no-cache); browser mengirim If-None-Match otomatis.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    key = f'versioned:{etag}'
+    body = cache.get(key)
+    if body is None:
+        body = build()
+        cache.set(key, body, timeout=cache_seconds)
+
+    response = jsonify(body)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response